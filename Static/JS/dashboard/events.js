@@ -0,0 +1,126 @@
+/**
+ * Dashboard Events Module
+ * =======================
+ * Subscribes to the server's event stream (/api/events) and applies the
+ * pushed changes - new or dismissed notifications, awarded rewards, streak
+ * updates and finished quizzes - instead of refetching after every action.
+ * The browser reconnects on its own and resumes after the last event seen.
+ */
+
+let eventSource = null;
+
+/**
+ * Whether the stream is open (other modules fall back to fetching when not)
+ *
+ * @returns {boolean}
+ */
+function isConnected() {
+    return !!eventSource && eventSource.readyState === EventSource.OPEN;
+}
+
+/**
+ * Parse the JSON data of a server-sent event
+ *
+ * @param {MessageEvent} e
+ * @returns {Object|null}
+ */
+function parseEventData(e) {
+    try {
+        return JSON.parse(e.data);
+    } catch (err) {
+        console.error('Bad event data:', e.data);
+        return null;
+    }
+}
+
+/**
+ * Update every streak display
+ *
+ * @param {number} streak - Current streak in days
+ */
+function updateStreak(streak) {
+    $('.streak-days').text(streak + ' days');
+    $('.stats-streak').text(streak + ' days');
+}
+
+/**
+ * Tell the user a quiz generated elsewhere (e.g. another tab) is ready
+ *
+ * @param {Object} data - { filename, questions }
+ */
+function showQuizReady(data) {
+    const toast = $(`
+        <div class="toast-container position-fixed bottom-0 end-0 p-3" style="z-index: 1100;">
+            <div class="toast show" role="alert">
+                <div class="toast-header">
+                    <strong class="me-auto">📝 Quiz ready</strong>
+                    <button type="button" class="btn-close" data-bs-dismiss="toast"></button>
+                </div>
+                <div class="toast-body">
+                    <span class="quiz-ready-text"></span>
+                    <a href="/quiz" class="d-block mt-2">Start the quiz</a>
+                </div>
+            </div>
+        </div>
+    `);
+    toast.find('.quiz-ready-text').text(`${data.questions} questions from ${data.filename}.`);
+    $('body').append(toast);
+}
+
+/**
+ * Open the event stream and register a handler per event type
+ */
+function initEvents() {
+    if (!window.EventSource || eventSource) {
+        return;
+    }
+    eventSource = new EventSource('/api/events');
+
+    eventSource.addEventListener('notification', e => {
+        const n = parseEventData(e);
+        if (n && window.DashboardNotifications) {
+            window.DashboardNotifications.applyNotification(n);
+        }
+    });
+
+    eventSource.addEventListener('notification_dismissed', e => {
+        const data = parseEventData(e);
+        if (data && window.DashboardNotifications) {
+            window.DashboardNotifications.removeNotification(data._id);
+        }
+    });
+
+    eventSource.addEventListener('reward', e => {
+        const data = parseEventData(e);
+        if (data && window.DashboardRewards) {
+            window.DashboardRewards.addRewards(data.rewards, data.points);
+        }
+    });
+
+    eventSource.addEventListener('streak', e => {
+        const data = parseEventData(e);
+        if (data) {
+            updateStreak(data.streak);
+        }
+    });
+
+    eventSource.addEventListener('quiz_ready', e => {
+        const data = parseEventData(e);
+        if (data) {
+            showQuizReady(data);
+        }
+    });
+
+    eventSource.onerror = () => {
+        // A closed stream (e.g. events disabled, session expired) is not retried by the browser
+        if (eventSource.readyState === EventSource.CLOSED) {
+            console.warn('Dashboard event stream closed; falling back to fetching');
+        }
+    };
+}
+
+// Export for use by other modules
+window.DashboardEvents = {
+    initEvents,
+    isConnected
+};
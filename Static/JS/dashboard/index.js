@@ -23,9 +23,15 @@ $(document).ready(function () {
         window.DashboardUpload.initUpload();
     }
 
-    // 2. Setup event listeners (Notifications)
+    // 2. Setup event listeners (server events, Notifications)
+    // Notifications, rewards and streak changes are pushed by the server from here on
+    if (window.DashboardEvents) {
+        window.DashboardEvents.initEvents();
+    }
+
     if (window.DashboardNotifications) {
         window.DashboardNotifications.initDismissHandler();
+        window.DashboardNotifications.initLoadMoreHandler();
     }
 
     // 3. Initial Data Fetching
@@ -33,6 +39,8 @@ $(document).ready(function () {
     // depend on the task list being populated.
     if (window.DashboardTasks) {
         // fetchTasks() will trigger progress updates and empty state checks on success
+        window.DashboardTasks.initLoadMoreTasks();
+        window.DashboardTasks.initClearCompleted();
         window.DashboardTasks.fetchTasks();
     }
 
@@ -4,13 +4,86 @@
  * Handles fetching, rendering, and dismissing notifications.
  */
 
+// Notifications are fetched a page at a time (newest first)
+const NOTIFICATIONS_PAGE_SIZE = 50;
+
+/**
+ * Build the list item for one notification
+ *
+ * @param {Object} n - Notification object with _id, type, payload
+ * @returns {HTMLLIElement}
+ */
+function buildNotificationItem(n) {
+    const li = document.createElement('li');
+
+    // Determine notification text based on type
+    let text = '';
+    if (n.type === 'task_due') {
+        const payload = n.payload || {};
+        const title = payload.title || 'Task';
+        const done = !!payload.done;
+
+        if (done) {
+            text = `✅ Task "${title}" is done.`;
+        } else {
+            text = `⏰ Task "${title}" still needs to be done.`;
+        }
+    } else if (n.type === 'daily_checkin') {
+        text = "📅 Don't forget your daily check-in!";
+    } else if (n.type === 'streak_warning') {
+        text = "⚠️ Warning: Your streak is at risk!";
+    } else if (n.type === 'reward_earned') {
+        const payload = n.payload || {};
+        text = `🏆 You earned: ${payload.name || 'a reward'}!`;
+    } else {
+        text = '📢 You have a notification.';
+    }
+
+    // Add text node
+    li.appendChild(document.createTextNode(text + ' '));
+
+    // Add dismiss button
+    const btn = document.createElement('button');
+    btn.type = 'button';
+    btn.className = 'btn-close dismiss-notification';
+    btn.setAttribute('aria-label', 'Close');
+    btn.dataset.notificationId = n._id;
+
+    li.appendChild(btn);
+    return li;
+}
+
+/**
+ * Show, update or remove the "Show older notifications" button of a bar
+ *
+ * @param {HTMLElement} alertDiv - The notification bar
+ * @param {string|null} nextCursor - Cursor of the next page, null when there is none
+ */
+function setLoadMoreNotifications(alertDiv, nextCursor) {
+    let more = alertDiv.querySelector('.load-more-notifications');
+    if (!nextCursor) {
+        if (more) more.remove();
+        return;
+    }
+    if (!more) {
+        more = document.createElement('button');
+        more.type = 'button';
+        more.className = 'btn btn-link btn-sm p-0 mt-2 load-more-notifications';
+        more.textContent = 'Show older notifications';
+        alertDiv.appendChild(more);
+    }
+    more.dataset.cursor = nextCursor;
+    more.disabled = false;
+}
+
 /**
  * Render notifications in the notification bar
  * Creates DOM elements for each notification
  * 
  * @param {Array} notifications - Array of notification objects
+ * @param {string|null} nextCursor - Cursor of the next page, if any
  */
-function renderNotifications(notifications) {
+function renderNotifications(notifications, nextCursor) {
     // Remove any existing notification bar
     const existingAlert = document.querySelector('.alert.alert-info[data-notification-bar="1"]');
     if (existingAlert) {
@@ -38,60 +111,37 @@ function renderNotifications(notifications) {
 
     // Add each notification to the list
     notifications.forEach(n => {
-        const li = document.createElement('li');
-
-        // Determine notification text based on type
-        let text = '';
-        if (n.type === 'task_due') {
-            const payload = n.payload || {};
-            const title = payload.title || 'Task';
-            const done = !!payload.done;
-
-            if (done) {
-                text = `✅ Task "${title}" is done.`;
-            } else {
-                text = `⏰ Task "${title}" still needs to be done.`;
-            }
-        } else if (n.type === 'daily_checkin') {
-            text = "📅 Don't forget your daily check-in!";
-        } else if (n.type === 'streak_warning') {
-            text = "⚠️ Warning: Your streak is at risk!";
-        } else if (n.type === 'reward_earned') {
-            const payload = n.payload || {};
-            text = `🏆 You earned: ${payload.name || 'a reward'}!`;
-        } else {
-            text = '📢 You have a notification.';
-        }
-
-        // Add text node
-        li.appendChild(document.createTextNode(text + ' '));
-
-        // Add dismiss button
-        const btn = document.createElement('button');
-        btn.type = 'button';
-        btn.className = 'btn-close dismiss-notification';
-        btn.setAttribute('aria-label', 'Close');
-        btn.dataset.notificationId = n._id;
-
-        li.appendChild(btn);
-        ul.appendChild(li);
+        ul.appendChild(buildNotificationItem(n));
     });
 
     alertDiv.appendChild(ul);
+    setLoadMoreNotifications(alertDiv, nextCursor);
 
     // Insert at the top of the content area
     wrapper.insertBefore(alertDiv, wrapper.firstChild);
 }
 
 /**
- * Fetch notifications from the server and render them
+ * Request one page of notifications
+ *
+ * @param {string|null} cursor - next_cursor from the previous page, or null for the first page
+ */
+function fetchNotificationsPage(cursor) {
+    const params = new URLSearchParams({ limit: NOTIFICATIONS_PAGE_SIZE });
+    if (cursor) {
+        params.set('cursor', cursor);
+    }
+    return fetch(`/api/notifications?${params}`).then(res => res.json());
+}
+
+/**
+ * Fetch the first page of notifications from the server and render them
  */
 function fetchAndRenderNotifications() {
-    fetch('/api/notifications')
-        .then(res => res.json())
+    fetchNotificationsPage(null)
         .then(data => {
             if (data.success) {
-                renderNotifications(data.notifications || []);
+                renderNotifications(data.notifications || [], data.next_cursor || null);
             } else {
                 console.warn('Failed to fetch notifications:', data.error);
             }
@@ -101,6 +151,86 @@ function fetchAndRenderNotifications() {
         });
 }
 
+/**
+ * Find the list item of a notification shown in the bar
+ *
+ * @param {string} notificationId
+ * @returns {HTMLLIElement|null}
+ */
+function findNotificationItem(notificationId) {
+    const btn = document.querySelector(`.dismiss-notification[data-notification-id="${notificationId}"]`);
+    return btn ? btn.closest('li') : null;
+}
+
+/**
+ * Apply a "notification" event: show it at the top of the bar
+ * A coalesced notification replaces its earlier version
+ *
+ * @param {Object} n - Notification object with _id, type, payload
+ */
+function applyNotification(n) {
+    const existing = findNotificationItem(n._id);
+    if (existing) {
+        existing.remove();
+    }
+
+    const alertDiv = document.querySelector('.alert.alert-info[data-notification-bar="1"]');
+    if (!alertDiv) {
+        renderNotifications([n], null);
+        return;
+    }
+    const ul = alertDiv.querySelector('ul');
+    ul.insertBefore(buildNotificationItem(n), ul.firstChild);
+}
+
+/**
+ * Apply a "notification_dismissed" event (e.g. dismissed in another tab)
+ *
+ * @param {string} notificationId
+ */
+function removeNotification(notificationId) {
+    const li = findNotificationItem(notificationId);
+    if (!li) return;
+
+    const alertDiv = li.closest('[data-notification-bar="1"]');
+    li.remove();
+    if (alertDiv && !alertDiv.querySelector('li')) {
+        alertDiv.remove();
+    }
+}
+
+/**
+ * Initialize the "Show older notifications" handler
+ * Appends the next page to the bar's list (event delegation, the bar is re-rendered)
+ */
+function initLoadMoreHandler() {
+    $(document).on('click', '.load-more-notifications', function (e) {
+        e.preventDefault();
+
+        const btn = this;
+        const alertDiv = btn.closest('[data-notification-bar="1"]');
+        if (!alertDiv || btn.disabled) return;
+        btn.disabled = true;
+
+        fetchNotificationsPage(btn.dataset.cursor)
+            .then(data => {
+                if (data.success) {
+                    const ul = alertDiv.querySelector('ul');
+                    (data.notifications || []).forEach(n => {
+                        ul.appendChild(buildNotificationItem(n));
+                    });
+                    setLoadMoreNotifications(alertDiv, data.next_cursor || null);
+                } else {
+                    btn.disabled = false;
+                }
+            })
+            .catch(err => {
+                console.error('Error loading more notifications:', err);
+                btn.disabled = false;
+            });
+    });
+}
+
 /**
  * Initialize notification dismiss handler
  * Uses event delegation since notifications are dynamically added
@@ -165,5 +295,8 @@ function initDismissHandler() {
 window.DashboardNotifications = {
     renderNotifications,
     fetchAndRenderNotifications,
-    initDismissHandler
+    applyNotification,
+    removeNotification,
+    initDismissHandler,
+    initLoadMoreHandler
 };
@@ -87,6 +87,49 @@ function fetchRewards() {
         });
 }
 
+/**
+ * Build the badge markup for one reward
+ *
+ * @param {Object} r - Reward object with tier, icon, name, description
+ * @returns {string}
+ */
+function buildRewardBadge(r) {
+    // Determine badge color based on tier
+    let badgeClass = 'bg-primary';  // Bronze = primary/blue
+    if (r.tier === 'gold') {
+        badgeClass = 'bg-warning text-dark';
+    } else if (r.tier === 'silver') {
+        badgeClass = 'bg-secondary';
+    }
+
+    return `
+        <span class="badge ${badgeClass} me-1 mb-1" title="${r.description}">
+            ${r.icon} ${r.name}
+        </span>
+    `;
+}
+
+/**
+ * Apply a "reward" event: toast each new reward, add its badge and points
+ *
+ * @param {Array} rewards - Newly awarded reward objects
+ * @param {number} points - Points they are worth together
+ */
+function addRewards(rewards, points) {
+    (rewards || []).forEach(reward => {
+        showRewardNotification(reward);
+    });
+
+    if ($('#rewardsContainer').length) {
+        const $total = $('#totalPoints');
+        $total.text((parseInt($total.text(), 10) || 0) + (points || 0));
+
+        const $badges = $('#rewardsBadges');
+        $badges.find('.text-muted').remove();  // "Complete tasks to earn rewards!"
+        $badges.append((rewards || []).map(buildRewardBadge).join(''));
+    }
+}
+
 /**
  * Update the rewards display panel
  * Shows earned badges and total points
@@ -102,21 +145,7 @@ function updateRewardsDisplay(rewards, totalPoints) {
 
         // Build badges HTML
         if (rewards && rewards.length > 0) {
-            const badgesHtml = rewards.map(r => {
-                // Determine badge color based on tier
-                let badgeClass = 'bg-primary';  // Bronze = primary/blue
-                if (r.tier === 'gold') {
-                    badgeClass = 'bg-warning text-dark';
-                } else if (r.tier === 'silver') {
-                    badgeClass = 'bg-secondary';
-                }
-
-                return `
-                    <span class="badge ${badgeClass} me-1 mb-1" title="${r.description}">
-                        ${r.icon} ${r.name}
-                    </span>
-                `;
-            }).join('');
+            const badgesHtml = rewards.map(buildRewardBadge).join('');
 
             $('#rewardsBadges').html(badgesHtml);
         } else {
@@ -130,5 +159,6 @@ window.DashboardRewards = {
     checkAndShowRewards,
     showRewardNotification,
     fetchRewards,
-    updateRewardsDisplay
+    updateRewardsDisplay,
+    addRewards
 };
@@ -4,21 +4,47 @@
  * Handles task CRUD operations and DOM updates.
  */
 
+// Tasks are fetched a page at a time (newest first)
+const TASKS_PAGE_SIZE = 50;
+let tasksNextCursor = null;
+let loadedTasks = [];
+
+/**
+ * Request one page of tasks
+ *
+ * @param {string|null} cursor - next_cursor from the previous page, or null for the first page
+ */
+function fetchTasksPage(cursor) {
+    const params = new URLSearchParams({ limit: TASKS_PAGE_SIZE });
+    if (cursor) {
+        params.set('cursor', cursor);
+    }
+    return fetch(`/api/tasks?${params}`).then(response => response.json());
+}
+
+/**
+ * Show or hide the "Load more" button depending on whether more pages exist
+ */
+function updateLoadMoreButton() {
+    $('#loadMoreTasks').toggle(!!tasksNextCursor).prop('disabled', false);
+}
+
 /**
- * Fetch all tasks from the server
+ * Fetch the first page of tasks from the server
  * Called on page load to populate the task list
  */
 function fetchTasks() {
-    fetch('/api/tasks')
-        .then(response => response.json())
+    fetchTasksPage(null)
         .then(data => {
             if (data.success) {
                 // Clear existing tasks in the DOM
                 $('#tasksContainer').empty();
+                loadedTasks = data.tasks || [];
+                tasksNextCursor = data.next_cursor || null;
 
-                if (data.tasks && data.tasks.length > 0) {
+                if (loadedTasks.length > 0) {
                     // Add each task to the DOM
-                    data.tasks.forEach(task => {
+                    loadedTasks.forEach(task => {
                         addTaskToDOM(task);
                     });
                     // Hide the "no tasks" message
@@ -27,6 +53,7 @@ function fetchTasks() {
                     // Show the "no tasks" message
                     $('.empty-state').show();
                 }
+                updateLoadMoreButton();
 
                 // Update the progress bar
                 if (window.DashboardProgress) {
@@ -34,7 +61,7 @@ function fetchTasks() {
                 }
 
                 // Update task selectors (Timer/Quiz)
-                updateTaskSelectors(data.tasks);
+                updateTaskSelectors(loadedTasks);
             }
         })
         .catch(error => {
@@ -42,6 +69,43 @@ function fetchTasks() {
         });
 }
 
+/**
+ * Append the next page of tasks below the ones already shown
+ */
+function loadMoreTasks() {
+    if (!tasksNextCursor) return;
+    $('#loadMoreTasks').prop('disabled', true);
+
+    fetchTasksPage(tasksNextCursor)
+        .then(data => {
+            if (data.success) {
+                const tasks = data.tasks || [];
+                tasks.forEach(task => {
+                    addTaskToDOM(task);
+                });
+                loadedTasks = loadedTasks.concat(tasks);
+                tasksNextCursor = data.next_cursor || null;
+
+                if (window.DashboardProgress) {
+                    window.DashboardProgress.updateProgress();
+                }
+                updateTaskSelectors(loadedTasks);
+            }
+            updateLoadMoreButton();
+        })
+        .catch(error => {
+            console.error('Error loading more tasks:', error);
+            updateLoadMoreButton();
+        });
+}
+
+/**
+ * Wire up the "Load more" button
+ */
+function initLoadMoreTasks() {
+    $('#loadMoreTasks').on('click', loadMoreTasks);
+}
+
 /**
  * Add a task to the DOM
  * Creates the HTML structure for a task card
@@ -91,6 +155,15 @@ function addTaskToDOM(task) {
     });
 }
 
+/**
+ * Whether dashboard events (notifications, rewards) are being pushed by the server
+ *
+ * @returns {boolean}
+ */
+function eventsConnected() {
+    return !!(window.DashboardEvents && window.DashboardEvents.isConnected());
+}
+
 /**
  * Create a new task via API
  * Sends POST request to create task in database
@@ -169,7 +242,8 @@ function deleteTask(taskId) {
                 });
 
                 // Refresh notifications in case task had related notifications
-                if (window.DashboardNotifications) {
+                // (the event stream delivers any change when it is open)
+                if (!eventsConnected() && window.DashboardNotifications) {
                     window.DashboardNotifications.fetchAndRenderNotifications();
                 }
             } else {
@@ -223,14 +297,16 @@ function toggleTask(taskId) {
                     window.DashboardProgress.updateProgress();
                 }
 
-                // Refresh notifications
-                if (window.DashboardNotifications) {
-                    window.DashboardNotifications.fetchAndRenderNotifications();
-                }
-
-                // Check if user earned any new rewards
-                if (window.DashboardRewards) {
-                    window.DashboardRewards.checkAndShowRewards();
+                // The server awards rewards and creates the task notification;
+                // with the event stream open both arrive as events
+                if (!eventsConnected()) {
+                    if (window.DashboardNotifications) {
+                        window.DashboardNotifications.fetchAndRenderNotifications();
+                    }
+                    if (window.DashboardRewards && data.new_rewards && data.new_rewards.length > 0) {
+                        const points = data.new_rewards.reduce((sum, r) => sum + (r.points || 0), 0);
+                        window.DashboardRewards.addRewards(data.new_rewards, points);
+                    }
                 }
             } else {
                 alert('Error updating task: ' + data.error);
@@ -243,6 +319,75 @@ function toggleTask(taskId) {
         });
 }
 
+/**
+ * Apply several task operations in one request
+ * Each operation is {op: 'create', title}, {op: 'toggle', task_id, done?},
+ * {op: 'rename', task_id, title} or {op: 'delete', task_id}
+ *
+ * @param {Array} operations - Operations, applied in order
+ * @returns {Promise<Object>} Response with one result per operation
+ */
+function batchTasks(operations) {
+    const csrfToken = window.DashboardCSRF ? window.DashboardCSRF.getCsrfToken() : '';
+
+    return fetch('/api/tasks/batch', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'X-CSRFToken': csrfToken  // CSRF protection
+        },
+        body: JSON.stringify({ operations: operations })
+    }).then(response => response.json());
+}
+
+/**
+ * Delete every completed task shown, in one request
+ */
+function clearCompletedTasks() {
+    const taskIds = loadedTasks
+        .filter(task => $(`#check-${task._id}`).prop('checked'))
+        .map(task => task._id);
+    if (taskIds.length === 0) return;
+
+    $('#clearCompletedTasks').prop('disabled', true);
+    batchTasks(taskIds.map(taskId => ({ op: 'delete', task_id: taskId })))
+        .then(data => {
+            if (!data.success) {
+                alert('Error clearing tasks: ' + data.error);
+                return;
+            }
+            const removed = new Set();
+            data.results.forEach(result => {
+                if (result.success) {
+                    removed.add(result.task_id);
+                    $(`#task-${result.task_id}`).remove();
+                }
+            });
+            loadedTasks = loadedTasks.filter(task => !removed.has(task._id));
+
+            if ($('.task-item').length === 0) {
+                $('.empty-state').show();
+            }
+            if (window.DashboardProgress) {
+                window.DashboardProgress.updateProgress();
+            }
+            updateTaskSelectors(loadedTasks);
+        })
+        .catch(error => {
+            console.error('Error clearing tasks:', error);
+        })
+        .finally(() => {
+            $('#clearCompletedTasks').prop('disabled', false);
+        });
+}
+
+/**
+ * Wire up the "Clear completed" button
+ */
+function initClearCompleted() {
+    $('#clearCompletedTasks').on('click', clearCompletedTasks);
+}
+
 /**
  * Update task selection dropdowns (Focus Session & Quiz)
  * 
@@ -276,9 +421,14 @@ function updateTaskSelectors(tasks) {
 // Export for use by other modules
 window.DashboardTasks = {
     fetchTasks,
+    loadMoreTasks,
+    initLoadMoreTasks,
     addTaskToDOM,
     createTask,
     deleteTask,
     toggleTask,
+    batchTasks,
+    clearCompletedTasks,
+    initClearCompleted,
     updateTaskSelectors
 };
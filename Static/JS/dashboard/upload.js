@@ -36,11 +36,115 @@ function initUpload() {
             }
 
             // Submit the form to generate quiz
-            // The server will extract text and generate questions
+            // The server queues a job that extracts text and generates questions
             $('#uploadForm').submit();
         }
     });
+
+    // Upload in the background and follow the job; without JS the form posts normally
+    $('#uploadForm').on('submit', function (event) {
+        if (!window.fetch || !window.FormData) return;
+        event.preventDefault();
+        uploadDocument(this);
+    });
+}
+
+// Job status polling: start fast, back off while a long document is processed
+const JOB_POLL_START_MS = 1000;
+const JOB_POLL_MAX_MS = 5000;
+
+const JOB_STATUS_TEXT = {
+    queued: 'Waiting for a free worker...',
+    extracting: 'Reading your document...',
+    extracted: 'Waiting for the question generator...',
+    generating: 'Generating questions...'
+};
+
+/**
+ * Show the upload/generation progress under the form
+ *
+ * @param {string} text - Message to show
+ * @param {boolean} isError - Whether to style it as an error
+ */
+function showUploadStatus(text, isError) {
+    $('#uploadStatus')
+        .text(text)
+        .toggleClass('text-danger', !!isError)
+        .toggleClass('text-muted', !isError)
+        .show();
+}
+
+/**
+ * Let the user pick another file after a failed upload
+ */
+function resetUpload() {
+    $('#fileUpload').prop('disabled', false).val('');
+}
+
+/**
+ * Post the upload form and follow the quiz generation job it creates
+ *
+ * @param {HTMLFormElement} form - The upload form
+ */
+function uploadDocument(form) {
+    const formData = new FormData(form);
+    $('#fileUpload').prop('disabled', true);
+    showUploadStatus('Uploading...', false);
+
+    fetch(form.action || window.location.pathname, {
+        method: 'POST',
+        body: formData,
+        headers: { 'Accept': 'application/json' }
+    })
+        .then(response => response.json())
+        .then(data => {
+            if (!data.success) {
+                showUploadStatus(data.error || 'Upload failed.', true);
+                resetUpload();
+                return;
+            }
+            pollQuizJob(data.status_url, JOB_POLL_START_MS);
+        })
+        .catch(error => {
+            console.error('Error uploading document:', error);
+            showUploadStatus('Upload failed. Please try again.', true);
+            resetUpload();
+        });
+}
+
+/**
+ * Poll a quiz generation job until it finishes, then open the quiz
+ *
+ * @param {string} statusUrl - The job's status endpoint
+ * @param {number} delay - Milliseconds until the next poll
+ */
+function pollQuizJob(statusUrl, delay) {
+    fetch(statusUrl)
+        .then(response => response.json())
+        .then(data => {
+            if (!data.success) {
+                showUploadStatus(data.error || 'Quiz generation failed.', true);
+                resetUpload();
+                return;
+            }
+            const job = data.job;
+            if (job.status === 'done') {
+                showUploadStatus(`Quiz ready: ${job.questions} questions.`, false);
+                window.location.href = job.redirect;
+            } else if (job.status === 'failed' || job.status === 'cancelled') {
+                showUploadStatus(job.error || 'This upload was replaced by a newer one.', true);
+                resetUpload();
+            } else {
+                showUploadStatus(JOB_STATUS_TEXT[job.status] || 'Working...', false);
+                setTimeout(() => pollQuizJob(statusUrl, Math.min(delay * 1.5, JOB_POLL_MAX_MS)), delay);
+            }
+        })
+        .catch(error => {
+            // Network hiccup: keep following the job
+            console.error('Error checking quiz job:', error);
+            setTimeout(() => pollQuizJob(statusUrl, JOB_POLL_MAX_MS), JOB_POLL_MAX_MS);
+        });
 }
 
 // Export for use by other modules
-window.DashboardUpload = { initUpload };
+window.DashboardUpload = { initUpload, uploadDocument, pollQuizJob };
@@ -0,0 +1,121 @@
+"""
+Text extraction backends: time every installed backend on each format.
+
+Builds sample documents for each format the installed libraries can write
+(txt always; pdf with PyMuPDF, docx with python-docx, png with Pillow), or
+uses the files given with --files, and times a full extraction with each
+registered backend that is installed. The last line is an
+EXTRACTOR_PREFERENCE value listing the fastest backend first for each
+format where more than one backend produced text.
+
+Usage:
+    python benchmarks/bench_extract.py [--pages 50] [--repeat 3] [--files notes.pdf slides.docx]
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from focusflow.services.questions import extractors, pages  # noqa: E402
+
+PARAGRAPH = (
+    "Photosynthesis converts light energy into chemical energy stored in glucose. "
+    "It takes place in the chloroplasts, using water and carbon dioxide. "
+) * 3
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def make_samples(directory: str, page_count: int) -> dict:
+    """Sample files by format, for the formats the installed libraries can write."""
+    samples = {}
+    path = os.path.join(directory, "sample.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(page_count * 10):
+            f.write(f"{i}. {PARAGRAPH}\n\n")
+    samples["txt"] = path
+
+    if _installed("pymupdf"):
+        import pymupdf as fitz
+        path = os.path.join(directory, "sample.pdf")
+        doc = fitz.open()
+        for p in range(page_count):
+            page = doc.new_page()
+            page.insert_textbox(page.rect + (50, 50, -50, -50), f"Page {p}. " + PARAGRAPH * 4, fontsize=10)
+        doc.save(path)
+        doc.close()
+        samples["pdf"] = path
+
+    if _installed("docx"):
+        from docx import Document
+        path = os.path.join(directory, "sample.docx")
+        doc = Document()
+        for i in range(page_count * 10):
+            doc.add_paragraph(f"{i}. {PARAGRAPH}")
+        doc.save(path)
+        samples["docx"] = path
+
+    if _installed("PIL"):
+        from PIL import Image, ImageDraw
+        path = os.path.join(directory, "sample.png")
+        image = Image.new("L", (1700, 2200), 255)
+        draw = ImageDraw.Draw(image)
+        for row in range(40):
+            draw.text((100, 100 + row * 50), PARAGRAPH[:90], fill=0)
+        image.save(path)
+        samples["png"] = path
+    return samples
+
+
+def time_backend(path: str, file_format: str, backend: str, repeat: int) -> tuple:
+    """(best seconds, characters extracted) for one backend."""
+    best, chars = None, 0
+    for _ in range(repeat):
+        pages._layouts.clear()  # measure classification too, not a cached layout
+        t0 = time.perf_counter()
+        chars = sum(len(chunk) for chunk in extractors.iter_text(path, file_format, backend=backend))
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, chars
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--files", nargs="*", default=[])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.files:
+            samples = {extractors.normalize_format(os.path.splitext(f)[1]): f for f in args.files}
+        else:
+            samples = make_samples(tmp, args.pages)
+
+        print(f"{'format':>6} {'backend':>12} {'ms':>9} {'chars':>9}")
+        preference = []
+        for file_format, path in sorted(samples.items()):
+            results = []
+            for spec in extractors.extractors_for(file_format):
+                seconds, chars = time_backend(path, file_format, spec.name, args.repeat)
+                print(f"{file_format:>6} {spec.name:>12} {seconds * 1000:>9.1f} {chars:>9}")
+                if chars:
+                    results.append((seconds, spec.name))
+            missing = [s.name for s in extractors.registered_extractors(file_format) if not s.available()]
+            if missing:
+                print(f"{file_format:>6} {'(not installed: ' + ', '.join(missing) + ')':>12}")
+            if len(results) > 1:
+                preference.append(f"{file_format}=" + ",".join(name for _, name in sorted(results)))
+
+    print(f"EXTRACTOR_PREFERENCE={';'.join(preference)}" if preference
+          else "Only one working backend per format; nothing to choose.")
+
+
+if __name__ == "__main__":
+    main()
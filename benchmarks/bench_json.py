@@ -0,0 +1,102 @@
+"""
+JSON encoding of task lists: recursive pre-conversion versus the app's provider.
+
+Builds task documents shaped like the ``tasks`` collection returns them
+(ObjectId ids, datetime timestamps) and times encoding a /api/tasks body of
+1k, 10k and 100k tasks three ways:
+
+- legacy: the old ``serialize_value`` walk into plain dicts, then Flask's
+  default provider
+- stdlib: ``MongoJSONProvider`` on the json module fallback
+- orjson: ``MongoJSONProvider`` with orjson (skipped if it isn't installed)
+
+Usage:
+    python benchmarks/bench_json.py [--sizes 1000 10000 100000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from bson.objectid import ObjectId  # noqa: E402
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+from focusflow import serialization  # noqa: E402
+
+
+def make_tasks(count: int) -> list:
+    user_id = ObjectId()
+    start = datetime(2025, 1, 1, 9, 30)
+    return [
+        {
+            "_id": ObjectId(),
+            "user_id": user_id,
+            "title": f"Read chapter {i} and summarise the key points",
+            "done": i % 3 == 0,
+            "created_at": start + timedelta(minutes=i),
+        }
+        for i in range(count)
+    ]
+
+
+def serialize_value(value):
+    """The per-value walk tasks_api used before the JSON provider."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    elif hasattr(value, "isoformat"):
+        return value.isoformat()
+    elif isinstance(value, dict):
+        return {k: serialize_value(v) for k, v in value.items()}
+    elif isinstance(value, list):
+        return [serialize_value(item) for item in value]
+    else:
+        return value
+
+
+def encode_legacy(app, tasks) -> bytes:
+    body = {"success": True, "tasks": [{k: serialize_value(v) for k, v in t.items()} for t in tasks]}
+    return app.json.response(body).get_data()
+
+
+def encode_provider(app, tasks) -> bytes:
+    return app.json.response({"success": True, "tasks": tasks}).get_data()
+
+
+def best_ms(fn, app, tasks, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(app, tasks)
+        times.append(time.perf_counter() - t0)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    legacy_app, stdlib_app, orjson_app = Flask("legacy"), Flask("stdlib"), Flask("orjson")
+    legacy_app.json = DefaultJSONProvider(legacy_app)
+    stdlib_app.json = serialization.MongoJSONProvider(stdlib_app, use_orjson=False)
+    variants = [("legacy", legacy_app, encode_legacy), ("stdlib", stdlib_app, encode_provider)]
+    if serialization.orjson is not None:
+        orjson_app.json = serialization.MongoJSONProvider(orjson_app, use_orjson=True)
+        variants.append(("orjson", orjson_app, encode_provider))
+    else:
+        print("orjson is not installed; measuring the fallback encoder only")
+
+    print(f"{'tasks':>8} " + " ".join(f"{name:>10}" for name, _, _ in variants) + f"   (ms, best of {args.repeat})")
+    for size in args.sizes:
+        tasks = make_tasks(size)
+        row = [best_ms(fn, app, tasks, args.repeat) for _, app, fn in variants]
+        print(f"{size:>8} " + " ".join(f"{ms:>10.1f}" for ms in row))
+
+
+if __name__ == "__main__":
+    main()
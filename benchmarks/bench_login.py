@@ -0,0 +1,110 @@
+"""
+Login throughput under concurrent load.
+
+Runs the real /login route on the in-memory backend (no database needed)
+with N client threads, while a probe thread measures the latency of a cheap
+route to show how much a login burst starves everything else. Compares
+inline hashing with the bounded process pool.
+
+Usage:
+    python benchmarks/bench_login.py [--threads 16] [--seconds 5] [--workers 4]
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+import warnings
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("PASSWORD_PEPPER", "bench-pepper")
+os.environ["DATA_BACKEND"] = "memory"
+os.environ["RATELIMIT_ENABLED"] = "false"  # every request comes from one address
+warnings.filterwarnings("ignore")
+
+import focusflow  # noqa: E402
+from focusflow import create_app  # noqa: E402
+from focusflow.repositories import get_repositories, reset_memory_backend  # noqa: E402
+from focusflow.services import passwords  # noqa: E402
+
+PASSWORD = "correct horse battery"
+
+
+def make_app():
+    app = create_app()
+    app.config.update(SESSION_COOKIE_SECURE=False)
+    focusflow.csrf.protect = lambda: None  # form posts come from the benchmark, not a browser
+    return app
+
+
+def seed_users(count: int):
+    reset_memory_backend()
+    users = get_repositories("memory").users
+    hashed = passwords.hash_password(PASSWORD + os.environ["PASSWORD_PEPPER"])
+    for i in range(count):
+        users.create({"name": f"user{i}", "email": f"user{i}@bench.local", "password": hashed})
+
+
+def run(app, threads: int, seconds: float) -> dict:
+    stop = time.monotonic() + seconds
+    logins = [0] * threads
+    probe_latencies = []
+
+    def login_loop(idx):
+        client = app.test_client()
+        i = 0
+        while time.monotonic() < stop:
+            r = client.post("/login", base_url="https://localhost",
+                            data={"email": f"user{(idx + i) % 100}@bench.local", "password": PASSWORD})
+            if r.status_code == 302:
+                logins[idx] += 1
+            client.get("/logout", base_url="https://localhost")
+            i += 1
+
+    def probe_loop():
+        client = app.test_client()
+        while time.monotonic() < stop:
+            t0 = time.perf_counter()
+            client.get("/", base_url="https://localhost")
+            probe_latencies.append((time.perf_counter() - t0) * 1000)
+            time.sleep(0.01)
+
+    workers = [threading.Thread(target=login_loop, args=(i,)) for i in range(threads)]
+    workers.append(threading.Thread(target=probe_loop))
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+
+    probe_latencies.sort()
+    return {
+        "logins_per_sec": sum(logins) / seconds,
+        "probe_p50_ms": statistics.median(probe_latencies) if probe_latencies else None,
+        "probe_p95_ms": probe_latencies[int(len(probe_latencies) * 0.95) - 1] if probe_latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    args = parser.parse_args()
+
+    app = make_app()
+    for label, config in (
+        ("inline", {"PASSWORD_HASH_WORKERS": 0, "PASSWORD_HASH_CONCURRENCY": args.threads}),
+        (f"pool({args.workers})", {"PASSWORD_HASH_WORKERS": args.workers}),
+    ):
+        passwords.hashing.configure(config)  # seeding starts the pool before the timed run
+        seed_users(100)
+        result = run(app, args.threads, args.seconds)
+        print(f"{label:>10}: {result['logins_per_sec']:8.1f} logins/s   "
+              f"probe p50 {result['probe_p50_ms']:.2f} ms  p95 {result['probe_p95_ms']:.2f} ms")
+    passwords.hashing.get_hasher().shutdown()
+
+
+if __name__ == "__main__":
+    main()
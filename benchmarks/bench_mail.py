@@ -0,0 +1,118 @@
+"""
+Password-reset mail: request latency and delivery throughput.
+
+Runs against the in-process SMTP stub with a simulated handshake cost
+(TCP + TLS + AUTH round trips to a real provider) and per-message delivery
+cost. Reports /forgotpassword latency with mail queued versus the SMTP
+time the request used to wait for inline, then worker throughput with one
+reused connection versus a new connection per message.
+
+Usage:
+    python benchmarks/bench_mail.py [--messages 50] [--connect-ms 80] [--send-ms 10]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("PASSWORD_PEPPER", "bench-pepper")
+os.environ["DATA_BACKEND"] = "memory"
+os.environ["MAIL_WORKER"] = "false"  # the benchmark drives delivery itself
+os.environ["RATELIMIT_ENABLED"] = "false"  # every request comes from one address
+warnings.filterwarnings("ignore")
+
+import focusflow  # noqa: E402
+from focusflow import create_app  # noqa: E402
+from focusflow.repositories import get_repositories, reset_memory_backend  # noqa: E402
+from focusflow.services.mail import LocalSMTPServer, MailWorker, SMTPSender  # noqa: E402
+
+
+def make_app(server: LocalSMTPServer):
+    os.environ.update(MAIL_SERVER=server.host, MAIL_PORT=str(server.port), MAIL_USE_TLS="false")
+    app = create_app()
+    app.config.update(SESSION_COOKIE_SECURE=False)
+    focusflow.csrf.protect = lambda: None
+    return app
+
+
+def seed_users(count: int):
+    reset_memory_backend()
+    users = get_repositories("memory").users
+    for i in range(count):
+        users.create({"name": f"user{i}", "email": f"user{i}@bench.local", "password": "x"})
+
+
+def request_latency(app, count: int) -> list:
+    client = app.test_client()
+    latencies = []
+    for i in range(count):
+        t0 = time.perf_counter()
+        client.post("/forgotpassword", base_url="https://localhost",
+                    data={"email": f"user{i % 100}@bench.local"})
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return latencies
+
+
+def inline_send_latency(server: LocalSMTPServer, count: int) -> list:
+    """What each request used to spend on SMTP: connect, send, quit."""
+    worker = MailWorker(None, None, mail_from="bench@bench.local")
+    latencies = []
+    for i in range(count):
+        sender = SMTPSender(server.host, server.port, use_tls=False)
+        t0 = time.perf_counter()
+        sender.send(worker._build({"to": f"user{i}@bench.local", "subject": "reset", "body": "link"}))
+        sender.close()
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return latencies
+
+
+def drain(app, server: LocalSMTPServer, reuse: bool) -> tuple[float, int, int]:
+    sender = SMTPSender(server.host, server.port, use_tls=False)
+    worker = MailWorker(app, sender, mail_from="bench@bench.local", batch_size=1 if not reuse else 20)
+    connections_before, delivered_before = server.connections, len(server.messages)
+    t0 = time.perf_counter()
+    with app.app_context():
+        while True:
+            sent = worker.process_batch()
+            if not reuse:
+                sender.close()
+            if sent == 0:
+                break
+    sender.close()
+    return (time.perf_counter() - t0, len(server.messages) - delivered_before,
+            server.connections - connections_before)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=50)
+    parser.add_argument("--connect-ms", type=float, default=80.0)
+    parser.add_argument("--send-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    server = LocalSMTPServer(delay_seconds=args.send_ms / 1000,
+                             connect_delay_seconds=args.connect_ms / 1000).start()
+    app = make_app(server)
+    seed_users(100)
+
+    queued = request_latency(app, args.messages)
+    inline = inline_send_latency(server, min(args.messages, 20))
+    print(f"/forgotpassword (queued):  p50 {statistics.median(queued):7.2f} ms")
+    print(f"SMTP time inline sending added per request: p50 {statistics.median(inline):7.2f} ms")
+
+    for label, reuse in (("connection per message", False), ("reused connection", True)):
+        seed_users(100)
+        request_latency(app, args.messages)
+        elapsed, delivered, connections = drain(app, server, reuse)
+        print(f"{label:>24}: {delivered / elapsed:7.1f} msgs/s  "
+              f"({delivered} delivered over {connections} connections)")
+
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
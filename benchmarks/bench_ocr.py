@@ -0,0 +1,115 @@
+"""
+OCR of scanned PDFs: render-everything-then-OCR versus the page-streaming pool.
+
+Builds synthetic scanned PDFs (pages of text rasterized to images, so they
+have no text layer) and times OCR of each one:
+
+- legacy: ``convert_from_path`` at 300 dpi for the whole file, then
+  ``pytesseract`` page by page (skipped if pdf2image isn't installed)
+- pool-N: ``OcrEngine`` with N worker processes
+
+Each run happens in a fresh process, and the table shows wall time plus
+the peak RSS of that process and of its largest child (a pool worker or a
+tesseract subprocess), so memory that moved into the workers is counted.
+
+Requires PyMuPDF, Pillow, pytesseract and the tesseract binary.
+
+Usage:
+    python benchmarks/bench_ocr.py [--pages 10 50] [--workers 1 2 4]
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from focusflow.services.questions import ocr  # noqa: E402
+
+LINE = "The mitochondrion is the site of aerobic respiration in the cell {n}."
+
+
+def make_scanned_pdf(path: str, pages: int, dpi: int = 150) -> None:
+    """A PDF whose pages are images of text, like a scanner produces."""
+    import pymupdf as fitz
+
+    out = fitz.open()
+    for p in range(pages):
+        src = fitz.open()
+        page = src.new_page()
+        for row in range(40):
+            page.insert_text((50, 60 + row * 18), LINE.format(n=p * 40 + row), fontsize=11)
+        pixmap = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+        scanned = out.new_page(width=page.rect.width, height=page.rect.height)
+        scanned.insert_image(scanned.rect, pixmap=pixmap)
+        src.close()
+    out.save(path)
+    out.close()
+
+
+def run_legacy(path: str) -> int:
+    from pdf2image import convert_from_path
+    import pytesseract
+
+    images = convert_from_path(path, dpi=300)
+    return sum(len(pytesseract.image_to_string(img)) for img in images)
+
+
+def run_pool(path: str, workers: int) -> int:
+    engine = ocr.OcrEngine(workers=workers)
+    try:
+        return sum(len(text) for text in engine.ocr_pages(path))
+    finally:
+        engine.shutdown()
+
+
+def _measure(conn, fn, args) -> None:
+    t0 = time.perf_counter()
+    chars = fn(*args)
+    elapsed = time.perf_counter() - t0
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    child = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    conn.send((elapsed, own, child, chars))
+    conn.close()
+
+
+def measure(fn, *args) -> tuple:
+    """(seconds, peak MB of the process, peak MB of its largest child, characters) in a fresh process."""
+    parent, child = multiprocessing.Pipe(duplex=False)
+    proc = multiprocessing.get_context("fork").Process(target=_measure, args=(child, fn, args))
+    proc.start()
+    result = parent.recv()
+    proc.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    try:
+        import pdf2image  # noqa: F401
+        legacy = True
+    except ImportError:
+        print("pdf2image is not installed; measuring the pool only")
+        legacy = False
+
+    print(f"{'pages':>6} {'variant':>8} {'seconds':>9} {'peak MB':>8} {'child MB':>9} {'chars':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            path = os.path.join(tmp, f"scan-{pages}.pdf")
+            make_scanned_pdf(path, pages)
+            variants = [("legacy", run_legacy, (path,))] if legacy else []
+            variants += [(f"pool-{n}", run_pool, (path, n)) for n in args.workers]
+            for name, fn, fn_args in variants:
+                seconds, own, child, chars = measure(fn, *fn_args)
+                print(f"{pages:>6} {name:>8} {seconds:>9.1f} {own:>8.0f} {child:>9.0f} {chars:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Rate-limit storage: checks per second and cross-process accuracy.
+
+For each storage, measures how many limiter hits per second one thread can
+do (the per-request overhead the limiter adds), then forks several worker
+processes that all hit the same "100 per minute" limit and reports how many
+hits were admitted in total. A per-process storage admits workers x limit;
+a shared one admits the limit.
+
+The MongoDB storage is included when MONGODB_URI is set.
+
+Usage:
+    python benchmarks/bench_ratelimit.py [--hits 5000] [--processes 4]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from limits import parse, strategies  # noqa: E402
+from limits.storage import storage_from_string  # noqa: E402
+
+import focusflow.ratelimit  # noqa: E402,F401  (registers the focusflow storages)
+
+LIMIT = parse("100 per minute")
+STRATEGIES = {
+    "fixed": strategies.FixedWindowRateLimiter,
+    "moving": strategies.MovingWindowRateLimiter,
+}
+
+
+def hits_per_second(uri: str, strategy: str, hits: int) -> float:
+    limiter = STRATEGIES[strategy](storage_from_string(uri))
+    item = parse("1000000 per hour")
+    limiter.storage.clear(item.key_for("bench"))
+    t0 = time.perf_counter()
+    for _ in range(hits):
+        limiter.hit(item, "bench")
+    return hits / (time.perf_counter() - t0)
+
+
+def _admitted(args) -> int:
+    storage, strategy, attempts = args
+    limiter = STRATEGIES[strategy](storage if not isinstance(storage, str) else storage_from_string(storage))
+    return sum(limiter.hit(LIMIT, "shared") for _ in range(attempts))
+
+
+def admitted_across_processes(uri: str, strategy: str, processes: int) -> int:
+    storage = storage_from_string(uri)
+    storage.clear(LIMIT.key_for("shared"))
+    # memory:// is inherited by fork and diverges per process, which is the point
+    target = storage if uri.startswith("memory://") else uri
+    with multiprocessing.get_context("fork").Pool(processes) as pool:
+        return sum(pool.map(_admitted, [(target, strategy, LIMIT.amount)] * processes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hits", type=int, default=5000)
+    parser.add_argument("--processes", type=int, default=4)
+    args = parser.parse_args()
+
+    sqlite_path = os.path.join(tempfile.mkdtemp(), "ratelimit.db")
+    uris = ["memory://", f"sqlite:///{sqlite_path}"]
+    if os.getenv("MONGODB_URI"):
+        uris.append("focusflow-mongo://")
+
+    print(f"limit {LIMIT}, {args.processes} processes")
+    for uri in uris:
+        for strategy in STRATEGIES:
+            rate = hits_per_second(uri, strategy, args.hits)
+            admitted = admitted_across_processes(uri, strategy, args.processes)
+            print(f"{uri.split('://')[0]:>16} {strategy:>6}: {rate:10.0f} hits/s   admitted {admitted}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,259 @@
+"""
+MongoDB client management.
+
+A single MongoClient is kept per *process*. Forking servers (gunicorn, uWSGI
+prefork) copy the parent's client into every worker, which pymongo does not
+support, so the manager remembers the pid that built the client and rebuilds
+it transparently after a fork.
+
+Settings come from the environment (or app.config via ``init_app``):
+
+    MONGODB_URI                          connection string (required)
+    MONGODB_MAX_POOL_SIZE                max sockets per server (default 50)
+    MONGODB_MIN_POOL_SIZE                sockets kept warm (default 0)
+    MONGODB_MAX_IDLE_TIME_MS             close idle sockets after this long
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS        max wait for a free socket (default 2000)
+    MONGODB_CONNECT_TIMEOUT_MS           TCP connect timeout (default 5000)
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS  server selection timeout (default 5000)
+    MONGODB_SOCKET_TIMEOUT_MS            per-operation socket timeout
+    MONGODB_COMPRESSORS                  e.g. "zstd,snappy,zlib"
+    MONGODB_READ_CONCERN                 e.g. "local", "majority"
+    MONGODB_WRITE_CONCERN                e.g. "1", "majority"
+    MONGODB_READ_PREFERENCE              e.g. "primaryPreferred"
+    MONGODB_APPNAME                      shown in server logs (default focusflow)
+    MONGODB_WARM_ON_START                ping at startup instead of first request (default true)
+"""
+import logging
 import os
+import threading
 from pathlib import Path
+
 from dotenv import load_dotenv
-from pymongo import MongoClient
+from pymongo import MongoClient, monitoring
 
 load_dotenv(Path(__file__).resolve().parent / ".env")  # adjust if .env is elsewhere
 
-_client: MongoClient | None = None
+logger = logging.getLogger(__name__)
 
-def get_db():
-    global _client
-    if _client is None:
-        uri = os.getenv("MONGODB_URI")
+# Environment/config key -> MongoClient keyword argument
+_INT_OPTIONS = {
+    "MONGODB_MAX_POOL_SIZE": "maxPoolSize",
+    "MONGODB_MIN_POOL_SIZE": "minPoolSize",
+    "MONGODB_MAX_IDLE_TIME_MS": "maxIdleTimeMS",
+    "MONGODB_WAIT_QUEUE_TIMEOUT_MS": "waitQueueTimeoutMS",
+    "MONGODB_CONNECT_TIMEOUT_MS": "connectTimeoutMS",
+    "MONGODB_SERVER_SELECTION_TIMEOUT_MS": "serverSelectionTimeoutMS",
+    "MONGODB_SOCKET_TIMEOUT_MS": "socketTimeoutMS",
+}
+_STR_OPTIONS = {
+    "MONGODB_COMPRESSORS": "compressors",
+    "MONGODB_READ_CONCERN": "readConcernLevel",
+    "MONGODB_READ_PREFERENCE": "readPreference",
+    "MONGODB_APPNAME": "appname",
+}
+_DEFAULTS = {
+    "maxPoolSize": 50,
+    "waitQueueTimeoutMS": 2000,
+    "connectTimeoutMS": 5000,
+    "serverSelectionTimeoutMS": 5000,
+    "appname": "focusflow",
+}
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Tracks connection pool usage for the current process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.open = 0
+            self.checked_out = 0
+            self.peak_checked_out = 0
+            self.checkouts = 0
+            self.checkout_failures = 0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "open": self.open,
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+            }
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open = max(0, self.open - 1)
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checked_out += 1
+            self.checkouts += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+        logger.warning("MongoDB pool checkout failed (%s) - pool may be exhausted", event.reason)
+
+    # Remaining pool events are not interesting for usage stats
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_check_out_started(self, event): pass
+
+
+class MongoClientManager:
+    """Owns the process-wide MongoClient and rebuilds it after fork."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._client: MongoClient | None = None
+        self._pid: int | None = None
+        self._overrides: dict = {}
+        self._listeners: list = []
+        self.pool_stats = PoolStats()
+
+    def configure(self, config) -> None:
+        """Take MONGODB_* settings from a mapping (e.g. app.config)."""
+        self._overrides = {k: v for k, v in config.items() if k.startswith("MONGODB_")}
+        self.close()
+
+    def add_listener(self, listener) -> None:
+        """Attach a pymongo event listener; takes effect on the next client build."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+            self.close()
+
+    def _setting(self, key: str):
+        if key in self._overrides:
+            return self._overrides[key]
+        return os.getenv(key)
+
+    def client_options(self) -> dict:
+        options = dict(_DEFAULTS)
+        for key, name in _INT_OPTIONS.items():
+            value = self._setting(key)
+            if value not in (None, ""):
+                options[name] = int(value)
+        for key, name in _STR_OPTIONS.items():
+            value = self._setting(key)
+            if value not in (None, ""):
+                options[name] = value
+        write_concern = self._setting("MONGODB_WRITE_CONCERN")
+        if write_concern not in (None, ""):
+            write_concern = str(write_concern)
+            options["w"] = int(write_concern) if write_concern.isdigit() else write_concern
+        return options
+
+    def _build(self) -> MongoClient:
+        uri = self._setting("MONGODB_URI")
         if not uri:
             raise RuntimeError("MONGODB_URI not set")
-        _client = MongoClient(uri)
-        _client.admin.command("ping")  # fail fast if connection is wrong
-    return _client.get_database()
\ No newline at end of file
+        self.pool_stats.reset()
+        return MongoClient(
+            uri,
+            connect=False,  # sockets are opened lazily, never before a fork
+            event_listeners=[self.pool_stats, *self._listeners],
+            **self.client_options(),
+        )
+
+    @property
+    def client(self) -> MongoClient:
+        pid = os.getpid()
+        client = self._client
+        if client is not None and self._pid == pid:
+            return client
+        with self._lock:
+            if self._client is not None and self._pid != pid:
+                # Inherited from the parent process: its sockets belong to the
+                # parent, so drop the reference without closing them.
+                logger.info("Fork detected (pid %s -> %s), reconnecting to MongoDB", self._pid, pid)
+                self._client = None
+            if self._client is None:
+                self._client = self._build()
+                self._pid = pid
+            return self._client
+
+    def get_db(self):
+        return self.client.get_database()
+
+    def warm(self) -> bool:
+        """Open the pool and round-trip a ping so the first request doesn't pay for it."""
+        try:
+            self.client.admin.command("ping")
+            return True
+        except Exception as e:
+            logger.warning("MongoDB warm-up ping failed: %s", e)
+            return False
+
+    def close(self) -> None:
+        with self._lock:
+            if self._client is not None and self._pid == os.getpid():
+                self._client.close()
+            self._client = None
+            self._pid = None
+
+    def _after_fork_in_child(self) -> None:
+        # Locks may have been held by another thread at fork time.
+        had_client = self._client is not None
+        self._lock = threading.Lock()
+        self._client = None
+        self._pid = None
+        self.pool_stats = PoolStats()
+        # Only re-warm when the parent was actually serving (preloaded app);
+        # helper processes forked for other work never touch the database.
+        if had_client and self._warm_on_start():
+            threading.Thread(target=self.warm, name="mongo-warmup", daemon=True).start()
+
+    def _warm_on_start(self) -> bool:
+        value = self._setting("MONGODB_WARM_ON_START")
+        if value is None:
+            return True
+        return str(value).lower() in ("1", "true", "yes")
+
+    def stats(self) -> dict:
+        """Pool usage for this process."""
+        options = self.client_options()
+        return {
+            "pid": os.getpid(),
+            "connected": self._client is not None and self._pid == os.getpid(),
+            "max_pool_size": options.get("maxPoolSize"),
+            "min_pool_size": options.get("minPoolSize", 0),
+            **self.pool_stats.snapshot(),
+        }
+
+
+manager = MongoClientManager()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=manager._after_fork_in_child)
+
+
+def get_db():
+    return manager.get_db()
+
+
+def init_app(app) -> None:
+    """Apply app.config MONGODB_* settings and warm the pool for this worker."""
+    manager.configure(app.config)
+    if manager._warm_on_start() and manager._setting("MONGODB_URI"):
+        manager.warm()
+
+
+def pool_stats() -> dict:
+    return manager.stats()
@@ -6,12 +6,15 @@ from flask import Flask, jsonify, request
 from dotenv import load_dotenv
 from datetime import timedelta
 from flask_wtf.csrf import CSRFProtect, CSRFError
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
 from flask_talisman import Talisman
 from flask import render_template
+import db
+from . import indexes, instrumentation, ratelimit, repositories, serialization
+from .repositories import unit_of_work
+from .services import events, mail, notifications, passwords, questions, quiz_jobs, summary
 from .extensions import login_manager
 from .routes.main import main_bp
+from .routes.metrics import metrics_bp
 from .routes.auth import auth_bp
 from .routes.quiz import quiz_bp
 from .routes.dashboard import dashboard_bp
@@ -45,14 +48,17 @@ def create_app():
         SESSION_COOKIE_SECURE=not app.debug,# Only send cookies over HTTPS in prod
         PERMANENT_SESSION_LIFETIME=timedelta(days=7), # Keep sessions for a week
         WTF_CSRF_CHECK_DEFAULT=False,       # We'll use manual CSRF check (see below)
+        METRICS_TOKEN=os.getenv("METRICS_TOKEN"),  # Bearer token for /api/metrics/*
+        SERVER_TIMING=os.getenv("SERVER_TIMING", "true").lower() in ("1", "true", "yes"),
+        VERIFY_INDEXES=os.getenv("VERIFY_INDEXES", "true").lower() in ("1", "true", "yes"),
     )
 
+    # JSON responses encode ObjectId/datetime directly (orjson when installed)
+    serialization.init_app(app)
+
     # Initialize CSRF protection
     csrf.init_app(app)
 
-    # Apply rate limiting globally to prevent brute force/abuse
-    Limiter(get_remote_address, app=app, default_limits=["200 per day", "50 per hour"])
-    
     # Add security headers via Talisman
     Talisman(app, content_security_policy=None)
 
@@ -64,6 +70,31 @@ def create_app():
     # Create upload directory if it doesn't exist
     os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
 
+    # Data backend ("mongo" or "memory"); MongoDB client pool is warmed per worker
+    repositories.init_app(app)
+    if app.config["DATA_BACKEND"] == "mongo":
+        instrumentation.init_app(app)  # per-route command counts + Server-Timing
+        db.init_app(app)
+    # Dashboard events are published once the request's writes are flushed
+    # (after_request hooks run in reverse order of registration)
+    events.init_app(app)
+    unit_of_work.init_app(app)  # request-scoped identity map, flushed after the view
+
+    # Apply rate limiting globally to prevent brute force/abuse; counters live in
+    # shared storage so the limits hold across worker processes
+    ratelimit.init_app(app)
+
+    # scrypt hashing runs in a bounded process pool, started by the first hash
+    passwords.init_app(app)
+
+    # Outgoing mail is queued and delivered by a background worker
+    mail.init_app(app)
+
+    # Uploads are turned into quizzes by background extraction/generation workers;
+    # scanned PDFs are OCR'd page by page in a process pool
+    questions.init_app(app)
+    quiz_jobs.init_app(app)
+
     # Configure Flask-Login for authentication
     login_manager.init_app(app)
     login_manager.login_view = "auth.login" # Redirect here if @login_required fails
@@ -73,7 +104,17 @@ def create_app():
     app.register_blueprint(auth_bp)      # Auth system
     app.register_blueprint(quiz_bp)      # Quiz system
     app.register_blueprint(dashboard_bp) # Dashboard & internal API
+    app.register_blueprint(metrics_bp)   # Protected operational metrics
     
+    # `flask rebuild-summaries` repairs the dashboard read model
+    summary.init_app(app)
+
+    # `flask compact-notifications` applies notification retention to existing data
+    notifications.init_app(app)
+
+    # Warn about missing indexes; `flask create-indexes` builds them
+    indexes.init_app(app)
+
     # Custom Request Hook for selective CSRF protection
     @app.before_request
     def csrf_protect():
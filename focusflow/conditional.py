@@ -0,0 +1,76 @@
+"""
+Conditional GET for the polled dashboard JSON APIs.
+
+Every user has a version counter per resource ("tasks", "notifications",
+"rewards") that the write paths bump after changing the data. A view
+decorated with ``@conditional_get("tasks")`` answers with a strong ETag
+derived from the user, the counter and the query string; a request whose
+If-None-Match carries the current ETag gets a 304 after one _id lookup on
+``resource_versions``, without running the view.
+
+The counter is read before the view runs and bumped after each write, so a
+response can only be labelled with an older version than its data (which
+costs one extra full response), never a newer one.
+"""
+import functools
+import hashlib
+import logging
+
+from flask import make_response, request
+from flask_login import current_user
+
+from .repositories import get_repositories
+
+logger = logging.getLogger(__name__)
+
+RESOURCES = ("tasks", "notifications", "rewards")
+
+# Bump when a response format changes so clients drop representations cached before it
+FORMAT_VERSION = 3
+
+
+def bump_version(user_id, *resources: str) -> None:
+    """Record that the user's ``resources`` changed; call after the write."""
+    unknown = set(resources) - set(RESOURCES)
+    if unknown:
+        raise ValueError(f"Unknown resources: {sorted(unknown)}")
+    try:
+        get_repositories().resource_versions.bump(user_id, resources)
+    except Exception as e:
+        # Cached representations of this resource stay valid until the next bump
+        logger.error(f"Could not bump {resources} version for user {user_id}: {e}")
+
+
+def resource_etag(user_id, resource: str) -> str:
+    """The current ETag (unquoted) of one user's resource, for this request's query string."""
+    epoch, version = get_repositories().resource_versions.current(user_id, resource)
+    scope = hashlib.sha1(f"{user_id}|{request.query_string.decode()}".encode()).hexdigest()[:12]
+    return f"{resource}-{FORMAT_VERSION}.{epoch}.{version}-{scope}"
+
+
+def conditional_get(resource: str):
+    """Serve a login-protected GET view with an ETag, answering If-None-Match with 304."""
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                etag = resource_etag(current_user.id, resource)
+            except Exception as e:
+                logger.warning(f"Serving {request.path} without an ETag: {e}")
+                etag = None
+
+            if etag is not None and request.if_none_match.contains(etag):
+                response = make_response("", 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if etag is None or response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            # Private data: the browser may store it but must revalidate every time
+            response.headers["Cache-Control"] = "private, no-cache"
+            return response
+
+        return wrapper
+
+    return decorator
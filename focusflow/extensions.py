@@ -1,3 +1,8 @@
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
 from flask_login import LoginManager
 
 login_manager = LoginManager()
+
+# One limiter for the whole app; storage is chosen in ratelimit.init_app
+limiter = Limiter(get_remote_address, default_limits=["200 per day", "50 per hour"])
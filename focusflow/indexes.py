@@ -0,0 +1,121 @@
+"""
+Index registry.
+
+Services declare the indexes their queries rely on with ``declare_index``
+next to the code that runs those queries. ``flask create-indexes`` builds
+them (idempotently - createIndexes is a no-op for an identical index) and
+the app logs a warning at startup for any declared index that is missing.
+"""
+import logging
+from dataclasses import dataclass, field
+
+import click
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """A single index declaration."""
+    collection: str
+    keys: tuple
+    name: str
+    options: dict = field(default_factory=dict, compare=False, hash=False)
+
+
+_REGISTRY: dict[tuple, IndexSpec] = {}
+
+
+def declare_index(collection: str, keys, **options) -> IndexSpec:
+    """
+    Declare an index on a collection.
+
+    Args:
+        collection: Collection name
+        keys: List of (field, direction) pairs, or a single field name
+        **options: Extra createIndex options (unique, sparse, expireAfterSeconds,
+            partialFilterExpression, name)
+    """
+    if isinstance(keys, str):
+        keys = [(keys, 1)]
+    keys = tuple((k, d) for k, d in keys)
+    name = options.pop("name", None) or "_".join(f"{k}_{d}" for k, d in keys)
+    spec = IndexSpec(collection, keys, name, options)
+    _REGISTRY[(collection, name)] = spec
+    return spec
+
+
+def declared_indexes() -> list[IndexSpec]:
+    """Return all declared indexes, grouped by collection."""
+    return sorted(_REGISTRY.values(), key=lambda s: (s.collection, s.name))
+
+
+def ensure_indexes(db) -> dict:
+    """
+    Create every declared index.
+
+    Returns a mapping of "collection.name" -> "ok" or an error message. One
+    failing index (e.g. a unique index over duplicate data) does not stop
+    the others from being built.
+    """
+    results = {}
+    for spec in declared_indexes():
+        label = f"{spec.collection}.{spec.name}"
+        try:
+            db[spec.collection].create_index(list(spec.keys), name=spec.name, **spec.options)
+            results[label] = "ok"
+        except Exception as e:
+            logger.error(f"Failed to create index {label}: {e}")
+            results[label] = str(e)
+    return results
+
+
+def missing_indexes(db) -> list[IndexSpec]:
+    """Return declared indexes that do not exist (matched by key pattern)."""
+    missing = []
+    existing_by_collection = {}
+    for spec in declared_indexes():
+        if spec.collection not in existing_by_collection:
+            info = db[spec.collection].index_information()
+            existing_by_collection[spec.collection] = {tuple(ix["key"]) for ix in info.values()}
+        if spec.keys not in existing_by_collection[spec.collection]:
+            missing.append(spec)
+    return missing
+
+
+def verify_indexes(db) -> list[IndexSpec]:
+    """Log a warning for each missing index; never raises."""
+    try:
+        missing = missing_indexes(db)
+    except Exception as e:
+        logger.warning(f"Could not verify indexes: {e}")
+        return []
+    for spec in missing:
+        logger.warning(
+            f"Missing index {spec.collection}.{spec.name} {list(spec.keys)} - "
+            "run 'flask create-indexes'"
+        )
+    return missing
+
+
+def init_app(app) -> None:
+    """Register the create-indexes CLI command and run the startup check."""
+    from .repositories import get_database
+
+    @app.cli.command("create-indexes")
+    def create_indexes_command():
+        """Create all declared MongoDB indexes."""
+        results = ensure_indexes(get_database())
+        for label, status in results.items():
+            click.echo(f"{label}: {status}")
+        if any(status != "ok" for status in results.values()):
+            raise SystemExit(1)
+
+    if app.config.get("VERIFY_INDEXES", True):
+        try:
+            with app.app_context():
+                db = get_database()
+        except RuntimeError as e:
+            logger.warning(f"Skipping index check: {e}")
+            return
+        verify_indexes(db)
@@ -0,0 +1,172 @@
+"""
+MongoDB command instrumentation.
+
+A pymongo CommandListener tags every command with the Flask endpoint that
+issued it and aggregates, per route: command count, total/max latency and
+documents returned (and, with DB_METRICS_BYTES enabled, their BSON size, to
+see what field projections save). Each response carries a Server-Timing header with the
+request's own numbers, and the aggregate is served (behind METRICS_TOKEN)
+by the metrics blueprint, so N+1 patterns and slow queries are visible in
+production.
+"""
+import os
+import threading
+from collections import defaultdict
+
+import bson
+from flask import g, has_request_context, request
+from pymongo import monitoring
+
+NO_REQUEST = "<no-request>"
+
+
+def _endpoint() -> str:
+    if has_request_context():
+        return request.endpoint or request.path
+    return NO_REQUEST
+
+
+def _returned(reply) -> list:
+    """The documents (or distinct values) in a command reply."""
+    if not isinstance(reply, dict):
+        return []
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        batch = cursor.get("firstBatch", cursor.get("nextBatch"))
+        return batch if isinstance(batch, list) else []
+    if "value" in reply:  # findAndModify
+        return [reply["value"]] if reply["value"] is not None else []
+    if isinstance(reply.get("values"), list):  # distinct
+        return reply["values"]
+    return []
+
+
+def _docs_returned(reply) -> int:
+    """Number of documents in a command reply."""
+    return len(_returned(reply))
+
+
+def _bytes_returned(reply) -> int:
+    """BSON size of the documents in a command reply."""
+    return sum(len(bson.encode(doc)) for doc in _returned(reply) if isinstance(doc, dict))
+
+
+def _new_route_stats() -> dict:
+    return {
+        "requests": 0,
+        "commands": 0,
+        "failures": 0,
+        "total_ms": 0.0,
+        "max_ms": 0.0,
+        "docs_returned": 0,
+        "bytes_returned": 0,
+        "max_commands_per_request": 0,
+        "by_command": defaultdict(int),
+    }
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Per-route aggregation of MongoDB command events."""
+
+    def __init__(self):
+        # Re-encoding replies costs CPU, so sizes are only measured on request
+        self.measure_bytes = False
+        self._lock = threading.Lock()
+        self._pending: dict = {}
+        self._routes: dict = defaultdict(_new_route_stats)
+
+    # --- pymongo listener interface -------------------------------------
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        self._pending[(event.connection_id, event.request_id)] = (
+            _endpoint(),
+            collection if isinstance(collection, str) else None,
+        )
+
+    def succeeded(self, event):
+        size = _bytes_returned(event.reply) if self.measure_bytes else 0
+        self._finish(event, _docs_returned(event.reply), size, failed=False)
+
+    def failed(self, event):
+        self._finish(event, 0, 0, failed=True)
+
+    # -------------------------------------------------------------------
+
+    def _finish(self, event, docs: int, size: int, failed: bool):
+        endpoint, collection = self._pending.pop(
+            (event.connection_id, event.request_id), (_endpoint(), None)
+        )
+        ms = event.duration_micros / 1000.0
+        label = f"{event.command_name}:{collection}" if collection else event.command_name
+
+        with self._lock:
+            stats = self._routes[endpoint]
+            stats["commands"] += 1
+            stats["total_ms"] += ms
+            stats["max_ms"] = max(stats["max_ms"], ms)
+            stats["docs_returned"] += docs
+            stats["bytes_returned"] += size
+            stats["by_command"][label] += 1
+            if failed:
+                stats["failures"] += 1
+
+        # Commands run on the requesting thread, so g is this request's g
+        if has_request_context() and endpoint != NO_REQUEST:
+            current = g.setdefault(
+                "db_metrics", {"commands": 0, "total_ms": 0.0, "docs_returned": 0, "bytes_returned": 0}
+            )
+            current["commands"] += 1
+            current["total_ms"] += ms
+            current["docs_returned"] += docs
+            current["bytes_returned"] += size
+
+    def record_request(self, endpoint: str, commands: int) -> None:
+        with self._lock:
+            stats = self._routes[endpoint]
+            stats["requests"] += 1
+            stats["max_commands_per_request"] = max(stats["max_commands_per_request"], commands)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            out = {}
+            for endpoint, stats in self._routes.items():
+                row = dict(stats, by_command=dict(stats["by_command"]))
+                row["total_ms"] = round(row["total_ms"], 3)
+                row["max_ms"] = round(row["max_ms"], 3)
+                row["avg_commands_per_request"] = (
+                    round(row["commands"] / row["requests"], 2) if row["requests"] else None
+                )
+                out[endpoint] = row
+            return out
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+command_metrics = CommandMetrics()
+
+
+def init_app(app) -> None:
+    """Attach the listener to the MongoDB client and emit Server-Timing headers."""
+    import db
+
+    measure = app.config.get("DB_METRICS_BYTES")
+    if measure is None:
+        measure = os.getenv("DB_METRICS_BYTES", "false").lower() in ("1", "true", "yes")
+    command_metrics.measure_bytes = bool(measure)
+    db.manager.add_listener(command_metrics)
+
+    @app.after_request
+    def add_server_timing(response):
+        current = g.pop("db_metrics", None)
+        commands = current["commands"] if current else 0
+        if request.endpoint:
+            command_metrics.record_request(request.endpoint, commands)
+        if current and app.config.get("SERVER_TIMING", True):
+            desc = f'{commands} queries, {current["docs_returned"]} docs'
+            if command_metrics.measure_bytes:
+                desc += f', {current["bytes_returned"]} bytes'
+            response.headers.add("Server-Timing", f'db;dur={current["total_ms"]:.2f};desc="{desc}"')
+        return response
@@ -0,0 +1,220 @@
+"""
+Rate-limit storage shared by every worker process.
+
+Flask-Limiter's default in-memory storage keeps separate counters in each
+process, so with N workers a client effectively gets N times the limit.
+Two shared storages are registered with ``limits`` here:
+
+    focusflow-mongo://         counters in the app's own MongoDB database,
+                               through the already-pooled client (no second
+                               connection pool). Fixed window is a single
+                               atomic findAndModify per limit; expired keys
+                               are removed by TTL indexes.
+    sqlite:///path/to/file.db  single-host deployments without MongoDB: one
+                               WAL-mode file shared by all local workers.
+
+Configuration (environment or app.config):
+    RATELIMIT_STORAGE_URI  default focusflow-mongo:// on the mongo backend,
+                           memory:// on the memory backend
+    RATELIMIT_STRATEGY     fixed-window (default) or moving-window
+    RATELIMIT_ENABLED      set to false to disable limiting (benchmarks)
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from limits.storage import MovingWindowSupport, Storage
+from limits.storage.mongodb import MongoDBStorageBase
+
+from .extensions import limiter
+from .indexes import declare_index
+from .runtime import setting
+
+COUNTERS = "rate_limit_counters"
+WINDOWS = "rate_limit_windows"
+
+# Documents carry their own expiry time
+declare_index(COUNTERS, "expireAt", expireAfterSeconds=0)
+declare_index(WINDOWS, "expireAt", expireAfterSeconds=0)
+
+
+class MongoStorage(MongoDBStorageBase):
+    """limits' MongoDB storage, bound to the app's per-process MongoClient."""
+
+    STORAGE_SCHEME = ["focusflow-mongo"]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, **options):
+        super().__init__(
+            uri,
+            counter_collection_name=COUNTERS,
+            window_collection_name=WINDOWS,
+            wrap_exceptions=wrap_exceptions,
+        )
+
+    @property
+    def storage(self):
+        import db
+        return db.manager.client
+
+    @property
+    def _database(self):
+        import db
+        return db.manager.get_db()
+
+    def _init_mongo_client(self, uri, **options):
+        return self.storage
+
+    def check(self) -> bool:
+        try:
+            self.storage.admin.command("ping")
+            return True
+        except Exception:
+            return False
+
+    def __del__(self):
+        # The client belongs to db.manager; never close it from here
+        pass
+
+
+class SQLiteStorage(Storage, MovingWindowSupport):
+    """Fixed and moving window counters in a local SQLite file."""
+
+    STORAGE_SCHEME = ["sqlite"]
+    PURGE_EVERY = 1000  # writes between sweeps of expired rows
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, timeout: float = 5.0, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions)
+        path = uri.split("://", 1)[1]
+        path = path[1:] if path.startswith("/") else path
+        self.path = path or os.path.join(tempfile.gettempdir(), "focusflow-ratelimit.db")
+        self.timeout = timeout
+        self._local = threading.local()
+        self._writes = 0
+        self._init_schema()
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread, rebuilt in forked children
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _init_schema(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS counters "
+            "(key TEXT PRIMARY KEY, count INTEGER NOT NULL, expire_at REAL NOT NULL) WITHOUT ROWID"
+        )
+        conn.execute("CREATE TABLE IF NOT EXISTS windows (key TEXT NOT NULL, ts REAL NOT NULL, expire_at REAL NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS windows_key_ts ON windows (key, ts)")
+
+    def _maybe_purge(self, conn, now: float) -> None:
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            conn.execute("DELETE FROM counters WHERE expire_at <= ?", (now,))
+            conn.execute("DELETE FROM windows WHERE expire_at <= ?", (now,))
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        conn = self._connection()
+        (count,) = conn.execute(
+            "INSERT INTO counters (key, count, expire_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET "
+            "count = CASE WHEN counters.expire_at <= ? THEN excluded.count ELSE counters.count + excluded.count END, "
+            "expire_at = CASE WHEN counters.expire_at <= ? THEN excluded.expire_at ELSE counters.expire_at END "
+            "RETURNING count",
+            (key, amount, now + expiry, now, now),
+        ).fetchone()
+        self._maybe_purge(conn, now)
+        return count
+
+    def get(self, key: str) -> int:
+        row = self._connection().execute(
+            "SELECT count FROM counters WHERE key = ? AND expire_at > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key: str) -> float:
+        now = time.time()
+        row = self._connection().execute(
+            "SELECT expire_at FROM counters WHERE key = ? AND expire_at > ?", (key, now)
+        ).fetchone()
+        return row[0] if row else now
+
+    def check(self) -> bool:
+        try:
+            self._connection().execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int | None:
+        conn = self._connection()
+        removed = conn.execute("SELECT (SELECT COUNT(*) FROM counters) + (SELECT COUNT(DISTINCT key) FROM windows)").fetchone()[0]
+        conn.execute("DELETE FROM counters")
+        conn.execute("DELETE FROM windows")
+        return removed
+
+    def clear(self, key: str) -> None:
+        conn = self._connection()
+        conn.execute("DELETE FROM counters WHERE key = ?", (key,))
+        conn.execute("DELETE FROM windows WHERE key = ?", (key,))
+
+    def acquire_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")  # serialises the count-then-insert across processes
+        try:
+            (count,) = conn.execute(
+                "SELECT COUNT(*) FROM windows WHERE key = ? AND ts > ?", (key, now - expiry)
+            ).fetchone()
+            if count + amount > limit:
+                conn.execute("ROLLBACK")
+                return False
+            conn.executemany(
+                "INSERT INTO windows (key, ts, expire_at) VALUES (?, ?, ?)",
+                [(key, now, now + expiry)] * amount,
+            )
+            self._maybe_purge(conn, now)
+            conn.execute("COMMIT")
+            return True
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get_moving_window(self, key: str, limit: int, expiry: int) -> tuple[float, int]:
+        now = time.time()
+        oldest, count = self._connection().execute(
+            "SELECT MIN(ts), COUNT(*) FROM windows WHERE key = ? AND ts > ?", (key, now - expiry)
+        ).fetchone()
+        return (oldest if oldest is not None else now), count
+
+
+def init_app(app) -> None:
+    """Point the shared limiter at the configured storage and attach it to the app."""
+    config = app.config
+    uri = setting(config, "RATELIMIT_STORAGE_URI")
+    if uri is None:
+        uri = "focusflow-mongo://" if config.get("DATA_BACKEND") == "mongo" else "memory://"
+    config["RATELIMIT_STORAGE_URI"] = uri
+    config["RATELIMIT_STRATEGY"] = setting(config, "RATELIMIT_STRATEGY", "fixed-window")
+    config["RATELIMIT_ENABLED"] = str(setting(config, "RATELIMIT_ENABLED", "true")).lower() in ("1", "true", "yes")
+    if not uri.startswith("memory://"):
+        # A storage outage degrades to per-process limits instead of failing requests
+        config.setdefault("RATELIMIT_IN_MEMORY_FALLBACK_ENABLED", True)
+    limiter.init_app(app)
@@ -0,0 +1,134 @@
+"""
+Repositories module.
+Data access for every collection the app uses, with a MongoDB backend and
+an in-memory backend that behaves the same.
+
+Select the backend with the DATA_BACKEND setting ("mongo" or "memory").
+Routes and services call ``get_repositories()`` instead of touching
+collections directly, so queries can be tuned in one place.
+"""
+import os
+import threading
+
+from flask import current_app, has_app_context
+
+from .base import PROJECTION_GUARD_MODES, UnprojectedReadError, as_object_id
+from .dashboard import DashboardRepository, MongoDashboardRepository
+from .events import EventLogRepository
+from .extraction_cache import ExtractionCacheRepository
+from .focus_sessions import FocusSessionRepository
+from .generation_cache import GenerationCacheRepository
+from .mail_outbox import MailOutboxRepository
+from .memory import MemoryDatabase
+from .notifications import NotificationRepository
+from .profiles import ProfileRepository
+from .quiz_jobs import QuizJobRepository
+from .rewards import RewardRepository
+from .streaks import StreakEventRepository
+from .summaries import UserSummaryRepository
+from .tasks import TaskRepository
+from .users import UserRepository
+from .versions import ResourceVersionRepository
+
+BACKENDS = ("mongo", "memory")
+
+_memory_db = MemoryDatabase()
+_instances: dict = {}
+_lock = threading.Lock()
+
+
+class Repositories:
+    """All repositories bound to one backend."""
+
+    def __init__(self, db_factory, backend: str):
+        self.backend = backend
+        self.db_factory = db_factory
+        self.users = UserRepository(db_factory)
+        self.tasks = TaskRepository(db_factory)
+        self.notifications = NotificationRepository(db_factory)
+        self.streak_events = StreakEventRepository(db_factory)
+        self.rewards = RewardRepository(db_factory)
+        self.focus_sessions = FocusSessionRepository(db_factory)
+        self.profiles = ProfileRepository(db_factory)
+        self.user_summaries = UserSummaryRepository(db_factory)
+        self.resource_versions = ResourceVersionRepository(db_factory)
+        self.mail_outbox = MailOutboxRepository(db_factory)
+        self.quiz_jobs = QuizJobRepository(db_factory)
+        self.extraction_cache = ExtractionCacheRepository(db_factory)
+        self.generation_cache = GenerationCacheRepository(db_factory)
+        self.events = EventLogRepository(db_factory)
+        # Multi-collection reads get a backend-specific implementation
+        dashboard_cls = MongoDashboardRepository if backend == "mongo" else DashboardRepository
+        self.dashboard = dashboard_cls(db_factory)
+
+
+def _mongo_db():
+    from db import get_db
+    return get_db()
+
+
+def _memory_db_factory():
+    return _memory_db
+
+
+def current_backend() -> str:
+    if has_app_context():
+        return current_app.config.get("DATA_BACKEND", "mongo")
+    return os.getenv("DATA_BACKEND", "mongo")
+
+
+def get_repositories(backend: str | None = None) -> Repositories:
+    """Return the repositories for the configured (or given) backend."""
+    backend = backend or current_backend()
+    repos = _instances.get(backend)
+    if repos is None:
+        if backend not in BACKENDS:
+            raise RuntimeError(f"Unknown DATA_BACKEND: {backend}")
+        with _lock:
+            repos = _instances.get(backend)
+            if repos is None:
+                factory = _memory_db_factory if backend == "memory" else _mongo_db
+                repos = _instances[backend] = Repositories(factory, backend)
+    return repos
+
+
+def get_database():
+    """The raw database behind the current backend (for index management and CLI tools)."""
+    return get_repositories().db_factory()
+
+
+def reset_memory_backend() -> None:
+    """Drop all in-memory data, keeping declared indexes (benchmarks/load tests)."""
+    global _memory_db
+    from ..indexes import ensure_indexes
+    _memory_db = MemoryDatabase()
+    ensure_indexes(_memory_db)
+
+
+def init_app(app) -> None:
+    """
+    Read DATA_BACKEND and PROJECTION_GUARD (default "warn" in debug mode, else
+    "off"); the memory backend gets the declared indexes built up front.
+    """
+    backend = app.config.setdefault("DATA_BACKEND", os.getenv("DATA_BACKEND", "mongo"))
+    if backend not in BACKENDS:
+        raise RuntimeError(f"Unknown DATA_BACKEND: {backend}")
+    guard = app.config.setdefault(
+        "PROJECTION_GUARD", os.getenv("PROJECTION_GUARD") or ("warn" if app.debug else "off")
+    )
+    if guard not in PROJECTION_GUARD_MODES:
+        raise RuntimeError(f"Unknown PROJECTION_GUARD: {guard}")
+    if backend == "memory":
+        from ..indexes import ensure_indexes
+        ensure_indexes(_memory_db)
+
+
+__all__ = [
+    'Repositories',
+    'get_repositories',
+    'get_database',
+    'reset_memory_backend',
+    'as_object_id',
+    'UnprojectedReadError',
+    'MemoryDatabase',
+]
@@ -0,0 +1,89 @@
+"""
+Shared repository plumbing.
+
+Repositories over collections with large documents or many documents per
+user set ``projection_required``; a read of them that names no fields is
+flagged according to the PROJECTION_GUARD setting: "warn" logs the calling
+line once, "raise" raises UnprojectedReadError, "off" (the default outside
+debug mode) does nothing.
+"""
+import logging
+import os
+import sys
+
+from bson.objectid import ObjectId
+from flask import current_app, has_app_context
+
+logger = logging.getLogger(__name__)
+
+PROJECTION_GUARD_MODES = ("off", "warn", "raise")
+
+_REPOSITORIES_DIR = os.path.dirname(os.path.abspath(__file__))
+_flagged: set = set()
+
+
+class UnprojectedReadError(RuntimeError):
+    """A whole-document read of a collection that requires projections."""
+
+
+def as_object_id(value) -> ObjectId:
+    """Convert a string id to ObjectId (raises bson.errors.InvalidId if malformed)."""
+    return value if isinstance(value, ObjectId) else ObjectId(value)
+
+
+def as_projection(fields):
+    """Turn an iterable of field names into a projection (None = whole document)."""
+    if fields is None:
+        return None
+    if isinstance(fields, dict):
+        return fields
+    return {f: 1 for f in fields}
+
+
+def _caller() -> str:
+    """file:line of the innermost frame outside the repositories package."""
+    frame = sys._getframe(1)
+    while frame is not None and os.path.abspath(frame.f_code.co_filename).startswith(_REPOSITORIES_DIR):
+        frame = frame.f_back
+    if frame is None:
+        return "<unknown>"
+    return f"{os.path.relpath(frame.f_code.co_filename)}:{frame.f_lineno}"
+
+
+def _flag_unprojected(collection_name: str) -> None:
+    mode = current_app.config.get("PROJECTION_GUARD", "off") if has_app_context() else "off"
+    if mode == "off":
+        return
+    site = _caller()
+    message = f"Unprojected read of {collection_name} from {site}; pass the fields it needs"
+    if mode == "raise":
+        raise UnprojectedReadError(message)
+    if (collection_name, site) not in _flagged:
+        _flagged.add((collection_name, site))
+        logger.warning(message)
+
+
+class Repository:
+    """
+    Base class for a repository over one collection.
+
+    ``db_factory`` returns the backing database on every call: for MongoDB
+    that is ``db.get_db`` (so a post-fork client rebuild is picked up), for
+    the in-memory backend it returns a shared MemoryDatabase.
+    """
+    collection_name: str = ""
+    # Reads without a field list are flagged by the projection guard
+    projection_required: bool = False
+
+    def __init__(self, db_factory):
+        self._db_factory = db_factory
+
+    @property
+    def collection(self):
+        return self._db_factory()[self.collection_name]
+
+    def projection(self, fields):
+        """``as_projection(fields)``, flagging whole-document reads where projections are required."""
+        if fields is None and self.projection_required:
+            _flag_unprojected(self.collection_name)
+        return as_projection(fields)
@@ -0,0 +1,55 @@
+"""
+Base for caches of computed results keyed by a content digest.
+
+``_id`` is the cache key; besides the payload fields each entry has
+``created_at``, ``last_used_at`` and, if the subclass stores one, a
+``size`` in bytes that eviction by total size adds up.
+"""
+from pymongo.errors import DuplicateKeyError
+
+from .base import Repository
+
+
+class ContentCacheRepository(Repository):
+    # Payload fields returned by get()
+    fields: tuple = ()
+
+    def get(self, key: str) -> dict | None:
+        projection = {field: 1 for field in self.fields}
+        projection["last_used_at"] = 1
+        return self.collection.find_one({"_id": key}, projection)
+
+    def touch(self, key: str, now) -> None:
+        self.collection.update_one({"_id": key}, {"$set": {"last_used_at": now}})
+
+    def put(self, key: str, now, **fields) -> None:
+        try:
+            self.collection.insert_one({"_id": key, **fields, "created_at": now, "last_used_at": now})
+        except DuplicateKeyError:
+            pass  # another worker stored the same result first
+
+    def delete(self, key: str) -> None:
+        self.collection.delete_one({"_id": key})
+
+    def evict_to(self, max_entries: int | None = None, max_bytes: int | None = None) -> int:
+        """
+        Delete the least recently used entries beyond the newest ``max_entries``
+        or ``max_bytes`` (by ``size``); returns how many.
+        """
+        entries = total = 0
+        overflow = []
+        for doc in self.collection.find({}, {"size": 1}).sort([("last_used_at", -1)]):
+            entries += 1
+            total += doc.get("size", 0)
+            if (max_entries is not None and entries > max_entries) or (max_bytes is not None and total > max_bytes):
+                overflow.append(doc["_id"])
+        if not overflow:
+            return 0
+        return self.collection.delete_many({"_id": {"$in": overflow}}).deleted_count
+
+    def stats(self) -> dict:
+        entries = total = 0
+        for doc in self.collection.find({}, {"size": 1}):
+            entries += 1
+            total += doc.get("size", 0)
+        return {"entries": entries, "bytes": total}
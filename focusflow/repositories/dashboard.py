@@ -0,0 +1,113 @@
+"""
+Dashboard read: everything the dashboard page shows for one user.
+Counters come from the user's summary document (see services/summary).
+
+The base class composes the per-collection reads (used by the in-memory
+backend); the MongoDB subclass builds the same result with one
+aggregation on the user document, so rendering the dashboard costs a
+single round trip however many sections it has.
+"""
+from .base import Repository, as_object_id, as_projection
+from .notifications import LIVE, unexpired
+from .pagination import DEFAULT_PAGE_SIZE, fetch_page, split_page
+from .summaries import SUMMARY_FIELDS
+
+NOTIFICATION_FIELDS = ("type", "payload", "status", "sentAt")
+REWARD_FIELDS = ("reward_id", "earned_at")
+PROFILE_FIELDS = ("studyPrefs",)
+
+# Open tasks offered in the "Link to Task" picker, newest first
+OPEN_TASK_LIMIT = 200
+OPEN_TASK_FIELDS = ("title",)
+
+
+class DashboardRepository(Repository):
+    collection_name = "users"
+
+    def snapshot(self, user_id, page_size: int = DEFAULT_PAGE_SIZE) -> dict | None:
+        """
+        Return {"summary", "open_tasks", "notifications",
+        "notifications_cursor", "rewards", "profile"} for a user (only the
+        fields the dashboard renders, first page of notifications), or None
+        if the user does not exist. "open_tasks" lists the titles of undone
+        tasks (the task list itself is fetched from /api/tasks).
+        "summary" is None until it has been built.
+        """
+        db = self._db_factory()
+        user_oid = as_object_id(user_id)
+        if db["users"].find_one({"_id": user_oid}, {"_id": 1}) is None:
+            return None
+        notifications, notifications_cursor = fetch_page(
+            db["notifications"], {"userId": user_oid, "status": LIVE, "expireAt": unexpired()}, "sentAt",
+            page_size, projection=as_projection(NOTIFICATION_FIELDS),
+        )
+        return {
+            "summary": db["user_summaries"].find_one({"_id": user_oid}, as_projection(SUMMARY_FIELDS)),
+            "notifications": notifications,
+            "notifications_cursor": notifications_cursor,
+            "open_tasks": list(
+                db["tasks"].find({"user_id": user_oid, "done": {"$ne": True}}, as_projection(OPEN_TASK_FIELDS))
+                .sort([("created_at", -1), ("_id", -1)]).limit(OPEN_TASK_LIMIT)
+            ),
+            "rewards": list(db["rewards"].find({"user_id": user_oid}, as_projection(REWARD_FIELDS))),
+            "profile": db["profiles"].find_one({"user_id": user_oid}, as_projection(PROFILE_FIELDS)),
+        }
+
+
+def _lookup(collection: str, foreign_key: str, pipeline: list, output: str) -> dict:
+    # localField/foreignField together with a pipeline needs MongoDB 5.0+; the
+    # equality match uses each collection's user_id/userId index
+    return {
+        "$lookup": {
+            "from": collection,
+            "localField": "_id",
+            "foreignField": foreign_key,
+            "pipeline": pipeline,
+            "as": output,
+        }
+    }
+
+
+class MongoDashboardRepository(DashboardRepository):
+    """Same result as the base class, from a single aggregate() call."""
+
+    def snapshot(self, user_id, page_size: int = DEFAULT_PAGE_SIZE) -> dict | None:
+        pipeline = [
+            {"$match": {"_id": as_object_id(user_id)}},
+            {"$project": {"_id": 1}},
+            _lookup("user_summaries", "_id", [
+                {"$project": as_projection(SUMMARY_FIELDS)},
+            ], "summary"),
+            _lookup("notifications", "userId", [
+                {"$match": {"status": LIVE, "expireAt": unexpired()}},
+                {"$sort": {"sentAt": -1, "_id": -1}},
+                {"$limit": page_size + 1},
+                {"$project": as_projection(NOTIFICATION_FIELDS)},
+            ], "notifications"),
+            _lookup("tasks", "user_id", [
+                {"$match": {"done": {"$ne": True}}},
+                {"$sort": {"created_at": -1, "_id": -1}},
+                {"$limit": OPEN_TASK_LIMIT},
+                {"$project": as_projection(OPEN_TASK_FIELDS)},
+            ], "open_tasks"),
+            _lookup("rewards", "user_id", [
+                {"$project": as_projection(REWARD_FIELDS)},
+            ], "rewards"),
+            _lookup("profiles", "user_id", [
+                {"$limit": 1},
+                {"$project": as_projection(PROFILE_FIELDS)},
+            ], "profile"),
+        ]
+        docs = list(self.collection.aggregate(pipeline))
+        if not docs:
+            return None
+        doc = docs[0]
+        notifications, notifications_cursor = split_page(doc["notifications"], "sentAt", page_size)
+        return {
+            "summary": doc["summary"][0] if doc["summary"] else None,
+            "notifications": notifications,
+            "notifications_cursor": notifications_cursor,
+            "open_tasks": doc["open_tasks"],
+            "rewards": doc["rewards"],
+            "profile": doc["profile"][0] if doc["profile"] else None,
+        }
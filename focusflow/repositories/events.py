@@ -0,0 +1,69 @@
+"""
+Event log: a capped collection of per-user events, tailed by every app
+process to fan events out to its Server-Sent Events subscribers.
+
+Each event carries ``seq``, a per-user sequence number set when it is
+logged. ObjectIds minted by different processes are only roughly ordered,
+so Last-Event-ID resume goes by ``seq`` instead. ``event_sequences`` keeps
+each user's last seq, so numbering carries on after the capped collection
+has dropped all of a user's events.
+"""
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid, DuplicateKeyError
+
+from .base import Repository, as_object_id
+
+
+class EventLogRepository(Repository):
+    collection_name = "events"
+    sequences_name = "event_sequences"
+
+    def ensure_capped(self, size_bytes: int) -> None:
+        """Create the capped collection (or convert a plain one created by mistake)."""
+        db = self._db_factory()
+        try:
+            db.create_collection(self.collection_name, capped=True, size=size_bytes)
+        except CollectionInvalid:  # already exists
+            if not db[self.collection_name].options().get("capped"):
+                db.command("convertToCapped", self.collection_name, size=size_bytes)
+
+    def append(self, doc: dict) -> None:
+        """
+        Log ``doc`` as its user's next event, setting ``seq`` (1, 2, ...).
+
+        A seq is only taken by inserting the event under the unique
+        (user_id, seq) index, and the next one is only known once that
+        insert is visible, so concurrent publishers log a user's events in
+        seq order. (Reserving a number first and inserting afterwards let
+        seq N+1 be logged, and resumed past, before seq N.)
+        """
+        user_oid = doc["user_id"]
+        sequences = self._db_factory()[self.sequences_name]
+        counter = sequences.find_one({"_id": user_oid}, {"seq": 1})
+        seq = counter["seq"] if counter else 0
+        while True:
+            doc["seq"] = seq + 1
+            try:
+                self.collection.insert_one(doc)
+                break
+            except DuplicateKeyError:
+                seq = max(seq + 1, self._last_logged_seq(user_oid))
+        sequences.update_one({"_id": user_oid}, {"$max": {"seq": doc["seq"]}}, upsert=True)
+
+    def _last_logged_seq(self, user_oid) -> int:
+        doc = self.collection.find_one({"user_id": user_oid}, {"seq": 1}, sort=[("seq", -1)])
+        return doc["seq"] if doc else 0
+
+    def since(self, user_id, after_seq: int, limit: int = 500) -> list:
+        """A user's events after sequence number ``after_seq``, oldest first (for Last-Event-ID resume)."""
+        query = {"user_id": as_object_id(user_id), "seq": {"$gt": after_seq}}
+        return list(self.collection.find(query).sort("seq", 1).limit(limit))
+
+    def tail(self, after_id, max_await_ms: int):
+        """A tailable cursor over every event logged after ``after_id``."""
+        cursor = self.collection.find({"_id": {"$gt": after_id}}, cursor_type=CursorType.TAILABLE_AWAIT)
+        return cursor.max_await_time_ms(max_await_ms)
+
+    def last_id(self):
+        doc = self.collection.find_one({}, {"_id": 1}, sort=[("$natural", -1)])
+        return doc["_id"] if doc else None
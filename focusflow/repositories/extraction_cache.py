@@ -0,0 +1,12 @@
+"""
+Extracted document text, keyed by the uploaded bytes' digest.
+
+``_id`` is ``"<sha256>:<file type>:<extractor version>"``; ``text`` holds the
+zlib-compressed UTF-8 text and ``size`` its compressed length.
+"""
+from .content_cache import ContentCacheRepository
+
+
+class ExtractionCacheRepository(ContentCacheRepository):
+    collection_name = "extraction_cache"
+    fields = ("text",)
@@ -0,0 +1,11 @@
+"""
+Focus session documents.
+"""
+from .base import Repository
+
+
+class FocusSessionRepository(Repository):
+    collection_name = "focus_sessions"
+
+    def create(self, doc: dict) -> str:
+        return str(self.collection.insert_one(doc).inserted_id)
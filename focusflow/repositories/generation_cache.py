@@ -0,0 +1,13 @@
+"""
+Questions generated by the LLM, keyed by what determines the output.
+
+``_id`` is ``"<sha256 of the excerpt>:<model>:<prompt version>:<question count>"``;
+``questions`` holds the validated raw questions (choices in model order,
+``correct_index``), which are formatted and shuffled again on every serve.
+"""
+from .content_cache import ContentCacheRepository
+
+
+class GenerationCacheRepository(ContentCacheRepository):
+    collection_name = "generation_cache"
+    fields = ("questions",)
@@ -0,0 +1,74 @@
+"""
+Outbound mail queue documents.
+"""
+from datetime import timedelta
+
+from pymongo import ReturnDocument
+
+from .base import Repository, as_object_id
+
+
+class MailOutboxRepository(Repository):
+    collection_name = "mail_outbox"
+
+    def enqueue(self, message: dict, now) -> str:
+        doc = dict(message)
+        doc.update({
+            "status": "pending",
+            "attempts": 0,
+            "created_at": now,
+            "next_attempt_at": now,
+        })
+        return str(self.collection.insert_one(doc).inserted_id)
+
+    def claim(self, now, lease_seconds: float) -> dict | None:
+        """
+        Atomically take one due message (or one whose sender's lease expired),
+        so several workers can drain the same queue without double sends.
+        Each claim counts as an attempt, so a message whose sender keeps
+        dying mid-send still runs out of attempts.
+        """
+        return self.collection.find_one_and_update(
+            {
+                "$or": [
+                    {"status": "pending", "next_attempt_at": {"$lte": now}},
+                    {"status": "sending", "locked_until": {"$lt": now}},
+                ]
+            },
+            {
+                "$set": {"status": "sending", "locked_until": now + timedelta(seconds=lease_seconds)},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def mark_sent(self, message_id, now) -> None:
+        self.collection.update_one(
+            {"_id": as_object_id(message_id)},
+            {"$set": {"status": "sent", "sent_at": now}, "$unset": {"locked_until": ""}},
+        )
+
+    def mark_retry(self, message_id, next_attempt_at, error: str) -> None:
+        self.collection.update_one(
+            {"_id": as_object_id(message_id)},
+            {
+                "$set": {"status": "pending", "next_attempt_at": next_attempt_at, "last_error": error},
+                "$unset": {"locked_until": ""},
+            },
+        )
+
+    def mark_failed(self, message_id, now, error: str) -> None:
+        self.collection.update_one(
+            {"_id": as_object_id(message_id)},
+            {
+                "$set": {"status": "failed", "failed_at": now, "last_error": error},
+                "$unset": {"locked_until": ""},
+            },
+        )
+
+    def counts(self) -> dict:
+        return {
+            status: self.collection.count_documents({"status": status})
+            for status in ("pending", "sending", "sent", "failed")
+        }
@@ -0,0 +1,572 @@
+"""
+In-memory document store.
+
+Implements the subset of the pymongo Database/Collection API that the
+repositories use (filters with the common comparison operators, $set/$inc/
+$unset style updates, projections, sorting, unique and TTL indexes), so the same
+repository code runs against MongoDB or entirely in process - for load
+tests and microbenchmarks without a database.
+"""
+import copy
+import re
+import threading
+import time
+from datetime import datetime, timezone
+
+from bson.objectid import ObjectId
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReturnDocument, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from pymongo.results import BulkWriteResult, DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+_MISSING = object()
+
+# Like mongod's TTL monitor, expired documents are removed periodically, not on the dot
+TTL_INTERVAL_SECONDS = 1.0
+
+
+def _get_path(doc, path: str):
+    """Resolve a dotted path; returns _MISSING when any segment is absent."""
+    value = doc
+    for part in path.split("."):
+        if isinstance(value, dict):
+            value = value.get(part, _MISSING)
+        elif isinstance(value, list) and part.isdigit():
+            idx = int(part)
+            value = value[idx] if idx < len(value) else _MISSING
+        else:
+            return _MISSING
+        if value is _MISSING:
+            return _MISSING
+    return value
+
+
+def _set_path(doc: dict, path: str, value) -> None:
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.setdefault(part, {})
+    doc[parts[-1]] = value
+
+
+def _unset_path(doc: dict, path: str) -> None:
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(parts[-1], None)
+
+
+# BSON comparison order for mixed types (subset)
+_TYPE_ORDER = {type(None): 0, int: 1, float: 1, bool: 5, str: 2, dict: 3, list: 4, ObjectId: 6, datetime: 7}
+
+
+def _sort_key(value):
+    if value is _MISSING or value is None:
+        return (0, 0)
+    return (_TYPE_ORDER.get(type(value), 8), value)
+
+
+def _compare(a, b, op) -> bool:
+    if a is _MISSING or a is None or b is None:
+        return False
+    try:
+        return op(_sort_key(a), _sort_key(b))
+    except TypeError:
+        return False
+
+
+def _equals(value, expected) -> bool:
+    if expected is None:
+        return value is _MISSING or value is None
+    if value is _MISSING:
+        return False
+    if isinstance(value, list) and not isinstance(expected, list):
+        return expected in value
+    return value == expected
+
+
+def _match_operator(value, op: str, arg) -> bool:
+    if op == "$eq":
+        return _equals(value, arg)
+    if op == "$ne":
+        return not _equals(value, arg)
+    if op == "$gt":
+        return _compare(value, arg, lambda a, b: a > b)
+    if op == "$gte":
+        return _compare(value, arg, lambda a, b: a >= b)
+    if op == "$lt":
+        return _compare(value, arg, lambda a, b: a < b)
+    if op == "$lte":
+        return _compare(value, arg, lambda a, b: a <= b)
+    if op == "$in":
+        return any(_equals(value, a) for a in arg)
+    if op == "$nin":
+        return not any(_equals(value, a) for a in arg)
+    if op == "$exists":
+        return (value is not _MISSING) == bool(arg)
+    if op == "$not":
+        return not all(_match_operator(value, o, a) for o, a in arg.items())
+    if op == "$regex":
+        return isinstance(value, str) and re.search(arg, value) is not None
+    raise OperationFailure(f"Unsupported query operator for memory backend: {op}")
+
+
+def matches(doc: dict, query: dict | None) -> bool:
+    """Return True if a document satisfies a MongoDB-style filter."""
+    if not query:
+        return True
+    for key, condition in query.items():
+        if key == "$and":
+            if not all(matches(doc, q) for q in condition):
+                return False
+            continue
+        if key == "$or":
+            if not any(matches(doc, q) for q in condition):
+                return False
+            continue
+        value = _get_path(doc, key)
+        if isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+            if not all(_match_operator(value, op, arg) for op, arg in condition.items()):
+                return False
+        elif not _equals(value, condition):
+            return False
+    return True
+
+
+def apply_update(doc: dict, update: dict, *, inserting: bool = False) -> None:
+    """Apply a MongoDB-style update document in place."""
+    for op, fields in update.items():
+        if op == "$set":
+            for path, value in fields.items():
+                _set_path(doc, path, copy.deepcopy(value))
+        elif op == "$setOnInsert":
+            if inserting:
+                for path, value in fields.items():
+                    _set_path(doc, path, copy.deepcopy(value))
+        elif op == "$unset":
+            for path in fields:
+                _unset_path(doc, path)
+        elif op == "$inc":
+            for path, amount in fields.items():
+                current = _get_path(doc, path)
+                _set_path(doc, path, (0 if current is _MISSING else current) + amount)
+        elif op == "$max":
+            for path, value in fields.items():
+                current = _get_path(doc, path)
+                if current is _MISSING or _sort_key(value) > _sort_key(current):
+                    _set_path(doc, path, value)
+        elif op == "$min":
+            for path, value in fields.items():
+                current = _get_path(doc, path)
+                if current is _MISSING or _sort_key(value) < _sort_key(current):
+                    _set_path(doc, path, value)
+        elif op == "$push":
+            for path, value in fields.items():
+                current = _get_path(doc, path)
+                items = [] if current is _MISSING else current
+                if isinstance(value, dict) and "$each" in value:
+                    items.extend(copy.deepcopy(value["$each"]))
+                else:
+                    items.append(copy.deepcopy(value))
+                _set_path(doc, path, items)
+        else:
+            raise OperationFailure(f"Unsupported update operator for memory backend: {op}")
+
+
+def project(doc: dict, projection) -> dict:
+    """Apply an inclusion or exclusion projection to a copy of a document."""
+    if not projection:
+        return copy.deepcopy(doc)
+    if isinstance(projection, (list, tuple, set)):
+        projection = {f: 1 for f in projection}
+    include_id = projection.get("_id", 1)
+    fields = {k: v for k, v in projection.items() if k != "_id"}
+    if fields and all(not v for v in fields.values()):
+        out = copy.deepcopy(doc)
+        for path in fields:
+            _unset_path(out, path)
+    else:
+        out = {}
+        for path in fields:
+            value = _get_path(doc, path)
+            if value is not _MISSING:
+                _set_path(out, path, copy.deepcopy(value))
+    if include_id and "_id" in doc:
+        out["_id"] = doc["_id"]
+    elif not include_id:
+        out.pop("_id", None)
+    return out
+
+
+def _normalize_sort(key_or_list, direction=None) -> list:
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction or 1)]
+    return list(key_or_list)
+
+
+class MemoryCursor:
+    """Lazily sorted/limited result set, mirroring pymongo.cursor.Cursor."""
+
+    def __init__(self, docs: list, projection=None):
+        self._docs = docs
+        self._projection = projection
+        self._sort = []
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key_or_list, direction=None):
+        self._sort = _normalize_sort(key_or_list, direction)
+        return self
+
+    def skip(self, n: int):
+        self._skip = n
+        return self
+
+    def limit(self, n: int):
+        self._limit = n
+        return self
+
+    def _results(self) -> list:
+        docs = self._docs
+        for key, direction in reversed(self._sort):
+            docs = sorted(docs, key=lambda d: _sort_key(_get_path(d, key)), reverse=direction == -1)
+        docs = docs[self._skip:]
+        if self._limit:
+            docs = docs[: self._limit]
+        return [project(d, self._projection) for d in docs]
+
+    def __iter__(self):
+        return iter(self._results())
+
+
+def _hashable(value):
+    try:
+        hash(value)
+        return True
+    except TypeError:
+        return False
+
+
+class MemoryCollection:
+    """
+    Thread-safe in-process collection.
+
+    Declared indexes are honoured the way they matter for behaviour and
+    speed: unique indexes (including partial ones) reject duplicates, TTL
+    indexes expire documents, and the leading field of every index gets a
+    hash lookup so per-user queries don't scan the collection.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._docs: dict = {}
+        self._indexes: dict = {"_id_": {"key": [("_id", 1)], "unique": True}}
+        self._lookups: dict[str, dict] = {}   # field -> value -> set of _ids
+        self._unique: dict[str, dict] = {}    # index name -> key tuple -> _id
+        self._ttl: dict[str, float] = {}      # date field -> expireAfterSeconds
+        self._next_expiry = 0.0
+        self._lock = threading.RLock()
+
+    # --- indexes -------------------------------------------------------
+
+    def create_index(self, keys, name=None, unique=False, **options) -> str:
+        keys = _normalize_sort(keys)
+        name = name or "_".join(f"{k}_{d}" for k, d in keys)
+        with self._lock:
+            if name in self._indexes:
+                return name
+            ix = {"key": keys, "unique": unique, **options}
+            if unique:
+                seen = {}
+                for doc in self._docs.values():
+                    key = self._unique_key(doc, ix)
+                    if key is None:
+                        continue
+                    if key in seen:
+                        raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {name}")
+                    seen[key] = doc["_id"]
+                self._unique[name] = seen
+            self._indexes[name] = ix
+            if "expireAfterSeconds" in options:
+                self._ttl[keys[0][0]] = float(options["expireAfterSeconds"])
+            field = keys[0][0]
+            if field != "_id" and field not in self._lookups:
+                self._lookups[field] = {}
+                for doc in self._docs.values():
+                    self._index_field(field, doc, add=True)
+        return name
+
+    def index_information(self) -> dict:
+        with self._lock:
+            return copy.deepcopy(self._indexes)
+
+    @staticmethod
+    def _unique_key(doc: dict, ix: dict):
+        partial = ix.get("partialFilterExpression")
+        if partial and not matches(doc, partial):
+            return None
+        key = tuple(_get_path(doc, k) for k, _ in ix["key"])
+        if ix.get("sparse") and all(v is _MISSING for v in key):
+            return None
+        key = tuple(None if v is _MISSING else v for v in key)
+        return key if _hashable(key) else repr(key)
+
+    def _index_field(self, field: str, doc: dict, add: bool) -> None:
+        value = _get_path(doc, field)
+        values = value if isinstance(value, list) else [value]
+        buckets = self._lookups[field]
+        for v in values:
+            v = None if v is _MISSING else v
+            if not _hashable(v):
+                v = repr(v)
+            if add:
+                buckets.setdefault(v, set()).add(doc["_id"])
+            else:
+                ids = buckets.get(v)
+                if ids:
+                    ids.discard(doc["_id"])
+                    if not ids:
+                        del buckets[v]
+
+    def _check_unique(self, doc: dict, ignore_id=None) -> None:
+        for name, seen in self._unique.items():
+            key = self._unique_key(doc, self._indexes[name])
+            if key is None:
+                continue
+            owner = seen.get(key, _MISSING)
+            if owner is not _MISSING and owner != ignore_id:
+                raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {name}")
+
+    def _store(self, doc: dict) -> None:
+        self._docs[doc["_id"]] = doc
+        for field in self._lookups:
+            self._index_field(field, doc, add=True)
+        for name, seen in self._unique.items():
+            key = self._unique_key(doc, self._indexes[name])
+            if key is not None:
+                seen[key] = doc["_id"]
+
+    def _forget(self, doc: dict) -> None:
+        del self._docs[doc["_id"]]
+        for field in self._lookups:
+            self._index_field(field, doc, add=False)
+        for name, seen in self._unique.items():
+            key = self._unique_key(doc, self._indexes[name])
+            if key is not None and seen.get(key) == doc["_id"]:
+                del seen[key]
+
+    def _expire(self) -> None:
+        """Drop documents whose TTL index date has passed (at most once per interval)."""
+        if not self._ttl:
+            return
+        clock = time.monotonic()
+        if clock < self._next_expiry:
+            return
+        self._next_expiry = clock + TTL_INTERVAL_SECONDS
+        now = datetime.now(timezone.utc)
+        expired = []
+        for doc in self._docs.values():
+            for field, seconds in self._ttl.items():
+                value = _get_path(doc, field)
+                if isinstance(value, datetime):
+                    if value.tzinfo is None:  # naive dates are UTC, as in MongoDB
+                        value = value.replace(tzinfo=timezone.utc)
+                    if (now - value).total_seconds() >= seconds:
+                        expired.append(doc)
+                        break
+        for doc in expired:
+            self._forget(doc)
+
+    # --- reads ---------------------------------------------------------
+
+    def _candidates(self, filter) -> list:
+        if filter:
+            _id = filter.get("_id", _MISSING)
+            if _id is not _MISSING and not isinstance(_id, dict):
+                doc = self._docs.get(_id)
+                return [doc] if doc is not None else []
+            for field, buckets in self._lookups.items():
+                value = filter.get(field, _MISSING)
+                if value is not _MISSING and not isinstance(value, (dict, list)) and _hashable(value):
+                    return [self._docs[i] for i in buckets.get(value, ())]
+        return list(self._docs.values())
+
+    def _matching(self, filter) -> list:
+        with self._lock:
+            self._expire()
+            return [d for d in self._candidates(filter) if matches(d, filter)]
+
+    def find(self, filter=None, projection=None, sort=None, limit=0):
+        cursor = MemoryCursor(self._matching(filter), projection)
+        if sort:
+            cursor.sort(sort)
+        if limit:
+            cursor.limit(limit)
+        return cursor
+
+    def find_one(self, filter=None, projection=None, sort=None):
+        if filter is not None and not isinstance(filter, dict):
+            filter = {"_id": filter}
+        for doc in self.find(filter, projection, sort=sort, limit=1):
+            return doc
+        return None
+
+    def count_documents(self, filter, limit=0) -> int:
+        n = len(self._matching(filter))
+        return min(n, limit) if limit else n
+
+    def distinct(self, key: str, filter=None) -> list:
+        values = []
+        for doc in self._matching(filter):
+            value = _get_path(doc, key)
+            for v in (value if isinstance(value, list) else [value]):
+                if v is not _MISSING and v not in values:
+                    values.append(v)
+        return values
+
+    # --- writes --------------------------------------------------------
+
+    def insert_one(self, document: dict) -> InsertOneResult:
+        with self._lock:
+            if "_id" not in document:
+                document["_id"] = ObjectId()
+            if document["_id"] in self._docs:
+                raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: _id_")
+            doc = copy.deepcopy(document)
+            self._check_unique(doc)
+            self._store(doc)
+        return InsertOneResult(doc["_id"], acknowledged=True)
+
+    def insert_many(self, documents, ordered=True) -> InsertManyResult:
+        ids = [self.insert_one(d).inserted_id for d in documents]
+        return InsertManyResult(ids, acknowledged=True)
+
+    def _update(self, filter, update, upsert, many) -> UpdateResult:
+        with self._lock:
+            targets = self._matching(filter)
+            if not many:
+                targets = targets[:1]
+            modified = 0
+            for doc in targets:
+                updated = copy.deepcopy(doc)
+                apply_update(updated, update)
+                self._check_unique(updated, ignore_id=doc["_id"])
+                if updated != doc:
+                    self._forget(doc)
+                    self._store(updated)
+                    modified += 1
+            raw = {"n": len(targets), "nModified": modified, "ok": 1.0}
+            if not targets and upsert:
+                new_doc = {k: v for k, v in (filter or {}).items()
+                           if not k.startswith("$") and not isinstance(v, dict)}
+                apply_update(new_doc, update, inserting=True)
+                raw["upserted"] = self.insert_one(new_doc).inserted_id
+                raw["n"] = 1
+        return UpdateResult(raw, acknowledged=True)
+
+    def update_one(self, filter, update, upsert=False) -> UpdateResult:
+        return self._update(filter, update, upsert, many=False)
+
+    def update_many(self, filter, update, upsert=False) -> UpdateResult:
+        return self._update(filter, update, upsert, many=True)
+
+    def find_one_and_update(self, filter, update, projection=None, sort=None,
+                            upsert=False, return_document=ReturnDocument.BEFORE):
+        with self._lock:
+            before = self.find_one(filter, sort=sort)
+            if before is None:
+                if not upsert:
+                    return None
+                result = self._update(filter, update, upsert=True, many=False)
+                after = self._docs[result.upserted_id]
+                return project(after, projection) if return_document == ReturnDocument.AFTER else None
+            self._update({"_id": before["_id"]}, update, upsert=False, many=False)
+            if return_document == ReturnDocument.AFTER:
+                return project(self._docs[before["_id"]], projection)
+            return project(before, projection)
+
+    def find_one_and_delete(self, filter, projection=None, sort=None):
+        with self._lock:
+            doc = self.find_one(filter, sort=sort)
+            if doc is None:
+                return None
+            self._forget(self._docs[doc["_id"]])
+            return project(doc, projection)
+
+    def _delete(self, filter, many) -> DeleteResult:
+        with self._lock:
+            targets = self._matching(filter)
+            if not many:
+                targets = targets[:1]
+            for doc in targets:
+                self._forget(doc)
+        return DeleteResult({"n": len(targets), "ok": 1.0}, acknowledged=True)
+
+    def delete_one(self, filter) -> DeleteResult:
+        return self._delete(filter, many=False)
+
+    def delete_many(self, filter) -> DeleteResult:
+        return self._delete(filter, many=True)
+
+    def bulk_write(self, requests, ordered=True) -> BulkWriteResult:
+        """Run InsertOne/UpdateOne/UpdateMany/DeleteOne/DeleteMany requests in order."""
+        raw = {"nInserted": 0, "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0,
+               "upserted": [], "writeErrors": [], "writeConcernErrors": []}
+        with self._lock:
+            for index, op in enumerate(requests):
+                try:
+                    if isinstance(op, InsertOne):
+                        self.insert_one(op._doc)
+                        raw["nInserted"] += 1
+                    elif isinstance(op, (UpdateOne, UpdateMany)):
+                        result = self._update(op._filter, op._doc, op._upsert, many=isinstance(op, UpdateMany))
+                        if result.upserted_id is not None:
+                            raw["nUpserted"] += 1
+                            raw["upserted"].append({"index": index, "_id": result.upserted_id})
+                        else:
+                            raw["nMatched"] += result.matched_count
+                            raw["nModified"] += result.modified_count
+                    elif isinstance(op, (DeleteOne, DeleteMany)):
+                        raw["nRemoved"] += self._delete(op._filter, many=isinstance(op, DeleteMany)).deleted_count
+                    else:
+                        raise OperationFailure(f"Unsupported bulk operation for memory backend: {op!r}")
+                except DuplicateKeyError as e:
+                    raw["writeErrors"].append({"index": index, "code": 11000, "errmsg": str(e), "op": op})
+                    if ordered:
+                        break
+        if raw["writeErrors"]:
+            raise BulkWriteError(raw)
+        return BulkWriteResult(raw, acknowledged=True)
+
+    def drop(self) -> None:
+        with self._lock:
+            self._docs.clear()
+            for buckets in self._lookups.values():
+                buckets.clear()
+            for seen in self._unique.values():
+                seen.clear()
+
+
+class MemoryDatabase:
+    """Dictionary of MemoryCollections with pymongo's ``db[name]`` interface."""
+
+    def __init__(self, name: str = "focusflow"):
+        self.name = name
+        self._collections: dict[str, MemoryCollection] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = MemoryCollection(name)
+            return self._collections[name]
+
+    def get_collection(self, name: str) -> MemoryCollection:
+        return self[name]
+
+    def list_collection_names(self) -> list:
+        return list(self._collections)
+
+    def drop_collection(self, name: str) -> None:
+        with self._lock:
+            self._collections.pop(name, None)
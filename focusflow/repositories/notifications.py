@@ -0,0 +1,160 @@
+"""
+Notification documents.
+
+Live notifications that can be coalesced carry a ``coalesceKey`` (unique
+per user); dismissing one removes the key, so the next notification for the
+same subject starts a new document instead of reviving the dismissed one.
+"""
+from datetime import datetime, timezone
+
+from bson.objectid import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from .base import Repository, as_object_id
+from .pagination import fetch_page
+
+LIVE = {"$ne": "dismissed"}
+NEWEST_FIRST = [("sentAt", -1), ("_id", -1)]
+
+
+def unexpired(now: datetime | None = None) -> dict:
+    """
+    Filter on ``expireAt`` for notifications that haven't expired yet. The TTL
+    monitor deletes expired ones only every minute or so, and documents that
+    predate expiry dates have no ``expireAt`` at all.
+    """
+    return {"$not": {"$lte": now or datetime.now(timezone.utc)}}
+
+
+class NotificationRepository(Repository):
+    collection_name = "notifications"
+    projection_required = True
+
+    def page_active(self, user_id, limit: int, cursor: str | None = None, fields=None) -> tuple[list, str | None]:
+        """One page of non-dismissed notifications, newest first; returns (items, next_cursor)."""
+        query = {"userId": as_object_id(user_id), "status": LIVE, "expireAt": unexpired()}
+        return fetch_page(
+            self.collection, query, "sentAt", limit, cursor=cursor, projection=self.projection(fields),
+        )
+
+    def count_active(self, user_id) -> int:
+        return self.collection.count_documents(
+            {"userId": as_object_id(user_id), "status": LIVE, "expireAt": unexpired()}
+        )
+
+    def insert(self, doc: dict) -> str:
+        return str(self.collection.insert_one(doc).inserted_id)
+
+    def upsert_live(self, user_id, coalesce_key: str, doc: dict) -> tuple[ObjectId, bool]:
+        """
+        Refresh the user's live notification with this coalesce key, or insert
+        ``doc`` if there is none. Returns (its _id, whether it was inserted).
+        """
+        query = {"userId": as_object_id(user_id), "coalesceKey": coalesce_key}
+        new_id = ObjectId()
+        update = self._live_update(query, doc, new_id)
+        try:
+            after = self.collection.find_one_and_update(
+                query, update, projection={"_id": 1}, upsert=True, return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # A concurrent request inserted it first; refresh that one instead
+            after = self.collection.find_one_and_update(
+                query, update, projection={"_id": 1}, upsert=True, return_document=ReturnDocument.AFTER,
+            )
+        return after["_id"], after["_id"] == new_id
+
+    def upsert_live_many(self, user_id, items) -> list[tuple[ObjectId, bool] | None]:
+        """
+        ``upsert_live`` for a list of (coalesce_key, doc) pairs with distinct
+        keys, in one bulk write plus one read for the ids of refreshed ones.
+        Results are in item order (None if the notification vanished meanwhile).
+        """
+        user_oid = as_object_id(user_id)
+        new_ids = [ObjectId() for _ in items]
+        requests = []
+        for (key, doc), new_id in zip(items, new_ids):
+            query = {"userId": user_oid, "coalesceKey": key}
+            requests.append(UpdateOne(query, self._live_update(query, doc, new_id), upsert=True))
+        if not requests:
+            return []
+
+        try:
+            upserted = self.collection.bulk_write(requests, ordered=False).upserted_ids
+            retry = []
+        except BulkWriteError as e:
+            upserted = {u["index"]: u["_id"] for u in e.details.get("upserted", [])}
+            retry = [err["index"] for err in e.details["writeErrors"]]
+
+        results: list = [None] * len(items)
+        for index, _id in upserted.items():
+            results[index] = (_id, True)
+        for index in retry:  # lost an insert race; refresh the winner
+            results[index] = self.upsert_live(user_oid, *items[index])
+        pending = {items[i][0]: i for i, r in enumerate(results) if r is None}
+        if pending:
+            query = {"userId": user_oid, "coalesceKey": {"$in": list(pending)}}
+            for doc in self.collection.find(query, {"_id": 1, "coalesceKey": 1}):
+                results[pending[doc["coalesceKey"]]] = (doc["_id"], False)
+        return results
+
+    @staticmethod
+    def _live_update(query: dict, doc: dict, new_id: ObjectId) -> dict:
+        fresh = {k: v for k, v in doc.items() if k in ("sentAt", "status", "payload", "expireAt")}
+        return {
+            "$set": fresh,
+            "$setOnInsert": {
+                "_id": new_id,
+                **{k: v for k, v in doc.items() if k not in fresh and k not in query and k != "_id"},
+            },
+        }
+
+    def evict_oldest(self, user_id, keep: int) -> int:
+        """Delete the user's live notifications beyond the newest ``keep``; returns how many."""
+        query = {"userId": as_object_id(user_id), "status": LIVE}
+        overflow = [d["_id"] for d in self.collection.find(query, {"_id": 1}).sort(NEWEST_FIRST).skip(keep)]
+        if not overflow:
+            return 0
+        return self.collection.delete_many({"_id": {"$in": overflow}, "status": LIVE}).deleted_count
+
+    def dismiss(self, notification_id, user_id, expire_at=None) -> bool:
+        update = {"$set": {"status": "dismissed"}, "$unset": {"coalesceKey": ""}}
+        if expire_at is not None:
+            update["$set"]["expireAt"] = expire_at
+        result = self.collection.update_one(
+            {
+                "_id": as_object_id(notification_id),
+                "userId": as_object_id(user_id),
+                "status": LIVE,
+            },
+            update,
+        )
+        return result.modified_count > 0
+
+    # --- maintenance ---------------------------------------------------
+
+    def user_ids(self) -> list:
+        return self.collection.distinct("userId")
+
+    def live_for_user(self, user_id, fields=None) -> list:
+        """All of a user's live notifications, newest first."""
+        query = {"userId": as_object_id(user_id), "status": LIVE}
+        return list(self.collection.find(query, self.projection(fields)).sort(NEWEST_FIRST))
+
+    def delete_ids(self, ids) -> int:
+        if not ids:
+            return 0
+        return self.collection.delete_many({"_id": {"$in": list(ids)}}).deleted_count
+
+    def set_fields(self, notification_id, fields: dict) -> None:
+        self.collection.update_one({"_id": as_object_id(notification_id)}, {"$set": fields})
+
+    def delete_stale(self, now) -> int:
+        """Delete expired notifications and dismissed ones that predate expiry dates."""
+        return self.collection.delete_many({
+            "$or": [
+                {"expireAt": {"$lte": now}},
+                {"status": "dismissed", "expireAt": {"$exists": False}},
+            ]
+        }).deleted_count
@@ -0,0 +1,90 @@
+"""
+Keyset (cursor) pagination.
+
+Lists are ordered by a timestamp field and ``_id``, both descending. A page
+is fetched with a range query that starts right after the last item of the
+previous page, so every page costs one index scan of ``limit`` entries no
+matter how deep the client has scrolled (unlike skip/offset).
+
+The cursor handed to clients is an opaque URL-safe token encoding the
+sort value and _id of the last item returned.
+"""
+import base64
+import json
+from datetime import datetime
+
+from bson.errors import InvalidId
+from bson.objectid import ObjectId
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def page_size(value, default: int = DEFAULT_PAGE_SIZE) -> int:
+    """Parse a client-supplied page size, clamped to 1..MAX_PAGE_SIZE."""
+    try:
+        size = int(value) if value not in (None, "") else default
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def encode_cursor(doc: dict, field: str) -> str:
+    value = doc.get(field)
+    payload = {
+        "v": value.isoformat() if isinstance(value, datetime) else None,
+        "id": str(doc["_id"]),
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> tuple:
+    """Return (sort value or None, ObjectId); raises ValueError for a malformed token."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        value = datetime.fromisoformat(payload["v"]) if payload.get("v") else None
+        return value, ObjectId(payload["id"])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise ValueError(f"Invalid cursor: {e}") from None
+
+
+def after_cursor(field: str, cursor: str) -> dict:
+    """
+    Filter for the items after ``cursor`` in (field desc, _id desc) order.
+    Items without ``field`` sort last, as they do in MongoDB.
+    """
+    value, last_id = decode_cursor(cursor)
+    if value is None:
+        return {field: None, "_id": {"$lt": last_id}}
+    return {
+        "$or": [
+            {field: {"$lt": value}},
+            {field: value, "_id": {"$lt": last_id}},
+            {field: None},
+        ]
+    }
+
+
+def fetch_page(collection, query: dict, field: str, limit: int, cursor: str | None = None,
+               projection=None) -> tuple[list, str | None]:
+    """
+    Run one page of a keyset-paginated query.
+
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    """
+    if cursor:
+        query = {"$and": [query, after_cursor(field, cursor)]}
+    if projection is not None and field not in projection:
+        projection = {**projection, field: 1}
+    docs = list(collection.find(query, projection).sort([(field, -1), ("_id", -1)]).limit(limit + 1))
+    return split_page(docs, field, limit)
+
+
+def split_page(docs: list, field: str, limit: int) -> tuple[list, str | None]:
+    """Trim up to limit + 1 fetched items to a page and its next_cursor."""
+    if len(docs) <= limit:
+        return docs, None
+    docs = docs[:limit]
+    return docs, encode_cursor(docs[-1], field)
@@ -0,0 +1,18 @@
+"""
+Profile (study preferences) documents.
+"""
+from .base import Repository, as_object_id, as_projection
+
+
+class ProfileRepository(Repository):
+    collection_name = "profiles"
+
+    def get(self, user_id, fields=None) -> dict | None:
+        return self.collection.find_one({"user_id": as_object_id(user_id)}, as_projection(fields))
+
+    def create(self, doc: dict) -> str:
+        return str(self.collection.insert_one(doc).inserted_id)
+
+    def update(self, user_id, fields: dict) -> int:
+        result = self.collection.update_one({"user_id": as_object_id(user_id)}, {"$set": fields})
+        return result.modified_count
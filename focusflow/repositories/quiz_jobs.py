@@ -0,0 +1,110 @@
+"""
+Quiz generation job documents.
+
+A job passes through two stages, each drained by its own workers:
+queued -> extracting -> extracted -> generating -> done. It ends as
+"failed" if a stage gives up, or "cancelled" if the user uploads another
+document first. A running stage holds a lease (``locked_until``); a job
+whose worker died is claimed again once the lease expires. Each claim gets
+a new ``lease_id``, so a worker whose lease expired can no longer finish or
+fail a job that another worker has claimed since.
+"""
+from datetime import timedelta
+
+from bson.objectid import ObjectId
+from pymongo import ReturnDocument
+
+from .base import Repository, as_object_id
+
+# stage -> (status while waiting, status while running, status when finished)
+STAGES = {
+    "extract": ("queued", "extracting", "extracted"),
+    "generate": ("extracted", "generating", "done"),
+}
+UNFINISHED = ("queued", "extracting", "extracted", "generating")
+
+
+class QuizJobRepository(Repository):
+    collection_name = "quiz_jobs"
+    # Jobs carry the extracted text between stages
+    projection_required = True
+
+    def create(self, doc: dict) -> str:
+        return str(self.collection.insert_one(doc).inserted_id)
+
+    def get(self, job_id, user_id=None, fields=None) -> dict | None:
+        query = {"_id": as_object_id(job_id)}
+        if user_id is not None:
+            query["user_id"] = as_object_id(user_id)
+        return self.collection.find_one(query, self.projection(fields))
+
+    def claim(self, stage: str, now, lease_seconds: float) -> dict | None:
+        """Atomically take the oldest job waiting for ``stage`` (or whose lease on it expired)."""
+        waiting, running, _ = STAGES[stage]
+        return self.collection.find_one_and_update(
+            {
+                "$or": [
+                    {"status": waiting},
+                    {"status": running, "locked_until": {"$lt": now}},
+                ]
+            },
+            {
+                "$set": {
+                    "status": running,
+                    "lease_id": ObjectId(),
+                    "locked_until": now + timedelta(seconds=lease_seconds),
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def advance(self, job: dict, stage: str, now, set_fields: dict | None = None, unset=()) -> bool:
+        """
+        Finish ``stage`` of a job as returned by claim(); False if it was
+        cancelled or claimed by another worker meanwhile.
+        """
+        _, running, finished = STAGES[stage]
+        update = {
+            "$set": {**(set_fields or {}), "status": finished, "attempts": 0, "updated_at": now},
+            "$unset": {"locked_until": "", "lease_id": "", **{field: "" for field in unset}},
+        }
+        if finished == "done":
+            update["$set"]["finished_at"] = now
+        result = self.collection.update_one(
+            {"_id": job["_id"], "status": running, "lease_id": job["lease_id"]}, update
+        )
+        return result.modified_count > 0
+
+    def fail(self, job: dict, error: str, now) -> bool:
+        """Fail a job as returned by claim(); False if it was cancelled or claimed by another worker meanwhile."""
+        result = self.collection.update_one(
+            {"_id": job["_id"], "status": {"$in": list(UNFINISHED)}, "lease_id": job["lease_id"]},
+            {
+                "$set": {"status": "failed", "error": error, "updated_at": now, "finished_at": now},
+                "$unset": {"locked_until": "", "lease_id": "", "excerpt": ""},
+            },
+        )
+        return result.modified_count > 0
+
+    def cancel_unfinished(self, user_id, now) -> list:
+        """Cancel the user's unfinished jobs; returns them (``file_path`` only)."""
+        query = {"user_id": as_object_id(user_id), "status": {"$in": list(UNFINISHED)}}
+        jobs = list(self.collection.find(query, {"file_path": 1}))
+        if jobs:
+            self.collection.update_many(
+                {"_id": {"$in": [job["_id"] for job in jobs]}, "status": {"$in": list(UNFINISHED)}},
+                {
+                    "$set": {"status": "cancelled", "updated_at": now, "finished_at": now},
+                    "$unset": {"locked_until": "", "lease_id": "", "excerpt": ""},
+                },
+            )
+        return jobs
+
+    def counts(self) -> dict:
+        return {
+            status: self.collection.count_documents({"status": status})
+            for status in (*UNFINISHED, "done", "failed", "cancelled")
+        }
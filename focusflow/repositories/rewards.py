@@ -0,0 +1,31 @@
+"""
+Earned reward documents.
+"""
+from pymongo.errors import DuplicateKeyError
+
+from .base import Repository, as_object_id, as_projection
+
+
+class RewardRepository(Repository):
+    collection_name = "rewards"
+
+    def list_for_user(self, user_id, fields=None) -> list:
+        return list(self.collection.find({"user_id": as_object_id(user_id)}, as_projection(fields)))
+
+    def earned_ids(self, user_id) -> set:
+        return {
+            r["reward_id"]
+            for r in self.collection.find({"user_id": as_object_id(user_id)}, {"reward_id": 1})
+        }
+
+    def award(self, user_id, reward_id: str, earned_at) -> bool:
+        """Record an earned reward; returns False if it was already awarded."""
+        try:
+            self.collection.insert_one({
+                "user_id": as_object_id(user_id),
+                "reward_id": reward_id,
+                "earned_at": earned_at,
+            })
+        except DuplicateKeyError:
+            return False
+        return True
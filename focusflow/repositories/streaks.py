@@ -0,0 +1,29 @@
+"""
+Streak event documents.
+"""
+from pymongo.errors import DuplicateKeyError
+
+from .base import Repository, as_object_id
+
+
+class StreakEventRepository(Repository):
+    collection_name = "streakEvents"
+
+    def record(self, user_id, date: str, source: str, meta: dict | None = None) -> bool:
+        """Insert one event per user/date/source; returns False if it already existed."""
+        user_oid = as_object_id(user_id)
+        key = {"userId": user_oid, "date": date, "source": source}
+        if self.collection.find_one(key, {"_id": 1}):
+            return False
+        doc = dict(key)
+        if meta:
+            doc["meta"] = meta
+        try:
+            self.collection.insert_one(doc)
+        except DuplicateKeyError:
+            return False  # The unique index settles concurrent inserts
+        return True
+
+    def active_dates(self, user_id) -> list:
+        """Distinct YYYY-MM-DD strings on which the user had activity."""
+        return self.collection.distinct("date", {"userId": as_object_id(user_id)})
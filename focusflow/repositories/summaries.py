@@ -0,0 +1,54 @@
+"""
+Per-user dashboard summary documents (read model), keyed by the user's _id.
+
+Every change increments ``rev``, so a rebuild computed from the source
+collections is only stored if no change landed while it was computed.
+"""
+from pymongo.errors import DuplicateKeyError
+
+from .base import Repository, as_object_id, as_projection
+
+SUMMARY_FIELDS = (
+    "streak",
+    "quizzes_taken",
+    "tasks_done",
+    "focus_points",
+    "total_points",
+    "open_tasks",
+    "unread_notifications",
+)
+
+
+class UserSummaryRepository(Repository):
+    collection_name = "user_summaries"
+
+    def get(self, user_id, fields=None) -> dict | None:
+        return self.collection.find_one({"_id": as_object_id(user_id)}, as_projection(fields))
+
+    def apply(self, user_id, update: dict) -> bool:
+        """
+        Apply a raw $inc/$set update to an existing summary. Missing summaries
+        are left alone: they are built from the source collections on first read.
+        """
+        update = {**update, "$inc": {**update.get("$inc", {}), "rev": 1}}
+        result = self.collection.update_one({"_id": as_object_id(user_id)}, update)
+        return result.matched_count > 0
+
+    def create(self, user_id, fields: dict) -> bool:
+        """Insert a summary; False if one was created meanwhile."""
+        try:
+            self.collection.insert_one({"_id": as_object_id(user_id), **fields, "rev": 0})
+            return True
+        except DuplicateKeyError:
+            return False
+
+    def replace_if_unchanged(self, user_id, fields: dict, rev) -> bool:
+        """Overwrite a summary still at revision ``rev``; False if it changed since."""
+        result = self.collection.update_one(
+            {"_id": as_object_id(user_id), "rev": rev},
+            {"$set": fields, "$inc": {"rev": 1}},
+        )
+        return result.matched_count > 0
+
+    def delete(self, user_id) -> bool:
+        return self.collection.delete_one({"_id": as_object_id(user_id)}).deleted_count > 0
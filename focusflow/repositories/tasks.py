@@ -0,0 +1,114 @@
+"""
+Task documents.
+"""
+from datetime import datetime
+from typing import NamedTuple
+
+from bson.objectid import ObjectId
+from pymongo import DeleteOne, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from .base import Repository, as_object_id
+from .pagination import fetch_page
+
+
+class TaskCompletion(NamedTuple):
+    credited: bool
+    closed: bool
+
+
+class TaskRepository(Repository):
+    collection_name = "tasks"
+    projection_required = True
+
+    def page_for_user(self, user_id, limit: int, cursor: str | None = None, fields=None) -> tuple[list, str | None]:
+        """One page of a user's tasks, newest first; returns (tasks, next_cursor)."""
+        return fetch_page(
+            self.collection, {"user_id": as_object_id(user_id)}, "created_at", limit,
+            cursor=cursor, projection=self.projection(fields),
+        )
+
+    def get(self, task_id, user_id=None, fields=None) -> dict | None:
+        query = {"_id": as_object_id(task_id)}
+        if user_id is not None:
+            query["user_id"] = as_object_id(user_id)
+        return self.collection.find_one(query, self.projection(fields))
+
+    def get_many(self, task_ids, user_id, fields=None) -> dict:
+        """The user's tasks among ``task_ids``, by _id."""
+        query = {"_id": {"$in": [as_object_id(t) for t in task_ids]}, "user_id": as_object_id(user_id)}
+        return {doc["_id"]: doc for doc in self.collection.find(query, self.projection(fields))}
+
+    @staticmethod
+    def new(user_id, title: str) -> dict:
+        """A new task document (with its _id) that has not been written yet."""
+        return {
+            "_id": ObjectId(),
+            "user_id": as_object_id(user_id),
+            "title": title,
+            "done": False,
+            "created_at": datetime.now(),
+        }
+
+    def create(self, user_id, title: str) -> dict:
+        doc = self.new(user_id, title)
+        self.collection.insert_one(doc)
+        return doc
+
+    def apply_batch(self, user_id, inserts: list, updates: dict, deletes: list) -> set:
+        """
+        Insert, update ($set fields by task _id) and delete a user's tasks in
+        one unordered bulk write. Returns the _ids whose write failed.
+        """
+        user_oid = as_object_id(user_id)
+        requests = [InsertOne(doc) for doc in inserts]
+        targets = [doc["_id"] for doc in inserts]
+        for task_id, fields in updates.items():
+            requests.append(UpdateOne({"_id": task_id, "user_id": user_oid}, {"$set": fields}))
+            targets.append(task_id)
+        for task_id in deletes:
+            requests.append(DeleteOne({"_id": task_id, "user_id": user_oid}))
+            targets.append(task_id)
+        if not requests:
+            return set()
+        try:
+            self.collection.bulk_write(requests, ordered=False)
+        except BulkWriteError as e:
+            return {targets[err["index"]] for err in e.details["writeErrors"]}
+        return set()
+
+    def delete(self, task_id, user_id) -> dict | None:
+        """Delete a task; returns the deleted task (``done`` only), or None if not found."""
+        return self.collection.find_one_and_delete(
+            {"_id": as_object_id(task_id), "user_id": as_object_id(user_id)},
+            projection={"done": 1},
+        )
+
+    def set_done(self, task_id, user_id, done: bool) -> bool:
+        result = self.collection.update_one(
+            {"_id": as_object_id(task_id), "user_id": as_object_id(user_id)},
+            {"$set": {"done": done}},
+        )
+        return result.modified_count > 0
+
+    def count_open(self, user_id) -> int:
+        return self.collection.count_documents({"user_id": as_object_id(user_id), "done": {"$ne": True}})
+
+    def complete_for_credit(self, task_id) -> TaskCompletion:
+        """
+        Mark a task done and claim its one-time stats credit.
+
+        ``credited`` is False only when the task exists and was already
+        credited, so callers increment ``tasks_done`` at most once per task;
+        ``closed`` tells whether the task was open before.
+        """
+        task_oid = as_object_id(task_id)
+        before = self.collection.find_one_and_update(
+            {"_id": task_oid, "stats_credited": {"$ne": True}},
+            {"$set": {"done": True, "stats_credited": True}},
+            projection={"done": 1},
+        )
+        if before is not None:
+            return TaskCompletion(credited=True, closed=not before.get("done", False))
+        result = self.collection.update_one({"_id": task_oid}, {"$set": {"done": True}})
+        return TaskCompletion(credited=result.matched_count == 0, closed=result.modified_count > 0)
@@ -0,0 +1,166 @@
+"""
+Request-scoped unit of work for user documents.
+
+Within a request, the first read of a user document goes to the database
+and later reads (of the same or fewer fields) are served from memory.
+Updates are staged instead of written: they are applied to the in-memory
+copy immediately, merged into one update document per user, and flushed
+as a single write when the request finishes. If the view raises, staged
+updates are dropped. Updates to the user's summary document (the
+dashboard read model) are staged and flushed the same way.
+
+Outside a request (CLI commands, background jobs) the helpers fall back
+to direct repository calls.
+"""
+import copy
+
+from flask import g, has_request_context
+
+from . import get_repositories
+from .memory import apply_update
+
+
+def _merge_update(pending: dict, update: dict) -> None:
+    """Fold ``update`` into ``pending`` so the result is one valid update document."""
+    sets = pending.setdefault("$set", {})
+    incs = pending.setdefault("$inc", {})
+    unsets = pending.setdefault("$unset", {})
+    for op, fields in update.items():
+        for path, value in fields.items():
+            if op == "$set":
+                incs.pop(path, None)
+                unsets.pop(path, None)
+                sets[path] = value
+            elif op == "$inc":
+                if path in sets:
+                    sets[path] = (sets[path] or 0) + value
+                elif path in unsets:
+                    # $inc on a field that will be absent starts from 0
+                    del unsets[path]
+                    sets[path] = value
+                else:
+                    incs[path] = incs.get(path, 0) + value
+            elif op == "$unset":
+                sets.pop(path, None)
+                incs.pop(path, None)
+                unsets[path] = ""
+            else:
+                raise ValueError(f"Cannot stage {op} updates")
+
+
+def _compact(update: dict) -> dict:
+    return {op: fields for op, fields in update.items() if fields}
+
+
+class UnitOfWork:
+    """Identity map plus pending updates for the user documents touched by one request."""
+
+    def __init__(self, repos):
+        self._users = repos.users
+        self._summaries = repos.user_summaries
+        self._docs: dict = {}      # user_id -> document (or None if not found)
+        self._fields: dict = {}    # user_id -> set of loaded fields, None = whole document
+        self._pending: dict = {}   # user_id -> merged update document
+        self._summary_pending: dict = {}  # user_id -> merged summary update
+
+    def get_user(self, user_id, fields=None) -> dict | None:
+        key = str(user_id)
+        if key in self._docs and self._covers(key, fields):
+            doc = self._docs[key]
+            return dict(doc) if doc is not None else None
+
+        if key in self._docs and fields is not None and self._fields.get(key) is not None:
+            fields = set(fields) | self._fields[key]
+        doc = self._users.get(user_id, fields=fields)
+        if doc is not None and key in self._pending:
+            apply_update(doc, self._pending[key])
+        self._docs[key] = doc
+        self._fields[key] = set(fields) if fields is not None else None
+        return dict(doc) if doc is not None else None
+
+    def _covers(self, key: str, fields) -> bool:
+        loaded = self._fields.get(key)
+        if loaded is None or self._docs[key] is None:
+            return True
+        return fields is not None and set(fields) <= loaded
+
+    def stage_user_update(self, user_id, update: dict) -> None:
+        key = str(user_id)
+        _merge_update(self._pending.setdefault(key, {}), update)
+        doc = self._docs.get(key)
+        if doc is not None:
+            apply_update(doc, copy.deepcopy(update))
+
+    def stage_summary_update(self, user_id, update: dict) -> None:
+        _merge_update(self._summary_pending.setdefault(str(user_id), {}), update)
+
+    def flush(self) -> int:
+        """Write every user's merged update; returns the number of writes issued."""
+        writes = 0
+        pending, self._pending = self._pending, {}
+        for user_id, update in pending.items():
+            update = _compact(update)
+            if update:
+                self._users.update(user_id, update)
+                writes += 1
+        summaries, self._summary_pending = self._summary_pending, {}
+        for user_id, update in summaries.items():
+            update = _compact(update)
+            if update:
+                self._summaries.apply(user_id, update)
+                writes += 1
+        return writes
+
+    def discard(self) -> None:
+        self._pending.clear()
+        self._summary_pending.clear()
+
+
+def current_unit_of_work() -> UnitOfWork | None:
+    """The request's unit of work (created on first use), or None outside a request."""
+    if not has_request_context():
+        return None
+    uow = g.get("unit_of_work")
+    if uow is None:
+        uow = g.unit_of_work = UnitOfWork(get_repositories())
+    return uow
+
+
+def get_user_doc(user_id, fields=None) -> dict | None:
+    """Read a user document through the request's identity map."""
+    uow = current_unit_of_work()
+    if uow is None:
+        return get_repositories().users.get(user_id, fields=fields)
+    return uow.get_user(user_id, fields=fields)
+
+
+def stage_user_update(user_id, update: dict) -> None:
+    """Defer a $set/$inc/$unset user update to the end of the request."""
+    uow = current_unit_of_work()
+    if uow is None:
+        get_repositories().users.update(user_id, update)
+    else:
+        uow.stage_user_update(user_id, update)
+
+
+def stage_summary_update(user_id, update: dict) -> None:
+    """Defer a $set/$inc update of the user's summary to the end of the request."""
+    uow = current_unit_of_work()
+    if uow is None:
+        get_repositories().user_summaries.apply(user_id, update)
+    else:
+        uow.stage_summary_update(user_id, update)
+
+
+def init_app(app) -> None:
+    """Flush staged user updates once the view has produced its response."""
+
+    @app.after_request
+    def flush_unit_of_work(response):
+        uow = g.pop("unit_of_work", None)
+        if uow is not None:
+            if response.status_code < 500:
+                uow.flush()
+            else:
+                uow.discard()
+        return response
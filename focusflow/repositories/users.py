@@ -0,0 +1,38 @@
+"""
+User documents.
+"""
+from .base import Repository, as_object_id
+
+
+class UserRepository(Repository):
+    collection_name = "users"
+    projection_required = True
+
+    def get(self, user_id, fields=None) -> dict | None:
+        return self.collection.find_one({"_id": as_object_id(user_id)}, self.projection(fields))
+
+    def find_by_email(self, email: str, fields=None) -> dict | None:
+        return self.collection.find_one({"email": email}, self.projection(fields))
+
+    def find_by_reset_token(self, token_hash: str, now, fields=None) -> dict | None:
+        return self.collection.find_one(
+            {"reset_token_hash": token_hash, "reset_token_expires": {"$gt": now}},
+            self.projection(fields),
+        )
+
+    def email_in_use(self, email: str, exclude_user_id=None) -> bool:
+        query = {"email": email}
+        if exclude_user_id is not None:
+            query["_id"] = {"$ne": as_object_id(exclude_user_id)}
+        return self.collection.find_one(query, {"_id": 1}) is not None
+
+    def iter_ids(self):
+        for doc in self.collection.find({}, {"_id": 1}):
+            yield doc["_id"]
+
+    def create(self, doc: dict) -> str:
+        return str(self.collection.insert_one(doc).inserted_id)
+
+    def update(self, user_id, update: dict) -> int:
+        """Apply a raw update document; returns the modified count."""
+        return self.collection.update_one({"_id": as_object_id(user_id)}, update).modified_count
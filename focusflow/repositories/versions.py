@@ -0,0 +1,35 @@
+"""
+Per-user resource version counters, keyed by the user's _id.
+
+Each document holds one counter per resource ("tasks", "notifications",
+"rewards") plus a random ``epoch`` chosen when the document is created, so
+counters that restart from zero never repeat an earlier (epoch, version).
+"""
+import secrets
+
+from pymongo import ReturnDocument
+
+from .base import Repository, as_object_id
+
+
+class ResourceVersionRepository(Repository):
+    collection_name = "resource_versions"
+
+    def current(self, user_id, resource: str) -> tuple[str, int]:
+        """The (epoch, version) of one of the user's resources, creating the document if needed."""
+        query = {"_id": as_object_id(user_id)}
+        projection = {"epoch": 1, resource: 1}
+        doc = self.collection.find_one(query, projection)
+        if doc is None:
+            doc = self.collection.find_one_and_update(
+                query, {"$setOnInsert": {"epoch": secrets.token_hex(4)}}, projection=projection,
+                upsert=True, return_document=ReturnDocument.AFTER,
+            )
+        return doc["epoch"], doc.get(resource, 0)
+
+    def bump(self, user_id, resources) -> None:
+        self.collection.update_one(
+            {"_id": as_object_id(user_id)},
+            {"$inc": {r: 1 for r in resources}, "$setOnInsert": {"epoch": secrets.token_hex(4)}},
+            upsert=True,
+        )
@@ -4,11 +4,9 @@ Handles login, signup, logout, and password management.
 """
 import os
 from flask import Blueprint
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
+from ...extensions import limiter
 
 auth_bp = Blueprint("auth", __name__)
-limiter = Limiter(get_remote_address)
 
 # Lazy loading of PEPPER to avoid checking before dotenv is loaded
 _PEPPER = None
@@ -1,13 +1,16 @@
 """
 Login and logout routes.
 """
+import logging
 import os
 from flask import render_template, request, redirect, url_for, flash
 from flask_login import login_user, logout_user, login_required
-from werkzeug.security import check_password_hash
-from db import get_db
+from ...repositories import get_repositories
+from ...services.passwords import HashingBusyError, hash_password, verify_password, needs_rehash
 from . import auth_bp
-from .user import User
+from .user import User, cache_user
+
+logger = logging.getLogger(__name__)
 
 
 @auth_bp.route("/login", methods=["GET", "POST"])
@@ -21,12 +24,27 @@ def login():
         pepper = os.getenv("PASSWORD_PEPPER", "")
         password_to_check = password + pepper
 
-        db = get_db()
-        user_doc = db["users"].find_one({"email": email})
+        users = get_repositories().users
+        user_doc = users.find_by_email(email, fields=("name", "email", "password"))
+
+        try:
+            valid = bool(user_doc) and verify_password(user_doc["password"], password_to_check)
+        except HashingBusyError:
+            flash("The server is busy, please try again in a moment.", "error")
+            return render_template("login.html"), 503
+
+        # Upgrade hashes made under an older policy while we have the plaintext;
+        # optional, so a busy hasher only postpones it to the next login
+        if valid and needs_rehash(user_doc["password"]):
+            try:
+                users.update(user_doc["_id"], {"$set": {"password": hash_password(password_to_check)}})
+            except HashingBusyError as e:
+                logger.warning(f"Skipping password rehash for user {user_doc['_id']}: {e}")
 
-        if user_doc and check_password_hash(user_doc["password"], password_to_check):
+        if valid:
             user = User(str(user_doc["_id"]), user_doc.get("name", ""), user_doc.get("email", ""))
             login_user(user, remember=remember)
+            cache_user(user)
             flash("Login successful!", "success")
             return redirect(url_for("dashboard.dashboard"))
 
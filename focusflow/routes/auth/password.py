@@ -4,17 +4,15 @@ Password management routes - update, forgot, and reset password.
 import os
 import secrets
 import hashlib
-import smtplib
-import ssl
 from datetime import datetime, timedelta, timezone
-from email.message import EmailMessage
 
 from flask import render_template, request, redirect, url_for, flash, current_app
 from flask_login import logout_user, login_required, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
-from bson.objectid import ObjectId
-from db import get_db
+from ...repositories import get_repositories
+from ...services.mail import enqueue_email
+from ...services.passwords import HashingBusyError, hash_password, verify_password
 from . import auth_bp
+from .user import invalidate_user
 
 
 @auth_bp.route("/updatepassword", methods=["GET", "POST"])
@@ -34,21 +32,25 @@ def updatepassword():
             flash("New passwords do not match.", "error")
             return render_template("updatepassword.html")
 
-        db = get_db()
-        users = db["users"]
-        user = users.find_one({"_id": ObjectId(current_user.id)})
+        users = get_repositories().users
+        user = users.get(current_user.id, fields=("password",))
         if not user:
             flash("User not found.", "error")
             return redirect(url_for("auth.login"))
 
         pepper = os.getenv("PASSWORD_PEPPER")
-        if not check_password_hash(user.get("password"), current_password + pepper):
-            flash("Current password is incorrect.", "error")
-            return render_template("updatepassword.html")
-
-        pepper_new_password = new_password + pepper
-        new_hash = generate_password_hash(pepper_new_password, method="scrypt", salt_length=16)
-        users.update_one({"_id": user["_id"]}, {"$set": {"password": new_hash}})
+        try:
+            if not verify_password(user.get("password"), current_password + pepper):
+                flash("Current password is incorrect.", "error")
+                return render_template("updatepassword.html")
+
+            pepper_new_password = new_password + pepper
+            new_hash = hash_password(pepper_new_password)
+        except HashingBusyError:
+            flash("The server is busy, please try again in a moment.", "error")
+            return render_template("updatepassword.html"), 503
+        users.update(user["_id"], {"$set": {"password": new_hash}})
+        invalidate_user(user["_id"])
 
         flash("Password updated successfully. Please log in again.", "success")
         logout_user()
@@ -63,17 +65,16 @@ def forgotpassword():
     if request.method == "POST":
         email = (request.form.get("email") or "").strip().lower()
 
-        db = get_db()
-        users = db["users"]
-        user = users.find_one({"email": email})
+        users = get_repositories().users
+        user = users.find_by_email(email, fields=("name", "email"))
 
         if user:
             reset_token = secrets.token_urlsafe(32)
             token_hash = hashlib.sha256(reset_token.encode("utf-8")).hexdigest()
             reset_expires = datetime.now(timezone.utc) + timedelta(hours=1)
 
-            users.update_one(
-                {"_id": user["_id"]},
+            users.update(
+                user["_id"],
                 {
                     "$set": {
                         "reset_token_hash": token_hash,
@@ -84,15 +85,7 @@ def forgotpassword():
 
             reset_link = url_for("auth.reset_password", token=reset_token, _external=True)
 
-            mail_server = os.getenv("MAIL_SERVER")
-            mail_sent = False
-            if mail_server:
-                mail_port = int(os.getenv("MAIL_PORT", "587"))
-                mail_username = os.getenv("MAIL_USERNAME")
-                mail_password = os.getenv("MAIL_PASSWORD")
-                mail_from = os.getenv("MAIL_FROM", mail_username or f"noreply@{mail_server}")
-                use_tls = os.getenv("MAIL_USE_TLS", "true").lower() in ("1", "true", "yes")
-
+            if current_app.config.get("MAIL_SERVER") or os.getenv("MAIL_SERVER"):
                 subject = "Focus Flow password reset"
                 body = (
                     f"Hi {user.get('name', '')},\n\n"
@@ -100,32 +93,11 @@ def forgotpassword():
                     f"{reset_link}\n\n"
                     "This link expires in 1 hour. If you did not request this, you can ignore this email.\n"
                 )
-
-                msg = EmailMessage()
-                msg["Subject"] = subject
-                msg["From"] = mail_from
-                msg["To"] = user["email"]
-                msg.set_content(body)
-
+                # Delivered by the mail worker so SMTP latency never holds up the response
                 try:
-                    if mail_port == 465:
-                        context = ssl.create_default_context()
-                        with smtplib.SMTP_SSL(mail_server, mail_port, context=context) as server:
-                            if mail_username and mail_password:
-                                server.login(mail_username, mail_password)
-                            server.send_message(msg)
-                    else:
-                        with smtplib.SMTP(mail_server, mail_port, timeout=10) as server:
-                            server.ehlo()
-                            if use_tls:
-                                server.starttls(context=ssl.create_default_context())
-                                server.ehlo()
-                            if mail_username and mail_password:
-                                server.login(mail_username, mail_password)
-                            server.send_message(msg)
-                    mail_sent = True
+                    enqueue_email(user["email"], subject, body)
                 except Exception:
-                    current_app.logger.exception("Failed to send password reset email")
+                    current_app.logger.exception("Failed to queue password reset email")
 
             # In debug mode, log the reset link for testing (don't auto-redirect)
             if current_app.debug or os.getenv("SHOW_RESET_LINK") == "1":
@@ -159,24 +131,24 @@ def reset_password(token: str):
         token_hash = hashlib.sha256(token.encode("utf-8")).hexdigest()
         now = datetime.now(timezone.utc)
 
-        db = get_db()
-        users = db["users"]
-
-        user = users.find_one({
-            "reset_token_hash": token_hash,
-            "reset_token_expires": {"$gt": now},
-        })
+        users = get_repositories().users
+        user = users.find_by_reset_token(token_hash, now, fields=("_id",))
 
         if not user:
             flash("Reset link is invalid or has expired.", "error")
             return redirect(url_for("auth.forgotpassword"))
         pepper = os.getenv("PASSWORD_PEPPER")
-        new_hash = generate_password_hash(new_password + pepper, method="scrypt", salt_length=16)
-
-        users.update_one(
-            {"_id": user["_id"]},
+        try:
+            new_hash = hash_password(new_password + pepper)
+        except HashingBusyError:
+            flash("The server is busy, please try again in a moment.", "error")
+            return render_template("updatepassword.html", token=token), 503
+
+        users.update(
+            user["_id"],
             {"$set": {"password": new_hash}, "$unset": {"reset_token_hash": "", "reset_token_expires": ""}},
         )
+        invalidate_user(user["_id"])
 
         flash("Password updated. Please log in.", "success")
         return redirect(url_for("auth.login"))
@@ -5,17 +5,19 @@ from datetime import datetime, timezone
 from flask import render_template, request
 from flask_login import login_required, current_user
 from bson.objectid import ObjectId
-from db import get_db
+from ...indexes import declare_index
+from ...repositories import get_repositories
+from ...repositories.unit_of_work import get_user_doc
 from . import auth_bp
 
+declare_index("profiles", "user_id", unique=True)
+
 
 @auth_bp.route("/profile", methods=["GET", "POST"])
 @login_required
 def profile():
     """User profile page with study preferences."""
-    db = get_db()
-    profiles_collection = db["profiles"]
-    users_collection = db["users"]
+    repos = get_repositories()
 
     if request.method == "POST":
         try:
@@ -24,23 +26,21 @@ def profile():
             preferred_difficulty = request.form.get("studyPrefs.preferredDifficulty")
             updated_at = datetime.now(timezone.utc)
 
-            profiles_collection.update_one(
-                {"user_id": ObjectId(current_user.id)},
+            repos.profiles.update(
+                current_user.id,
                 {
-                    "$set": {
-                        "studyPrefs.sessionLengthMins": session_length_mins,
-                        "studyPrefs.breakLongMins": break_long_mins,
-                        "studyPrefs.preferredDifficulty": preferred_difficulty,
-                        "updatedAt": updated_at,
-                    }
+                    "studyPrefs.sessionLengthMins": session_length_mins,
+                    "studyPrefs.breakLongMins": break_long_mins,
+                    "studyPrefs.preferredDifficulty": preferred_difficulty,
+                    "updatedAt": updated_at,
                 },
             )
             return {"message": "Preferences updated successfully."}, 200
         except Exception as e:
             return {"error": str(e)}, 400
 
-    user_data = users_collection.find_one({"_id": ObjectId(current_user.id)})
-    profile_data = profiles_collection.find_one({"user_id": ObjectId(current_user.id)})
+    user_data = get_user_doc(current_user.id, fields=("email", "tasks_done", "quizzes_taken", "streak"))
+    profile_data = repos.profiles.get(current_user.id)
 
     if not profile_data:
         now = datetime.now(timezone.utc)
@@ -55,7 +55,7 @@ def profile():
             "createdAt": now,
             "updatedAt": now,
         }
-        profiles_collection.insert_one(profile_data)
+        repos.profiles.create(profile_data)
 
     profile_data.update({
         "email": user_data.get("email"),
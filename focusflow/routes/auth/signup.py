@@ -4,10 +4,11 @@ User registration route.
 from datetime import datetime, timezone
 from flask import render_template, request, redirect, url_for, flash
 from flask_login import login_user
-from werkzeug.security import generate_password_hash
-from db import get_db
+from pymongo.errors import DuplicateKeyError
+from ...repositories import get_repositories
+from ...services.passwords import HashingBusyError, hash_password
 from . import auth_bp, get_pepper
-from .user import User
+from .user import User, cache_user
 
 
 @auth_bp.route("/signup", methods=["GET", "POST"])
@@ -33,30 +34,36 @@ def signup():
             flash("Please accept the terms and conditions", "error")
             return render_template("signup.html")
 
-        db = get_db()
-        users_collection = db["users"]
+        users = get_repositories().users
 
-        if users_collection.find_one({"email": email}):
+        if users.email_in_use(email):
             flash("Email already registered", "error")
             return render_template("signup.html")
 
-        hashed_pw = generate_password_hash(
-            password_with_pepper,
-            method="scrypt",
-            salt_length=16
-        )
-        result = users_collection.insert_one({
-            "name": name,
-            "email": email,
-            "password": hashed_pw,
-            "streak": 0,
-            "quizzes_taken": 0,
-            "tasks_done": 0,
-            "files": [],
-            "created_at": datetime.now(timezone.utc)
-        })
-        user = User(str(result.inserted_id), name, email)
+        try:
+            hashed_pw = hash_password(password_with_pepper)
+        except HashingBusyError:
+            flash("The server is busy, please try again in a moment.", "error")
+            return render_template("signup.html"), 503
+
+        try:
+            user_id = users.create({
+                "name": name,
+                "email": email,
+                "password": hashed_pw,
+                "streak": 0,
+                "quizzes_taken": 0,
+                "tasks_done": 0,
+                "files": [],
+                "created_at": datetime.now(timezone.utc)
+            })
+        except DuplicateKeyError:
+            # Registered by a concurrent request since the check above
+            flash("Email already registered", "error")
+            return render_template("signup.html")
+        user = User(user_id, name, email)
         login_user(user)
+        cache_user(user)
         flash("Account created successfully!", "success")
         return redirect(url_for("dashboard.dashboard"))
 
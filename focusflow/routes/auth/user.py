@@ -1,10 +1,19 @@
 """
 User class and loader for Flask-Login.
 """
+import os
 from flask_login import UserMixin
-from bson.objectid import ObjectId
-from db import get_db
+from ...cache import TTLCache
 from ...extensions import login_manager
+from ...indexes import declare_index
+from ...repositories.unit_of_work import get_user_doc
+
+# Login, signup and forgot-password look users up by email; reset links by token hash
+declare_index("users", "email", unique=True)
+declare_index("users", "reset_token_hash", sparse=True)
+
+# Fields needed to build a User; the rest of the document (quiz payload, files) is never loaded here
+IDENTITY_FIELDS = ("name", "email")
 
 
 class User(UserMixin):
@@ -15,11 +24,42 @@ class User(UserMixin):
         self.email = email
 
 
+# Lazy so USER_CACHE_* can come from .env, which is loaded in create_app
+_identity_cache = None
+
+
+def get_identity_cache() -> TTLCache:
+    """Per-process user_id -> (name, email) cache used by the user loader."""
+    global _identity_cache
+    if _identity_cache is None:
+        _identity_cache = TTLCache(
+            maxsize=int(os.getenv("USER_CACHE_SIZE", "10000")),
+            ttl=float(os.getenv("USER_CACHE_TTL", "60")),
+        )
+    return _identity_cache
+
+
+def cache_user(user: User) -> None:
+    """Prime the cache with a freshly authenticated user."""
+    get_identity_cache().set(str(user.id), (user.name, user.email))
+
+
+def invalidate_user(user_id) -> None:
+    """Drop a cached identity after its name, email or password changed."""
+    get_identity_cache().pop(str(user_id))
+
+
 @login_manager.user_loader
 def load_user(user_id):
-    """Load user from database."""
-    db = get_db()
-    doc = db["users"].find_one({"_id": ObjectId(user_id)})
+    """Load user from the identity cache, falling back to a projected lookup."""
+    cache = get_identity_cache()
+    cached = cache.get(user_id)
+    if cached is not None:
+        return User(user_id, *cached)
+
+    doc = get_user_doc(user_id, fields=IDENTITY_FIELDS)
     if not doc:
         return None
-    return User(str(doc["_id"]), doc.get("name", ""), doc.get("email", ""))
+    user = User(str(doc["_id"]), doc.get("name", ""), doc.get("email", ""))
+    cache_user(user)
+    return user
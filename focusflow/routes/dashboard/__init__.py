@@ -12,3 +12,5 @@ from .tasks_api import *
 from .notifications_api import *
 from .rewards_api import *
 from .focus_api import *
+from .summary_api import *
+from .events_api import *
@@ -0,0 +1,33 @@
+"""
+Server-Sent Events endpoint.
+"""
+from flask import Response, current_app, jsonify, request, stream_with_context
+from flask_login import login_required, current_user
+from ...extensions import limiter
+from ...services.events import event_stream, get_hub, stream_settings
+from . import dashboard_bp
+
+
+@dashboard_bp.route("/api/events", methods=["GET"])
+@limiter.exempt  # the browser reconnects every EVENTS_STREAM_SECONDS
+@login_required
+def events():
+    """
+    Stream the current user's events (notification, notification_dismissed,
+    reward, streak, quiz_ready) as text/event-stream. Reconnects resume after
+    the Last-Event-ID header the browser sends.
+    """
+    hub = get_hub()
+    if hub is None:
+        return jsonify({"success": False, "error": "Events are disabled"}), 404
+
+    stream = event_stream(
+        hub,
+        str(current_user.id),
+        request.headers.get("Last-Event-ID"),
+        **stream_settings(current_app.config),
+    )
+    response = Response(stream_with_context(stream), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"  # don't let a proxy buffer the stream
+    return response
@@ -4,6 +4,7 @@ Focus session API endpoint.
 from flask import request, jsonify
 from flask_login import login_required, current_user
 from ...services.focus import record_focus_session
+from ...services.rewards import check_and_award_rewards
 from . import dashboard_bp
 
 
@@ -20,8 +21,11 @@ def log_focus_session():
         return jsonify({"success": False, "error": "Missing session data"}), 400
         
     session_id = record_focus_session(current_user.id, mode, duration, task_id=task_id)
+    # Also pushed as a "reward" event to the user's open dashboards
+    new_rewards = check_and_award_rewards(current_user.id)
     
     return jsonify({
         "success": True,
-        "session_id": session_id
+        "session_id": session_id,
+        "new_rewards": new_rewards
     }), 200
@@ -1,51 +1,41 @@
 """
 Notification API endpoints.
 """
-from flask import jsonify
+from flask import jsonify, request
 from flask_login import login_required, current_user
 from bson.objectid import ObjectId
-from db import get_db
+from bson.errors import InvalidId
+from ...conditional import conditional_get
+from ...repositories import get_repositories
+from ...repositories.pagination import page_size
+from ...services.notifications import dismiss_notification as dismiss_for_user
 from . import dashboard_bp
 
 
 @dashboard_bp.route("/api/notifications", methods=["GET"])
 @login_required
+@conditional_get("notifications")
 def get_notifications():
-    """Return active (non-dismissed) notifications for the current user."""
+    """
+    Return a page of active (non-dismissed) notifications, newest first.
+    Query params: limit (default 50, max 200) and cursor (next_cursor of the previous page).
+    """
     try:
-        db = get_db()
-        notifications = db["notifications"]
-
-        user_oid = ObjectId(current_user.id)
-
-        docs = list(
-            notifications
-            .find({
-                "userId": user_oid,
-                "status": {"$ne": "dismissed"},
-            })
-            .sort("sentAt", -1)
+        limit = page_size(request.args.get("limit"))
+        docs, next_cursor = get_repositories().notifications.page_active(
+            current_user.id, limit, cursor=request.args.get("cursor"),
+            fields=("type", "status", "payload", "sentAt"),
         )
 
-        result = []
-        for n in docs:
-            # Safely convert payload, handling any ObjectIds
-            payload = n.get("payload") or {}
-            safe_payload = {}
-            for key, value in payload.items():
-                if isinstance(value, ObjectId):
-                    safe_payload[key] = str(value)
-                else:
-                    safe_payload[key] = value
-            
-            result.append({
-                "_id": str(n["_id"]),
-                "type": n.get("type"),
-                "status": n.get("status"),
-                "payload": safe_payload,
-            })
+        # ObjectIds in payloads are encoded by the app's JSON provider
+        result = [
+            {"_id": n["_id"], "type": n.get("type"), "status": n.get("status"), "payload": n.get("payload") or {}}
+            for n in docs
+        ]
 
-        return jsonify({"success": True, "notifications": result}), 200
+        return jsonify({"success": True, "notifications": result, "next_cursor": next_cursor}), 200
+    except ValueError as e:  # bad limit or cursor
+        return jsonify({"success": False, "error": str(e), "notifications": []}), 400
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -55,29 +45,16 @@ def get_notifications():
 @dashboard_bp.route("/api/notifications/dismiss/<notification_id>", methods=["PATCH"])
 @login_required
 def dismiss_notification(notification_id):
-    db = get_db()
-    notifications = db["notifications"]
-
     try:
         notif_oid = ObjectId(notification_id)
-        user_oid = ObjectId(current_user.id)
-    except Exception:
+    except (InvalidId, TypeError):
         return jsonify({
             "success": False,
             "error": "Invalid id"
         }), 200
 
     try:
-        result = notifications.update_one(
-            {
-                "_id": notif_oid,
-                "userId": user_oid,
-                "status": {"$ne": "dismissed"},
-            },
-            {"$set": {"status": "dismissed"}}
-        )
-
-        if result.modified_count > 0:
+        if dismiss_for_user(notif_oid, current_user.id):
             return jsonify({"success": True}), 200
         else:
             return jsonify({
@@ -3,16 +3,18 @@ Rewards API endpoints.
 """
 from flask import jsonify
 from flask_login import login_required, current_user
+from ...conditional import conditional_get
 from ...services.rewards import get_user_rewards, get_total_points, check_and_award_rewards
 from . import dashboard_bp
 
 
 @dashboard_bp.route("/api/rewards", methods=["GET"])
 @login_required
+@conditional_get("rewards")
 def get_rewards():
     """Get all rewards earned by the current user."""
     rewards = get_user_rewards(current_user.id)
-    total_points = get_total_points(current_user.id)
+    total_points = get_total_points(current_user.id, rewards)
     
     return jsonify({
         "success": True,
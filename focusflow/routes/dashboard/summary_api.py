@@ -0,0 +1,18 @@
+"""
+Dashboard summary API endpoint.
+"""
+from flask import jsonify
+from flask_login import login_required, current_user
+from ...services.summary import get_summary
+from . import dashboard_bp
+
+
+@dashboard_bp.route("/api/summary", methods=["GET"])
+@login_required
+def get_dashboard_summary():
+    """Return the current user's dashboard counters."""
+    summary = get_summary(current_user.id)
+    if summary is None:
+        return jsonify({"success": False, "error": "User not found"}), 404
+
+    return jsonify({"success": True, "summary": summary}), 200
@@ -1,56 +1,48 @@
 """
 Task API endpoints - CRUD operations for tasks.
 """
-from datetime import datetime
 from flask import request, jsonify
 from flask_login import login_required, current_user
 from bson.objectid import ObjectId
-from db import get_db
 from focusflow.services.notifications import create_notification
+from ...services.events import publish_event
+from ...services.rewards import check_and_award_rewards
 from ...services.streaks import record_streak_event, calculate_current_streak
+from ...services.tasks import apply_task_batch
+from ...services.summary import update_summary
+from ...conditional import bump_version, conditional_get
+from ...indexes import declare_index
+from ...repositories import get_repositories
+from ...repositories.pagination import page_size
+from ...repositories.unit_of_work import stage_user_update
 from . import dashboard_bp
 
+# Task lists are always per user, newest first (_id breaks ties for keyset paging)
+declare_index("tasks", [("user_id", 1), ("created_at", -1), ("_id", -1)])
 
-def serialize_value(value):
-    """Convert MongoDB types to JSON-serializable types."""
-    if isinstance(value, ObjectId):
-        return str(value)
-    elif hasattr(value, 'isoformat'):  # datetime objects
-        return value.isoformat()
-    elif isinstance(value, dict):
-        return {k: serialize_value(v) for k, v in value.items()}
-    elif isinstance(value, list):
-        return [serialize_value(item) for item in value]
-    else:
-        return value
-
-
-def serialize_task(task):
-    """Convert a task document to a JSON-serializable dict."""
-    return {k: serialize_value(v) for k, v in task.items()}
+# Fields of a task the dashboard shows (created_at is also the paging key)
+TASK_FIELDS = ("title", "done", "created_at")
 
 
 @dashboard_bp.route("/api/tasks", methods=["GET"])
 @login_required
+@conditional_get("tasks")
 def get_tasks():
-    """Get all tasks for the current user."""
+    """
+    Get a page of the current user's tasks, newest first.
+    Query params: limit (default 50, max 200) and cursor (next_cursor of the previous page).
+    """
     try:
-        db = get_db()
-        tasks_collection = db["tasks"]
-
-        # Find tasks for current user
-        tasks = list(tasks_collection.find(
-            {"user_id": ObjectId(current_user.id)}
-        ))
-
-        # Convert all tasks to JSON-serializable dicts
-        result = [serialize_task(task) for task in tasks]
+        limit = page_size(request.args.get("limit"))
+        tasks, next_cursor = get_repositories().tasks.page_for_user(
+            current_user.id, limit, cursor=request.args.get("cursor"), fields=TASK_FIELDS
+        )
 
-        # Sort by created_at descending
-        result.sort(key=lambda x: x.get("created_at") or "", reverse=True)
+        # The app's JSON provider encodes ObjectId and datetime fields as they are
+        return jsonify({"success": True, "tasks": tasks, "next_cursor": next_cursor}), 200
 
-        return jsonify({"success": True, "tasks": result}), 200
-        
+    except ValueError as e:  # bad limit or cursor
+        return jsonify({"success": False, "error": str(e), "tasks": []}), 400
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -61,44 +53,56 @@ def get_tasks():
 @login_required
 def create_task():
     """Create a new task for the current user."""
-    data = request.get_json()
-    title = (data.get("title") or "").strip()
+    data = request.get_json(silent=True)
+    title = data.get("title") if isinstance(data, dict) else None
+    title = title.strip() if isinstance(title, str) else ""
 
     if not title:
         return jsonify({"success": False, "error": "Task title is required"}), 400
 
-    db = get_db()
-    tasks_collection = db["tasks"]
-
-    result = tasks_collection.insert_one({
-        "user_id": ObjectId(current_user.id),
-        "title": title,
-        "done": False,
-        "created_at": datetime.now(),
-    })
+    task = get_repositories().tasks.create(current_user.id, title)
+    bump_version(current_user.id, "tasks")
+    update_summary(current_user.id, inc={"open_tasks": 1})
 
     return jsonify({
         "success": True,
-        "task_id": str(result.inserted_id),
+        "task_id": str(task["_id"]),
         "title": title,
         "done": False
     }), 201
 
 
+@dashboard_bp.route("/api/tasks/batch", methods=["POST"])
+@login_required
+def batch_tasks():
+    """
+    Apply several task operations in one request, e.g.
+    {"operations": [{"op": "create", "title": "Read"}, {"op": "toggle", "task_id": "...", "done": true},
+                    {"op": "rename", "task_id": "...", "title": "..."}, {"op": "delete", "task_id": "..."}]}
+    "done" is optional for toggle. Returns one result per operation, in order.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"success": False, "error": "Expected a JSON object"}), 400
+    try:
+        outcome = apply_task_batch(current_user.id, data.get("operations"))
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    return jsonify({"success": True, **outcome}), 200
+
+
 @dashboard_bp.route("/api/tasks/<task_id>", methods=["DELETE"])
 @login_required
 def delete_task(task_id):
     """Delete a task for the current user."""
-    db = get_db()
-    tasks_collection = db["tasks"]
+    tasks = get_repositories().tasks
 
     try:
-        result = tasks_collection.delete_one({
-            "_id": ObjectId(task_id),
-            "user_id": ObjectId(current_user.id)
-        })
-
-        if result.deleted_count > 0:
+        deleted = tasks.delete(task_id, current_user.id)
+        if deleted:
+            bump_version(current_user.id, "tasks")
+            if not deleted.get("done"):
+                update_summary(current_user.id, inc={"open_tasks": -1})
             return jsonify({"success": True}), 200
         else:
             return jsonify({"success": False, "error": "Task not found"}), 404
@@ -110,9 +114,7 @@ def delete_task(task_id):
 @login_required
 def toggle_task(task_id):
     """Toggle the completion status of a task."""
-    db = get_db()
-    tasks_collection = db["tasks"]
-    users_collection = db["users"]
+    repos = get_repositories()
 
     try:
         user_oid = ObjectId(current_user.id)
@@ -121,10 +123,7 @@ def toggle_task(task_id):
         return jsonify({"success": False, "error": f"Invalid id: {e}"}), 400
 
     try:
-        task = tasks_collection.find_one({
-            "_id": task_oid,
-            "user_id": user_oid
-        })
+        task = repos.tasks.get(task_oid, user_id=user_oid, fields=("title", "done"))
 
         if not task:
             return jsonify({"success": False, "error": "Task not found"}), 404
@@ -132,16 +131,11 @@ def toggle_task(task_id):
         old_done_status = task.get("done", False)
         new_done_status = not old_done_status
 
-        result = tasks_collection.update_one(
-            {"_id": task_oid, "user_id": user_oid},
-            {"$set": {"done": new_done_status}}
-        )
-
-        if result.modified_count <= 0:
+        if not repos.tasks.set_done(task_oid, user_oid, new_done_status):
             return jsonify({"success": False, "error": "Failed to update task"}), 500
+        bump_version(user_oid, "tasks")
 
         create_notification(
-            db=db,
             user_id=current_user.id,
             notification_type="task_due",
             payload={
@@ -155,12 +149,18 @@ def toggle_task(task_id):
         streak = calculate_current_streak(current_user.id)
 
         # Update the cached streak on the user document
-        users_collection.update_one(
-            {"_id": user_oid},
-            {"$set": {"streak": streak}}
+        stage_user_update(user_oid, {"$set": {"streak": streak}})
+        update_summary(
+            user_oid,
+            inc={"open_tasks": -1 if new_done_status else 1},
+            set_fields={"streak": streak},
         )
+        publish_event(user_oid, "streak", {"streak": streak})
+
+        # Also pushed as a "reward" event to the user's open dashboards
+        new_rewards = check_and_award_rewards(current_user.id)
 
-        return jsonify({"success": True, "done": new_done_status, "streak": streak}), 200
+        return jsonify({"success": True, "done": new_done_status, "streak": streak, "new_rewards": new_rewards}), 200
 
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 400
@@ -0,0 +1,72 @@
+"""
+Operational metrics endpoint.
+"""
+import hmac
+
+from flask import Blueprint, abort, current_app, jsonify, request
+
+import db
+from ..instrumentation import command_metrics
+from ..repositories import get_repositories
+from ..services.questions import (
+    extraction_cache_stats,
+    extractor_stats,
+    extractors_for,
+    generation_cache_stats,
+    registered_extractors,
+)
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+def _authorized() -> bool:
+    """Require 'Authorization: Bearer <METRICS_TOKEN>'; no token configured = disabled."""
+    token = current_app.config.get("METRICS_TOKEN")
+    if not token:
+        return False
+    supplied = request.headers.get("Authorization", "")
+    return hmac.compare_digest(supplied, f"Bearer {token}")
+
+
+@metrics_bp.route("/api/metrics/db", methods=["GET"])
+def db_metrics():
+    """Per-route MongoDB command counts/latency plus connection pool usage."""
+    if not _authorized():
+        abort(404)
+
+    routes = command_metrics.snapshot()
+    if request.args.get("reset") == "1":
+        command_metrics.reset()
+
+    return jsonify({
+        "success": True,
+        "routes": routes,
+        "pool": db.pool_stats(),
+    }), 200
+
+
+@metrics_bp.route("/api/metrics/caches", methods=["GET"])
+def cache_metrics():
+    """Hit/miss counts of this process's result caches."""
+    if not _authorized():
+        abort(404)
+
+    extraction = extraction_cache_stats()
+    extraction.update(get_repositories().extraction_cache.stats())
+    generation = generation_cache_stats()
+    generation.update(get_repositories().generation_cache.stats())
+    return jsonify({"success": True, "extraction": extraction, "generation": generation}), 200
+
+
+@metrics_bp.route("/api/metrics/extractors", methods=["GET"])
+def extractor_metrics():
+    """Installed text-extraction backends per format, and the time each has spent."""
+    if not _authorized():
+        abort(404)
+
+    formats = sorted({fmt for spec in registered_extractors() for fmt in spec.formats})
+    return jsonify({
+        "success": True,
+        "backends": {fmt: [spec.name for spec in extractors_for(fmt)] for fmt in formats},
+        "timings": extractor_stats(),
+    }), 200
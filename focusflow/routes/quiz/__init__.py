@@ -1,6 +1,6 @@
 """
 Quiz routes module.
-Handles quiz display, submission, and streak management.
+Handles quiz display, submission, generation job status, and streak management.
 """
 from flask import Blueprint
 
@@ -9,3 +9,4 @@ quiz_bp = Blueprint("quiz", __name__)
 # Import routes after blueprint is created to avoid circular imports
 from .views import *
 from .streak_api import *
+from .jobs_api import *
@@ -0,0 +1,39 @@
+"""
+Quiz generation job status endpoint.
+"""
+from bson.objectid import ObjectId
+from flask import jsonify, url_for
+from flask_login import login_required, current_user
+from ...extensions import limiter
+from ...services.quiz_jobs import get_job_status
+from . import quiz_bp
+
+
+@quiz_bp.route("/api/quiz/jobs/<job_id>", methods=["GET"])
+@limiter.exempt  # polled every few seconds while a quiz is generated
+@login_required
+def quiz_job_status(job_id):
+    """
+    Status of one of the current user's uploads: queued, extracting,
+    extracted, generating, done (with a redirect to the quiz), failed
+    (with an error message) or cancelled (replaced by a newer upload).
+    """
+    if not ObjectId.is_valid(job_id):
+        return jsonify({"success": False, "error": "Invalid id"}), 400
+
+    job = get_job_status(job_id, current_user.id)
+    if job is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+
+    body = {
+        "id": job["_id"],
+        "status": job["status"],
+        "filename": job.get("filename"),
+        "error": job.get("error"),
+        "questions": job.get("question_count"),
+    }
+    if job["status"] == "done":
+        body["redirect"] = url_for("quiz.quiz")
+    response = jsonify({"success": True, "job": body})
+    response.headers["Cache-Control"] = "no-store"
+    return response, 200
@@ -3,8 +3,9 @@ Streak API endpoint.
 """
 from flask import jsonify
 from flask_login import login_required, current_user
-from bson.objectid import ObjectId
-from db import get_db
+from ...repositories.unit_of_work import get_user_doc, stage_user_update
+from ...services.events import publish_event
+from ...services.summary import update_summary
 from . import quiz_bp
 
 
@@ -12,25 +13,18 @@ from . import quiz_bp
 @login_required
 def increment_streak():
     """Increment the current user's streak and return the updated value."""
-    db = get_db()
-    users = db["users"]
-    
-    user = users.find_one({"_id": ObjectId(current_user.id)})
+    user = get_user_doc(current_user.id, fields=("streak",))
     if not user:
         return jsonify({"success": False, "error": "User not found"}), 404
     
-    # Increment the streak by 1
-    result = users.update_one(
-        {"_id": ObjectId(current_user.id)},
-        {"$inc": {"streak": 1}}
-    )
-    
-    if result.modified_count > 0:
-        # Get the updated user document to return the new streak value
-        updated_user = users.find_one({"_id": ObjectId(current_user.id)})
-        return jsonify({
-            "success": True,
-            "streak": updated_user.get("streak", 0)
-        }), 200
-    else:
-        return jsonify({"success": False, "error": "Failed to update streak"}), 500
+    # Increment the streak by 1; written once at the end of the request,
+    # while the identity map already reflects the new value
+    stage_user_update(current_user.id, {"$inc": {"streak": 1}})
+    update_summary(current_user.id, inc={"streak": 1})
+    updated_user = get_user_doc(current_user.id, fields=("streak",))
+    publish_event(current_user.id, "streak", {"streak": updated_user.get("streak", 0)})
+
+    return jsonify({
+        "success": True,
+        "streak": updated_user.get("streak", 0)
+    }), 200
@@ -5,20 +5,23 @@ import os
 from datetime import datetime
 from flask import render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_required, current_user
-from bson.objectid import ObjectId
-from db import get_db
+from ...conditional import bump_version
+from ...repositories import get_repositories
+from ...repositories.unit_of_work import get_user_doc, stage_user_update
+from ..auth.user import invalidate_user
+from ...services.events import publish_event
 from ...services.rewards import check_and_award_rewards
 from ...services.streaks import record_streak_event, calculate_current_streak
+from ...services.summary import update_summary
 from . import quiz_bp
 
 
 @quiz_bp.route("/quiz", methods=["GET", "POST"])
 @login_required
 def quiz():
-    db = get_db()
-    users = db["users"]
+    repos = get_repositories()
 
-    user_doc = users.find_one({"_id": ObjectId(current_user.id)})
+    user_doc = get_user_doc(current_user.id, fields=("current_questions", "current_file"))
     if not user_doc:
         flash("User not found", "error")
         return redirect(url_for("auth.login"))
@@ -71,6 +74,7 @@ def quiz():
             pass
 
         # Update user stats
+        task_closed = False
         update = {
             "$inc": {"quizzes_taken": 1},
             "$unset": {"current_questions": "", "current_file": ""}
@@ -90,26 +94,24 @@ def quiz():
             
             if task_id:
                 try:
-                    tasks_collection = db["tasks"]
-                    task_oid = ObjectId(task_id) if isinstance(task_id, str) else task_id
-                    task = tasks_collection.find_one({"_id": task_oid})
-                    
-                    if task:
-                        # Mark task as done
-                        tasks_collection.update_one({"_id": task_oid}, {"$set": {"done": True}})
-                        
-                        # Only increment if not already credited
-                        if task.get("stats_credited"):
-                            can_increment_tasks_done = False
-                        else:
-                            tasks_collection.update_one({"_id": task_oid}, {"$set": {"stats_credited": True}})
+                    # Mark task as done; only increment if not already credited
+                    completion = repos.tasks.complete_for_credit(task_id)
+                    can_increment_tasks_done, task_closed = completion
+                    if any(completion):
+                        bump_version(current_user.id, "tasks")
                 except:
                     pass
             
             if can_increment_tasks_done:
                 update["$inc"]["tasks_done"] = 1
 
-        users.update_one({"_id": ObjectId(current_user.id)}, update)
+        stage_user_update(current_user.id, update)
+        summary_inc = dict(update["$inc"])
+        if task_closed:
+            summary_inc["open_tasks"] = -1
+        update_summary(current_user.id, inc=summary_inc, set_fields=update.get("$set"))
+        if passed:
+            publish_event(current_user.id, "streak", {"streak": update["$set"]["streak"]})
         
         # Check for new rewards after quiz completion
         check_and_award_rewards(current_user.id)
@@ -128,10 +130,9 @@ def quiz():
 @quiz_bp.route("/profile", methods=["GET", "POST"])
 @login_required
 def profile():
-    db = get_db()
-    users = db["users"]
+    users = get_repositories().users
 
-    user_doc = users.find_one({"_id": ObjectId(current_user.id)})
+    user_doc = get_user_doc(current_user.id, fields=("name", "email", "streak", "quizzes_taken", "tasks_done"))
     if not user_doc:
         flash("User not found", "error")
         return redirect(url_for("auth.login"))
@@ -144,15 +145,12 @@ def profile():
             flash("Name and email are required.", "error")
             return redirect(url_for("quiz.profile"))
 
-        exists = users.find_one({"email": email, "_id": {"$ne": ObjectId(current_user.id)}})
-        if exists:
+        if users.email_in_use(email, exclude_user_id=current_user.id):
             flash("That email is already in use.", "error")
             return redirect(url_for("quiz.profile"))
 
-        users.update_one(
-            {"_id": ObjectId(current_user.id)},
-            {"$set": {"name": name, "email": email}},
-        )
+        users.update(current_user.id, {"$set": {"name": name, "email": email}})
+        invalidate_user(current_user.id)
 
         current_user.name = name
         current_user.email = email
@@ -0,0 +1,68 @@
+"""
+Helpers shared by the services that run work in the background.
+
+``setting`` reads a service option: app.config first, then the environment
+variable of the same name, then the default (empty values count as unset).
+
+``ProcessThreads`` keeps a service's daemon threads running in whichever
+process uses it. Threads don't survive a fork, so a server that forks its
+workers after the app is created gets new threads in each worker process.
+"""
+import os
+import threading
+from typing import Callable
+
+from flask import current_app, has_app_context
+
+
+def setting(config, key: str, default=None):
+    """``key`` from ``config`` (may be None), else the environment, else ``default``."""
+    value = config.get(key) if config is not None else None
+    if value is None:
+        value = os.getenv(key)
+    return default if value in (None, "") else value
+
+
+def app_setting(key: str, default=None):
+    """``setting`` for the current app (just the environment outside an app context)."""
+    return setting(current_app.config if has_app_context() else None, key, default)
+
+
+class ProcessThreads:
+    """
+    ``count`` daemon threads running ``target``. ``stop`` is the event that
+    tells ``target`` to return; it is cleared whenever threads are started.
+    """
+
+    def __init__(self, target: Callable[[], None], name: str, count: int = 1,
+                 stop: threading.Event | None = None):
+        self.target = target
+        self.name = name
+        self.count = count
+        self.stop = stop
+        self._threads: list = []
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _running(self, pid: int) -> bool:
+        return self._pid == pid and len(self._threads) == self.count and all(t.is_alive() for t in self._threads)
+
+    def ensure_running(self) -> None:
+        """Start the threads missing in this process."""
+        pid = os.getpid()
+        if self._running(pid):
+            return
+        with self._lock:
+            if self._running(pid):
+                return
+            if self._pid != pid:
+                self._threads = []
+                self._pid = pid
+            self._threads = [t for t in self._threads if t.is_alive()]
+            if self.stop is not None:
+                self.stop.clear()
+            while len(self._threads) < self.count:
+                name = self.name if self.count == 1 else f"{self.name}-{len(self._threads)}"
+                thread = threading.Thread(target=self.target, name=name, daemon=True)
+                self._threads.append(thread)
+                thread.start()
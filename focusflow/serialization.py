@@ -0,0 +1,103 @@
+"""
+App-wide JSON encoding for MongoDB documents.
+
+``MongoJSONProvider`` replaces Flask's default provider, so ``jsonify`` and
+``app.json`` encode ``ObjectId`` (as its hex string), ``datetime`` (ISO 8601),
+``Decimal128`` and the other BSON types found in documents directly,
+without copying them into plain dicts first. orjson does the encoding when
+it is installed; otherwise the standard library's json is used with the
+same conversions.
+"""
+import datetime
+import decimal
+import json
+import uuid
+
+from bson.decimal128 import Decimal128
+from bson.objectid import ObjectId
+from bson.timestamp import Timestamp
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # pure-Python fallback
+    orjson = None
+
+
+def json_default(value):
+    """Encode the types the json module (and orjson) don't know about."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, Decimal128):
+        return str(value.to_decimal())
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    if isinstance(value, Timestamp):
+        return value.as_datetime().isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps_bytes(obj, indent: bool = False, sort_keys: bool = False) -> bytes:
+    separators = None if indent else (",", ":")
+    text = json.dumps(obj, default=json_default, ensure_ascii=False, sort_keys=sort_keys,
+                      indent=2 if indent else None, separators=separators)
+    return text.encode()
+
+
+def _orjson_dumps_bytes(obj, indent: bool = False, sort_keys: bool = False) -> bytes:
+    option = orjson.OPT_NON_STR_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    return orjson.dumps(obj, default=json_default, option=option)
+
+
+dumps_bytes = _orjson_dumps_bytes if orjson is not None else _stdlib_dumps_bytes
+loads = orjson.loads if orjson is not None else json.loads
+
+
+def dumps(obj, **kwargs) -> str:
+    """Encode ``obj`` to a JSON string (keyword arguments select the json module's options)."""
+    if kwargs:
+        kwargs.setdefault("default", json_default)
+        return json.dumps(obj, **kwargs)
+    return dumps_bytes(obj).decode()
+
+
+class MongoJSONProvider(JSONProvider):
+    """Flask JSON provider that encodes documents straight from the database."""
+
+    # Key order of API responses is the order the view built them in
+    sort_keys = False
+    # None: indented in debug mode, compact otherwise (like Flask's default provider)
+    compact: bool | None = None
+    mimetype = "application/json"
+
+    def __init__(self, app, use_orjson: bool | None = None):
+        super().__init__(app)
+        if use_orjson is None:
+            use_orjson = orjson is not None
+        self._dumps_bytes = _orjson_dumps_bytes if use_orjson else _stdlib_dumps_bytes
+
+    def dumps(self, obj, **kwargs) -> str:
+        return dumps(obj, **kwargs) if kwargs else self._dumps_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return json.loads(s, **kwargs) if kwargs else loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            self._dumps_bytes(obj, indent=indent, sort_keys=self.sort_keys), mimetype=self.mimetype
+        )
+
+
+def init_app(app) -> None:
+    """Encode all JSON responses with ``MongoJSONProvider``."""
+    app.json = MongoJSONProvider(app)
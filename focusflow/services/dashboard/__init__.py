@@ -0,0 +1,7 @@
+"""
+Dashboard service module.
+Builds the data shown on the dashboard page in one read.
+"""
+from .snapshot import DEFAULT_STUDY_PREFS, get_dashboard_snapshot
+
+__all__ = ['DEFAULT_STUDY_PREFS', 'get_dashboard_snapshot']
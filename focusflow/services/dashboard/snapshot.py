@@ -0,0 +1,44 @@
+"""
+Dashboard snapshot: stats, open tasks, notifications, rewards and study
+preferences for one user, fetched together.
+"""
+from ...repositories import get_repositories
+from ..rewards import describe_rewards
+from ..summary import rebuild_summary
+
+DEFAULT_STUDY_PREFS = {
+    "sessionLengthMins": 25,
+    "breakLongMins": 15,
+    "preferredDifficulty": "medium"
+}
+
+
+def get_dashboard_snapshot(user_id: str) -> dict | None:
+    """
+    Get everything the dashboard template renders for a user.
+    Returns None if the user does not exist.
+    """
+    snapshot = get_repositories().dashboard.snapshot(user_id)
+    if snapshot is None:
+        return None
+
+    # Counters come from the summary read model, built on first use
+    summary = snapshot["summary"] or rebuild_summary(user_id) or {}
+
+    for doc in snapshot["open_tasks"] + snapshot["notifications"]:
+        doc["_id"] = str(doc["_id"])
+
+    rewards = describe_rewards(snapshot["rewards"])
+    profile = snapshot["profile"] or {}
+
+    return {
+        "streak": summary.get("streak", 0),
+        "quizzes_taken": summary.get("quizzes_taken", 0),
+        "tasks_done": summary.get("tasks_done", 0),
+        "open_tasks": snapshot["open_tasks"],
+        "notifications": snapshot["notifications"],
+        "notifications_cursor": snapshot["notifications_cursor"],
+        "rewards": rewards,
+        "total_points": summary.get("total_points", 0),
+        "study_prefs": profile.get("studyPrefs", DEFAULT_STUDY_PREFS),
+    }
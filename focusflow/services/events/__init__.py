@@ -0,0 +1,20 @@
+"""
+Events service module.
+Publishes per-user dashboard events to Server-Sent Events streams.
+"""
+from .handlers import EVENT_TYPES, event_stream, format_event, get_hub, init_app, publish_event, stream_settings
+from .hub import EventHub, MemoryBus, MongoBus, Subscription
+
+__all__ = [
+    'EVENT_TYPES',
+    'publish_event',
+    'event_stream',
+    'format_event',
+    'get_hub',
+    'stream_settings',
+    'init_app',
+    'EventHub',
+    'MemoryBus',
+    'MongoBus',
+    'Subscription',
+]
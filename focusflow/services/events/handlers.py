@@ -0,0 +1,121 @@
+"""
+Per-user event publishing and the Server-Sent Events stream format.
+
+Code paths that change something a dashboard shows call
+``publish_event(user_id, type, data)``. Inside a request the event is held
+until the response is ready and dropped if the request fails, like the
+unit of work's staged writes; outside a request it is published at once.
+
+Configuration (environment or app.config):
+    EVENTS_ENABLED          set to false to disable the stream (default true)
+    EVENTS_KEEPALIVE_SECONDS  comment line sent on an idle stream (default 15)
+    EVENTS_STREAM_SECONDS   a stream ends after this long and the browser
+                            reconnects with Last-Event-ID (default 300)
+    EVENTS_QUEUE_SIZE       events buffered per stream before it is dropped (default 100)
+    EVENTS_CAPPED_BYTES     size of the capped ``events`` collection (default 16 MB)
+"""
+import logging
+import time
+
+from flask import current_app, g, has_app_context, has_request_context
+
+from ...runtime import setting
+from ...serialization import dumps, dumps_bytes, loads
+from .hub import EventHub, MemoryBus, MongoBus
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = ("notification", "notification_dismissed", "reward", "streak", "quiz_ready")
+
+# Browser reconnect delay after a stream ends
+RETRY_MS = 3000
+
+
+def get_hub() -> EventHub | None:
+    if not has_app_context():
+        return None
+    return current_app.extensions.get("events")
+
+
+def publish_event(user_id, event_type: str, data: dict | None = None) -> None:
+    """Publish an event to the user's open streams (after the request succeeds)."""
+    if event_type not in EVENT_TYPES:
+        raise ValueError(f"Unknown event type: {event_type}")
+    if get_hub() is None:
+        return
+    # Serialize now so the payload cannot change before the event is sent
+    payload = loads(dumps_bytes(data or {}))
+    if has_request_context():
+        g.setdefault("pending_events", []).append((str(user_id), event_type, payload))
+    else:
+        _publish(str(user_id), event_type, payload)
+
+
+def _publish(user_id: str, event_type: str, data: dict) -> None:
+    try:
+        get_hub().publish(user_id, event_type, data)
+    except Exception as e:
+        logger.error(f"Could not publish {event_type} event for user {user_id}: {e}")
+
+
+def format_event(event: dict) -> str:
+    """One event in the text/event-stream format."""
+    data = dumps(event["data"])
+    return f"id: {event['seq']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+
+def event_stream(hub: EventHub, user_id: str, last_event_id: str | None,
+                 keepalive: float, max_seconds: float):
+    """
+    Generate a user's stream: events missed since ``last_event_id``, then
+    live events until ``max_seconds`` pass or the subscriber falls behind.
+    """
+    sub = hub.subscribe(user_id)
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        replayed = set()
+        if last_event_id and last_event_id.isdigit():
+            for event in hub.replay(user_id, int(last_event_id)):
+                replayed.add(event["_id"])
+                yield format_event(event)
+        deadline = time.monotonic() + max_seconds
+        while not sub.closed:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            event = sub.get(timeout=min(keepalive, remaining))
+            if event is None:
+                yield ": keepalive\n\n"
+            elif event["_id"] not in replayed:
+                yield format_event(event)
+    finally:
+        hub.unsubscribe(sub)
+
+
+def stream_settings(config) -> dict:
+    return {
+        "keepalive": float(setting(config, "EVENTS_KEEPALIVE_SECONDS", 15)),
+        "max_seconds": float(setting(config, "EVENTS_STREAM_SECONDS", 300)),
+    }
+
+
+def init_app(app) -> None:
+    """Create the process's event hub and publish held events after each successful request."""
+    config = app.config
+    config["EVENTS_ENABLED"] = str(setting(config, "EVENTS_ENABLED", "true")).lower() in ("1", "true", "yes")
+    if not config["EVENTS_ENABLED"]:
+        return
+
+    if config.get("DATA_BACKEND") == "mongo":
+        bus = MongoBus(app, size_bytes=int(setting(config, "EVENTS_CAPPED_BYTES", 16 * 1024 * 1024)))
+    else:
+        bus = MemoryBus()
+    app.extensions["events"] = EventHub(bus, max_queue=int(setting(config, "EVENTS_QUEUE_SIZE", 100)))
+
+    @app.after_request
+    def publish_pending_events(response):
+        pending = g.pop("pending_events", None)
+        if pending and response.status_code < 500:
+            for user_id, event_type, data in pending:
+                _publish(user_id, event_type, data)
+        return response
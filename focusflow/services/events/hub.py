@@ -0,0 +1,206 @@
+"""
+In-process pub/sub hub for per-user events.
+
+Every open ``/api/events`` stream is a ``Subscription`` (a bounded queue)
+registered with the process's ``EventHub``. Published events go through a
+bus that decides how they reach the hubs:
+
+- ``MemoryBus`` (memory backend, single process): dispatch directly and keep
+  a short in-process history for Last-Event-ID resume.
+- ``MongoBus`` (mongo backend): append to a capped ``events`` collection; a
+  relay thread in each process tails it and dispatches to local
+  subscribers, so an event published by one worker reaches streams held by
+  any other. The collection doubles as the resume history.
+"""
+import logging
+import queue
+import threading
+from collections import deque
+from datetime import timedelta
+
+from bson.objectid import ObjectId
+
+from ...indexes import declare_index
+from ...repositories import get_repositories
+from ...runtime import ProcessThreads
+
+logger = logging.getLogger(__name__)
+
+# Last-Event-ID resume reads a user's events by sequence number; each
+# number is logged once (see EventLogRepository.append)
+declare_index("events", [("user_id", 1), ("seq", 1)], unique=True, name="user_id_1_seq_1_unique")
+
+
+class Subscription:
+    """One stream's queue of events; closed (and must reconnect) if it falls behind."""
+
+    def __init__(self, user_id: str, max_queue: int):
+        self.user_id = user_id
+        self.closed = False
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+
+    def offer(self, event: dict) -> bool:
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except queue.Full:
+            self.closed = True
+            return False
+
+    def get(self, timeout: float) -> dict | None:
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventHub:
+    """Subscribers of this process, by user."""
+
+    def __init__(self, bus, max_queue: int = 100):
+        self.bus = bus
+        self.max_queue = max_queue
+        self._subscribers: dict[str, set] = {}
+        self._lock = threading.Lock()
+        bus.attach(self)
+
+    def subscribe(self, user_id) -> Subscription:
+        self.bus.ensure_running()
+        sub = Subscription(str(user_id), self.max_queue)
+        with self._lock:
+            self._subscribers.setdefault(sub.user_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subscribers.get(sub.user_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.user_id]
+
+    def publish(self, user_id, event_type: str, data: dict) -> dict:
+        event = {"_id": ObjectId(), "user_id": ObjectId(user_id), "type": event_type, "data": data}
+        self.bus.publish(event)
+        return event
+
+    def replay(self, user_id, after_seq: int) -> list:
+        """The user's events after sequence number ``after_seq`` (the stream's event ids)."""
+        return self.bus.replay(user_id, after_seq)
+
+    def dispatch(self, event: dict) -> None:
+        """Hand an event to this process's subscribers of its user."""
+        with self._lock:
+            subs = list(self._subscribers.get(str(event["user_id"]), ()))
+        for sub in subs:
+            if not sub.offer(event):
+                logger.info(f"Closing event stream of user {sub.user_id}: queue full")
+                self.unsubscribe(sub)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(s) for s in self._subscribers.values())
+
+
+class MemoryBus:
+    """Single-process bus for the memory backend."""
+
+    def __init__(self, history: int = 1000):
+        self._history: deque = deque(maxlen=history)
+        self._hub = None
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def attach(self, hub: EventHub) -> None:
+        self._hub = hub
+
+    def ensure_running(self) -> None:
+        pass
+
+    def publish(self, event: dict) -> None:
+        with self._lock:
+            self._seq += 1
+            event["seq"] = self._seq
+            self._history.append(event)
+        self._hub.dispatch(event)
+
+    def replay(self, user_id, after_seq: int) -> list:
+        user_oid = ObjectId(user_id)
+        return [e for e in list(self._history) if e["user_id"] == user_oid and e["seq"] > after_seq]
+
+
+class MongoBus:
+    """Cross-process bus over a capped collection, tailed by one relay thread per process."""
+
+    # ObjectIds from different processes are only roughly ordered, so a
+    # re-opened tail starts this far back and skips ids it already relayed
+    REWIND = timedelta(seconds=2)
+
+    def __init__(self, app, size_bytes: int = 16 * 1024 * 1024, max_await_ms: int = 1000):
+        self.app = app
+        self.size_bytes = size_bytes
+        self.max_await_ms = max_await_ms
+        self._hub = None
+        self._stop = threading.Event()
+        self._threads = ProcessThreads(self.run, "event-relay", stop=self._stop)
+        self._recent: deque = deque(maxlen=4096)
+        self._recent_ids: set = set()
+        self._capped = False
+
+    def attach(self, hub: EventHub) -> None:
+        self._hub = hub
+
+    def _events(self):
+        repo = get_repositories().events
+        if not self._capped:
+            repo.ensure_capped(self.size_bytes)
+            self._capped = True
+        return repo
+
+    def publish(self, event: dict) -> None:
+        self._events().append(event)
+
+    def replay(self, user_id, after_seq: int) -> list:
+        return self._events().since(user_id, after_seq)
+
+    def ensure_running(self) -> None:
+        """Start the relay thread in this process."""
+        self._threads.ensure_running()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _seen(self, event_id) -> bool:
+        if event_id in self._recent_ids:
+            return True
+        if len(self._recent) == self._recent.maxlen:
+            self._recent_ids.discard(self._recent[0])
+        self._recent.append(event_id)
+        self._recent_ids.add(event_id)
+        return False
+
+    def run(self) -> None:
+        with self.app.app_context():
+            events = None
+            last = None
+            while not self._stop.is_set():
+                try:
+                    if events is None:
+                        events = self._events()
+                    if last is None:
+                        # Only events published from now on; history is served by replay()
+                        last = start = events.last_id() or ObjectId()
+                    else:
+                        start = ObjectId.from_datetime(last.generation_time - self.REWIND)
+                    cursor = events.tail(start, self.max_await_ms)
+                    while cursor.alive and not self._stop.is_set():
+                        for event in cursor:
+                            if not self._seen(event["_id"]):
+                                self._hub.dispatch(event)
+                            last = max(last, event["_id"])
+                    # The cursor dies when the collection is empty or the tail was overwritten
+                    self._stop.wait(0.5)
+                except Exception:
+                    logger.exception("Event relay failed; retrying")
+                    events = None
+                    self._stop.wait(5)
@@ -11,28 +11,14 @@ def allowed_file(filename: str) -> bool:
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
-def extract_text_from_file(file_path: str, file_type: str) -> Optional[str]:
-    """Extract text content from a file based on its type."""
-    try:
-        if file_type == "pdf":
-            import PyPDF2
-            with open(file_path, "rb") as f:
-                reader = PyPDF2.PdfReader(f)
-                text = ""
-                for page in reader.pages:
-                    t = page.extract_text() or ""
-                    text += t
-                return text
-
-        if file_type == "docx":
-            from docx import Document
-            doc = Document(file_path)
-            return "\n".join(p.text for p in doc.paragraphs)
-
-        if file_type == "txt":
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                return f.read()
-
-        return None
-    except Exception:
-        return None
+def extract_text_from_file(file_path: str, file_type: str, max_chars: Optional[int] = None) -> Optional[str]:
+    """
+    Extract text content from a file based on its type, with the best
+    installed backend (see ``questions.extractors``). With ``max_chars``,
+    only the start of the document is read (normalized, see ``extract_text_budgeted``).
+    """
+    from ..questions import extract_text_budgeted, extract_text_from_file as extract_text
+
+    if max_chars is not None:
+        return extract_text_budgeted(file_path, file_type, max_chars=max_chars)
+    return extract_text(file_path, file_type)
@@ -5,8 +5,12 @@ This module handles focus session modes and recording completed study sessions.
 """
 from datetime import datetime
 from bson.objectid import ObjectId
-from db import get_db
+from ...conditional import bump_version
+from ...repositories import get_repositories
+from ...repositories.unit_of_work import stage_user_update
+from ..events import publish_event
 from ..streaks.handlers import record_streak_event, calculate_current_streak
+from ..summary import update_summary
 
 FOCUS_MODES = {
     "pomodoro": {
@@ -43,10 +47,7 @@ def record_focus_session(user_id, mode, duration_minutes, completed=True, task_i
         completed: Whether the session was finished to the end
         task_id: Optional ID of a task that was completed during this session
     """
-    db = get_db()
-    sessions = db["focus_sessions"]
-    users = db["users"]
-    tasks = db["tasks"]
+    repos = get_repositories()
     
     session_data = {
         "user_id": ObjectId(user_id),
@@ -59,12 +60,12 @@ def record_focus_session(user_id, mode, duration_minutes, completed=True, task_i
     if task_id:
         session_data["task_id"] = ObjectId(task_id)
     
-    result = sessions.insert_one(session_data)
+    session_id = repos.focus_sessions.create(session_data)
     
     # If completed a focus session (not a break), increment stats
     if completed and mode == "pomodoro":
         # Record streak event first
-        record_streak_event("focus_session", {"session_id": str(result.inserted_id)})
+        record_streak_event("focus_session", {"session_id": session_id})
         
         # Calculate updated streak to persist
         streak = calculate_current_streak(user_id)
@@ -76,26 +77,26 @@ def record_focus_session(user_id, mode, duration_minutes, completed=True, task_i
         
         # If a task was linked, we need to handle its credit
         can_increment_tasks_done = True
+        task_closed = False
         if task_id:
             try:
-                task_oid = ObjectId(task_id)
-                task = tasks.find_one({"_id": task_oid})
-                
-                if task:
-                    # Mark task as done in any case
-                    tasks.update_one({"_id": task_oid}, {"$set": {"done": True}})
-                    
-                    # But ONLY increment tasks_done if the task hasn't been credited yet
-                    if task.get("stats_credited"):
-                        can_increment_tasks_done = False
-                    else:
-                        tasks.update_one({"_id": task_oid}, {"$set": {"stats_credited": True}})
+                # Mark task as done in any case, but ONLY increment tasks_done
+                # if the task hasn't been credited yet
+                completion = repos.tasks.complete_for_credit(task_id)
+                can_increment_tasks_done, task_closed = completion
+                if any(completion):
+                    bump_version(user_id, "tasks")
             except:
                 pass
 
         if can_increment_tasks_done:
             update_query["$inc"]["tasks_done"] = 1
             
-        users.update_one({"_id": ObjectId(user_id)}, update_query)
+        stage_user_update(user_id, update_query)
+        summary_inc = dict(update_query["$inc"])
+        if task_closed:
+            summary_inc["open_tasks"] = -1
+        update_summary(user_id, inc=summary_inc, set_fields={"streak": streak})
+        publish_event(user_id, "streak", {"streak": streak})
         
-    return str(result.inserted_id)
+    return session_id
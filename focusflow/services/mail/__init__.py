@@ -0,0 +1,8 @@
+"""
+Mail service module.
+Handles queued outbound email and its background delivery.
+"""
+from .outbox import enqueue_email, MailWorker, SMTPSender, init_app
+from .smtp_stub import LocalSMTPServer
+
+__all__ = ['enqueue_email', 'MailWorker', 'SMTPSender', 'LocalSMTPServer', 'init_app']
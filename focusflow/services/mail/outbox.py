@@ -0,0 +1,244 @@
+"""
+Mail outbox: requests enqueue, a background worker delivers.
+
+Messages are persisted in the ``mail_outbox`` collection so nothing is lost
+if a worker dies; the sender keeps one SMTP connection open across a batch,
+and failed deliveries are retried with exponential backoff.
+
+Configuration (environment or app.config):
+    MAIL_SERVER, MAIL_PORT, MAIL_USERNAME, MAIL_PASSWORD, MAIL_FROM, MAIL_USE_TLS
+    MAIL_WORKER             run a delivery thread inside each app process (default true)
+    MAIL_BATCH_SIZE         messages handled per pass (default 20)
+    MAIL_POLL_SECONDS       idle poll interval (default 5)
+    MAIL_MAX_ATTEMPTS       attempts before a message is marked failed (default 6)
+    MAIL_RETRY_BASE_SECONDS first retry delay, doubled per attempt (default 30)
+    MAIL_IDLE_CLOSE_SECONDS close an unused SMTP connection after this long (default 30)
+"""
+import logging
+import smtplib
+import ssl
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+
+from ...indexes import declare_index
+from ...repositories import get_repositories
+from ...runtime import ProcessThreads, setting
+
+logger = logging.getLogger(__name__)
+
+# Workers claim the oldest due message; delivered and failed mail expire
+# after a week (bodies can hold password reset links)
+declare_index("mail_outbox", [("status", 1), ("next_attempt_at", 1)])
+declare_index("mail_outbox", "sent_at", expireAfterSeconds=7 * 24 * 3600)
+declare_index("mail_outbox", "failed_at", expireAfterSeconds=7 * 24 * 3600)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def enqueue_email(to: str, subject: str, body: str) -> str:
+    """Persist a message for background delivery and wake the local worker."""
+    message_id = get_repositories().mail_outbox.enqueue(
+        {"to": to, "subject": subject, "body": body}, _utcnow()
+    )
+    worker = _worker
+    if worker is not None:
+        worker.ensure_running()
+        worker.wake()
+    return message_id
+
+
+class SMTPSender:
+    """Holds one SMTP connection open across sends and reconnects when needed."""
+
+    def __init__(self, server: str, port: int = 587, username: str | None = None,
+                 password: str | None = None, use_tls: bool = True,
+                 timeout: float = 10, idle_close_seconds: float = 30):
+        self.server = server
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.idle_close_seconds = idle_close_seconds
+        self._conn = None
+        self._last_used = 0.0
+
+    def _connect(self):
+        if self.port == 465:
+            conn = smtplib.SMTP_SSL(self.server, self.port, timeout=self.timeout,
+                                    context=ssl.create_default_context())
+        else:
+            conn = smtplib.SMTP(self.server, self.port, timeout=self.timeout)
+            conn.ehlo()
+            if self.use_tls:
+                conn.starttls(context=ssl.create_default_context())
+                conn.ehlo()
+        if self.username and self.password:
+            conn.login(self.username, self.password)
+        return conn
+
+    def send(self, msg: EmailMessage) -> None:
+        if self._conn is None:
+            self._conn = self._connect()
+        try:
+            self._conn.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # Server dropped an idle connection: reconnect once and retry
+            self._conn = self._connect()
+            self._conn.send_message(msg)
+        self._last_used = time.monotonic()
+
+    def close_if_idle(self) -> None:
+        if self._conn is not None and time.monotonic() - self._last_used > self.idle_close_seconds:
+            self.close()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.quit()
+            except Exception:
+                pass
+            self._conn = None
+
+
+class MailWorker:
+    """Drains the outbox in a background thread of the current process."""
+
+    def __init__(self, app, sender: SMTPSender, mail_from: str, batch_size: int = 20,
+                 poll_seconds: float = 5, max_attempts: int = 6, retry_base_seconds: float = 30):
+        self.app = app
+        self.sender = sender
+        self.mail_from = mail_from
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = ProcessThreads(self.run, "mail-outbox", stop=self._stop)
+
+    def ensure_running(self) -> None:
+        """Start the delivery thread in this process."""
+        self._threads.ensure_running()
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def run(self) -> None:
+        with self.app.app_context():
+            while not self._stop.is_set():
+                try:
+                    sent = self.process_batch()
+                except Exception:
+                    logger.exception("Mail outbox pass failed")
+                    sent = 0
+                if sent == 0:
+                    self.sender.close_if_idle()
+                    self._wake.wait(self.poll_seconds)
+                    self._wake.clear()
+            self.sender.close()
+
+    def _build(self, doc: dict) -> EmailMessage:
+        msg = EmailMessage()
+        msg["Subject"] = doc["subject"]
+        msg["From"] = self.mail_from
+        msg["To"] = doc["to"]
+        msg.set_content(doc["body"])
+        return msg
+
+    def process_batch(self) -> int:
+        """Deliver up to batch_size due messages; returns how many were sent."""
+        outbox = get_repositories().mail_outbox
+        sent = 0
+        for _ in range(self.batch_size):
+            # Claimed one at a time so each lease only has to cover its own send
+            doc = outbox.claim(_utcnow(), lease_seconds=max(60, self.sender.timeout * 6))
+            if doc is None:
+                break
+            attempts = doc.get("attempts", 1)  # counted when claimed
+            if attempts > self.max_attempts:
+                # Its earlier senders died mid-send, leaving the lease to expire
+                logger.error(f"Giving up on mail {doc['_id']} after {attempts - 1} unfinished attempts")
+                outbox.mark_failed(doc["_id"], _utcnow(), "sender lease expired")
+                continue
+            try:
+                self.sender.send(self._build(doc))
+            except Exception as e:
+                self.sender.close()  # don't reuse a connection in an unknown state
+                if attempts >= self.max_attempts:
+                    logger.error(f"Giving up on mail {doc['_id']} after {attempts} attempts: {e}")
+                    outbox.mark_failed(doc["_id"], _utcnow(), str(e))
+                else:
+                    delay = self.retry_base_seconds * (2 ** (attempts - 1))
+                    logger.warning(f"Mail {doc['_id']} failed (attempt {attempts}), retrying in {delay:.0f}s: {e}")
+                    outbox.mark_retry(doc["_id"], _utcnow() + timedelta(seconds=delay), str(e))
+                continue
+            outbox.mark_sent(doc["_id"], _utcnow())
+            sent += 1
+        return sent
+
+
+_worker: MailWorker | None = None
+
+
+def build_worker(app) -> MailWorker | None:
+    """Create a worker from MAIL_* settings, or None when no mail server is configured."""
+    config = app.config
+    server = setting(config, "MAIL_SERVER")
+    if not server:
+        return None
+    username = setting(config, "MAIL_USERNAME")
+    sender = SMTPSender(
+        server,
+        port=int(setting(config, "MAIL_PORT", 587)),
+        username=username,
+        password=setting(config, "MAIL_PASSWORD"),
+        use_tls=str(setting(config, "MAIL_USE_TLS", "true")).lower() in ("1", "true", "yes"),
+        idle_close_seconds=float(setting(config, "MAIL_IDLE_CLOSE_SECONDS", 30)),
+    )
+    return MailWorker(
+        app,
+        sender,
+        mail_from=setting(config, "MAIL_FROM", username or f"noreply@{server}"),
+        batch_size=int(setting(config, "MAIL_BATCH_SIZE", 20)),
+        poll_seconds=float(setting(config, "MAIL_POLL_SECONDS", 5)),
+        max_attempts=int(setting(config, "MAIL_MAX_ATTEMPTS", 6)),
+        retry_base_seconds=float(setting(config, "MAIL_RETRY_BASE_SECONDS", 30)),
+    )
+
+
+def init_app(app) -> None:
+    """Register `flask mail-worker` and, unless disabled, an in-process delivery thread."""
+    global _worker
+    import click
+
+    @app.cli.command("mail-worker")
+    def mail_worker_command():
+        """Deliver queued mail in the foreground."""
+        worker = build_worker(app)
+        if worker is None:
+            raise click.ClickException("MAIL_SERVER is not set")
+        click.echo(f"Delivering mail via {worker.sender.server}:{worker.sender.port} (Ctrl+C to stop)")
+        try:
+            worker.run()
+        except KeyboardInterrupt:
+            worker.sender.close()
+
+    if str(setting(app.config, "MAIL_WORKER", "true")).lower() in ("1", "true", "yes"):
+        _worker = build_worker(app)
+
+    if _worker is not None:
+        worker = _worker
+
+        @app.before_request
+        def start_mail_worker():
+            # Started from the first request so each forked server process gets its own thread
+            worker.ensure_running()
@@ -0,0 +1,155 @@
+"""
+Local SMTP stand-in for offline testing and benchmarking.
+
+Speaks just enough SMTP (EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT) for
+smtplib and keeps every received message in memory. It can inject
+failures and simulate slow handshakes or slow delivery. Point
+MAIL_SERVER/MAIL_PORT at it with MAIL_USE_TLS=false.
+
+    python -m focusflow.services.mail.smtp_stub --port 1025
+"""
+import argparse
+import socketserver
+import threading
+import time
+from email import message_from_bytes
+from email.policy import default as default_policy
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line: str) -> None:
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        server = self.server.stub
+        server._record_connection()
+        if server.connect_delay_seconds:
+            time.sleep(server.connect_delay_seconds)
+        self._reply("220 focusflow-smtp-stub ready")
+        sender, recipients = None, []
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            line = raw.decode("utf-8", "replace").rstrip("\r\n")
+            verb = line.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self._reply("250-focusflow-smtp-stub" if verb == "EHLO" else "250 focusflow-smtp-stub")
+                if verb == "EHLO":
+                    self._reply("250 8BITMIME")
+            elif verb == "MAIL":
+                sender, recipients = line[10:].strip("<> "), []
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                recipients.append(line[8:].strip("<> "))
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                chunks = []
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data in (b".\r\n", b".\n"):
+                        break
+                    chunks.append(data[1:] if data.startswith(b"..") else data)
+                if server.delay_seconds:
+                    time.sleep(server.delay_seconds)
+                if server._should_fail():
+                    self._reply("451 Temporary failure (injected)")
+                else:
+                    server._store(sender, recipients, b"".join(chunks))
+                    self._reply("250 OK queued")
+            elif verb == "RSET":
+                sender, recipients = None, []
+                self._reply("250 OK")
+            elif verb == "NOOP":
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class _ThreadingServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class LocalSMTPServer:
+    """In-process SMTP server that records messages instead of delivering them."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 delay_seconds: float = 0.0, connect_delay_seconds: float = 0.0,
+                 fail_first: int = 0):
+        self.delay_seconds = delay_seconds
+        self.connect_delay_seconds = connect_delay_seconds
+        self.fail_first = fail_first
+        self.messages: list[dict] = []
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = _ThreadingServer((host, port), _SMTPHandler)
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def host(self) -> str:
+        return self._server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def _record_connection(self) -> None:
+        with self._lock:
+            self.connections += 1
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            if self.fail_first > 0:
+                self.fail_first -= 1
+                return True
+            return False
+
+    def _store(self, sender, recipients, data: bytes) -> None:
+        message = message_from_bytes(data, policy=default_policy)
+        with self._lock:
+            self.messages.append({"from": sender, "to": recipients, "message": message})
+
+    def start(self) -> "LocalSMTPServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="smtp-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local SMTP stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to stall each DATA")
+    parser.add_argument("--connect-delay", type=float, default=0.0, help="seconds to stall each greeting")
+    args = parser.parse_args()
+
+    server = LocalSMTPServer(args.host, args.port, delay_seconds=args.delay,
+                             connect_delay_seconds=args.connect_delay)
+    print(f"SMTP stub listening on {server.host}:{server.port}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for m in server.messages:
+            print(f"- {m['to']}: {m['message']['Subject']}")
+
+
+if __name__ == "__main__":
+    main()
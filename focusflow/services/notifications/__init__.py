@@ -1,7 +1,8 @@
 """
 Notifications service module.
-Handles notification creation.
+Handles notification creation, dismissal and retention.
 """
-from .handlers import create_notification
+from .handlers import create_notification, create_notifications, dismiss_notification
+from .retention import compact_notifications, init_app
 
-__all__ = ['create_notification']
+__all__ = ['create_notification', 'create_notifications', 'dismiss_notification', 'compact_notifications', 'init_app']
@@ -3,17 +3,87 @@ Notification handling functions.
 """
 from datetime import datetime
 from bson.objectid import ObjectId
+from ...conditional import bump_version
+from ...indexes import declare_index
+from ...repositories import get_repositories
+from ..events import publish_event
+from ..summary import update_summary
+from .retention import coalesce_key, dismissed_expires_at, expires_at, max_per_user
 
+# Active notifications: equality on userId, sort on sentAt/_id, then the status range
+declare_index("notifications", [("userId", 1), ("sentAt", -1), ("_id", -1), ("status", 1)])
 
-def create_notification(db, user_id, notification_type, payload):
-    """Create a new notification."""
-    notifications = db["notifications"]
-    notification = {
+
+def _new_notification(user_id, notification_type, payload, sent_at: datetime) -> dict:
+    return {
         "userId": ObjectId(user_id),
         "type": notification_type,
         "scheduledFor": None,          # you can set a real datetime later
-        "sentAt": datetime.now(),
+        "sentAt": sent_at,
         "status": "sent",              # or "scheduled" if you treat it differently
         "payload": payload,
+        "expireAt": expires_at(sent_at),
     }
-    notifications.insert_one(notification)
+
+
+def _announce(user_id, created: list) -> None:
+    """Evict past the cap, count and publish (notification, _id, inserted) triples."""
+    notifications = get_repositories().notifications
+    inserted = sum(1 for _, _, was_inserted in created if was_inserted)
+    evicted = notifications.evict_oldest(user_id, keep=max_per_user()) if inserted else 0
+    bump_version(user_id, "notifications")
+    if inserted:
+        update_summary(user_id, inc={"unread_notifications": inserted - evicted})
+    for notification, notification_id, was_inserted in created:
+        publish_event(user_id, "notification", {
+            "_id": notification_id,
+            "type": notification["type"],
+            "status": notification["status"],
+            "payload": notification["payload"],
+            "coalesced": not was_inserted,
+        })
+
+
+def create_notification(user_id, notification_type, payload):
+    """
+    Create a new notification. A live notification about the same task is
+    refreshed instead, and the user's oldest ones are evicted past the cap.
+    """
+    notification = _new_notification(user_id, notification_type, payload, datetime.now())
+    notifications = get_repositories().notifications
+    key = coalesce_key(notification_type, payload)
+    if key is None:
+        notification_id, inserted = notifications.insert(notification), True
+    else:
+        notification_id, inserted = notifications.upsert_live(user_id, key, notification)
+    _announce(user_id, [(notification, notification_id, inserted)])
+
+
+def create_notifications(user_id, notification_type, payloads: list) -> None:
+    """``create_notification`` for several payloads; coalesced ones are written in one bulk operation."""
+    sent_at = datetime.now()
+    notifications = get_repositories().notifications
+    keyed, created = {}, []
+    for payload in payloads:
+        notification = _new_notification(user_id, notification_type, payload, sent_at)
+        key = coalesce_key(notification_type, payload)
+        if key is None:
+            created.append((notification, notifications.insert(notification), True))
+        else:
+            keyed[key] = notification  # the last payload per subject wins
+    items = list(keyed.items())
+    for (_, notification), result in zip(items, notifications.upsert_live_many(user_id, items)):
+        if result is not None:
+            created.append((notification, *result))
+    if created:
+        _announce(user_id, created)
+
+
+def dismiss_notification(notification_id, user_id) -> bool:
+    """Dismiss a live notification; it is deleted once the dismissed TTL passes."""
+    if not get_repositories().notifications.dismiss(notification_id, user_id, expire_at=dismissed_expires_at()):
+        return False
+    bump_version(user_id, "notifications")
+    update_summary(user_id, inc={"unread_notifications": -1})
+    publish_event(user_id, "notification_dismissed", {"_id": notification_id})
+    return True
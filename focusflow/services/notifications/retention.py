@@ -0,0 +1,152 @@
+"""
+Notification retention.
+
+Keeps the ``notifications`` collection bounded:
+
+- every notification gets an ``expireAt`` date and a TTL index deletes it
+  then: NOTIFICATION_MAX_AGE_DAYS after it was sent, or
+  NOTIFICATION_DISMISSED_TTL_HOURS after it was dismissed;
+- repeated notifications about the same task refresh one live document
+  (keyed by ``coalesceKey``) instead of inserting another;
+- a user keeps at most NOTIFICATION_MAX_PER_USER live notifications, the
+  oldest are evicted when a new one is inserted.
+
+``flask compact-notifications`` applies the same rules to existing data and
+then rebuilds the dashboard summaries and bumps notification versions,
+neither of which sees deletions made by the TTL monitor.
+
+Configuration (environment or app.config):
+    NOTIFICATION_MAX_PER_USER         live notifications kept per user (default 100)
+    NOTIFICATION_MAX_AGE_DAYS         lifetime of any notification (default 30)
+    NOTIFICATION_DISMISSED_TTL_HOURS  how long dismissed ones are kept (default 24)
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+
+import click
+
+from ...conditional import bump_version
+from ...indexes import declare_index
+from ...repositories import get_repositories
+from ...runtime import app_setting
+
+logger = logging.getLogger(__name__)
+
+# The TTL monitor deletes a notification once its expireAt has passed
+declare_index("notifications", "expireAt", expireAfterSeconds=0)
+# At most one live notification per user and subject
+declare_index(
+    "notifications", [("userId", 1), ("coalesceKey", 1)],
+    unique=True, partialFilterExpression={"coalesceKey": {"$exists": True}},
+)
+
+DEFAULTS = {
+    "NOTIFICATION_MAX_PER_USER": 100,
+    "NOTIFICATION_MAX_AGE_DAYS": 30,
+    "NOTIFICATION_DISMISSED_TTL_HOURS": 24,
+}
+
+
+def _setting(key: str):
+    return app_setting(key, DEFAULTS[key])
+
+
+def max_per_user() -> int:
+    return int(_setting("NOTIFICATION_MAX_PER_USER"))
+
+
+def _as_utc(value: datetime) -> datetime:
+    # sentAt is stored as naive local time
+    return value.astimezone(timezone.utc)
+
+
+def _stored_utc(value: datetime) -> datetime:
+    # expireAt comes back from MongoDB as naive UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def expires_at(sent_at: datetime) -> datetime:
+    """When a notification sent at ``sent_at`` expires."""
+    return _as_utc(sent_at) + timedelta(days=float(_setting("NOTIFICATION_MAX_AGE_DAYS")))
+
+
+def dismissed_expires_at() -> datetime:
+    """When a notification dismissed now expires."""
+    return datetime.now(timezone.utc) + timedelta(hours=float(_setting("NOTIFICATION_DISMISSED_TTL_HOURS")))
+
+
+def coalesce_key(notification_type: str, payload) -> str | None:
+    """Notifications about the same task share a key; others are never coalesced."""
+    task_id = payload.get("taskId") if isinstance(payload, dict) else None
+    return f"{notification_type}:{task_id}" if task_id else None
+
+
+def compact_user(user_id, keep: int, now: datetime) -> int:
+    """
+    Apply retention to one user's live notifications: drop expired ones and
+    older duplicates of a coalesce key, evict beyond ``keep`` and backfill
+    ``expireAt``/``coalesceKey``. Returns the number of documents deleted.
+    """
+    notifications = get_repositories().notifications
+    docs = notifications.live_for_user(
+        user_id, fields=("type", "sentAt", "expireAt", "coalesceKey", "payload.taskId")
+    )
+    seen, kept, doomed = set(), [], []
+    for doc in docs:
+        key = coalesce_key(doc.get("type"), doc.get("payload"))
+        expiry = doc.get("expireAt")
+        if expiry is None and isinstance(doc.get("sentAt"), datetime):
+            expiry = expires_at(doc["sentAt"])
+        if expiry is not None and _stored_utc(expiry) <= now:
+            doomed.append(doc["_id"])
+        elif key is not None and key in seen:
+            doomed.append(doc["_id"])
+        elif len(kept) >= keep:
+            doomed.append(doc["_id"])
+        else:
+            if key is not None:
+                seen.add(key)
+            kept.append((doc, key, expiry))
+
+    # Delete first so backfilled coalesce keys cannot collide with a duplicate
+    deleted = notifications.delete_ids(doomed)
+    for doc, key, expiry in kept:
+        fields = {}
+        if "expireAt" not in doc and expiry is not None:
+            fields["expireAt"] = expiry
+        if key is not None and doc.get("coalesceKey") != key:
+            fields["coalesceKey"] = key
+        if fields:
+            notifications.set_fields(doc["_id"], fields)
+    return deleted
+
+
+def compact_notifications() -> dict:
+    """Apply retention to all existing notifications and rebuild the summaries."""
+    from ..summary import rebuild_all_summaries
+
+    notifications = get_repositories().notifications
+    now = datetime.now(timezone.utc)
+    stats = {"stale_deleted": notifications.delete_stale(now), "live_deleted": 0, "users": 0}
+    keep = max_per_user()
+    for user_id in notifications.user_ids():
+        stats["live_deleted"] += compact_user(user_id, keep, now)
+        bump_version(user_id, "notifications")
+        stats["users"] += 1
+    stats["summaries_rebuilt"] = rebuild_all_summaries()
+    logger.info(f"Compacted notifications: {stats}")
+    return stats
+
+
+def init_app(app) -> None:
+    """Register the compact-notifications CLI command."""
+
+    @app.cli.command("compact-notifications")
+    def compact_notifications_command():
+        """Expire, coalesce and cap existing notifications."""
+        stats = compact_notifications()
+        click.echo(
+            f"Deleted {stats['stale_deleted']} expired/dismissed and {stats['live_deleted']} "
+            f"duplicate, expired or over-cap notifications for {stats['users']} users; "
+            f"rebuilt {stats['summaries_rebuilt']} summaries"
+        )
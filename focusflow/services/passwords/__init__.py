@@ -0,0 +1,13 @@
+"""
+Passwords service module.
+Handles password hashing and verification off the request thread.
+"""
+from .hashing import (
+    HashingBusyError,
+    hash_password,
+    verify_password,
+    needs_rehash,
+    init_app,
+)
+
+__all__ = ['HashingBusyError', 'hash_password', 'verify_password', 'needs_rehash', 'init_app']
@@ -0,0 +1,154 @@
+"""
+Password hashing with a bounded worker pool.
+
+scrypt costs tens of milliseconds of CPU per call. Running it inline lets a
+login burst occupy every core and starve the other routes, so hashes run in
+a small process pool and at most PASSWORD_HASH_CONCURRENCY of them may be
+queued or running at once; beyond that callers wait up to
+PASSWORD_HASH_WAIT_SECONDS and then get HashingBusyError.
+
+The pool is started by the first hash, not at app creation, so CLI
+commands never start it; since that happens on a request thread, its
+workers come from a forkserver rather than a fork of a multi-threaded
+process.
+
+Configuration (environment or app.config):
+    PASSWORD_HASH_METHOD        werkzeug method string (default scrypt:32768:8:1)
+    PASSWORD_HASH_WORKERS       pool processes; 0 hashes inline (default: min(4, cpu count))
+    PASSWORD_HASH_CONCURRENCY   hashes allowed in flight per process (default: 2 x workers)
+    PASSWORD_HASH_WAIT_SECONDS  max wait for a free slot (default 5)
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from ...runtime import setting
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_METHOD = "scrypt:32768:8:1"
+SALT_LENGTH = 16
+
+
+class HashingBusyError(RuntimeError):
+    """Raised when no hashing slot frees up in time."""
+
+
+class PasswordHasher:
+    """Runs werkzeug hashing in a process pool behind a concurrency limit."""
+
+    def __init__(self, method: str = DEFAULT_METHOD, workers: int = 0,
+                 concurrency: int | None = None, wait_seconds: float = 5.0):
+        self.method = method
+        self.workers = workers
+        self.wait_seconds = wait_seconds
+        self._slots = threading.BoundedSemaphore(concurrency or max(1, workers * 2))
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def _pool(self):
+        if self.workers <= 0:
+            return None
+        pid = os.getpid()
+        if self._executor is None or self._pid != pid:
+            with self._lock:
+                if self._executor is None or self._pid != pid:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("forkserver"),
+                    )
+                    self._pid = pid
+        return self._executor
+
+    def _discard(self, pool) -> None:
+        """Drop a broken pool (a worker died) so the next call starts a new one."""
+        with self._lock:
+            if self._executor is pool:
+                self._executor = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.wait_seconds):
+            raise HashingBusyError("Password hashing is saturated")
+        try:
+            for _ in range(2):
+                pool = self._pool()
+                if pool is None:
+                    return fn(*args)
+                try:
+                    return pool.submit(fn, *args).result()
+                except BrokenProcessPool:
+                    logger.warning("Password hashing pool broke (a worker died); starting a new one")
+                    self._discard(pool)
+            raise HashingBusyError("Password hashing pool keeps failing")
+        finally:
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self.method, SALT_LENGTH)
+
+    def verify(self, stored_hash: str, password: str) -> bool:
+        if not stored_hash:
+            return False
+        return self._run(check_password_hash, stored_hash, password)
+
+    def needs_rehash(self, stored_hash: str) -> bool:
+        """True if the hash was made with a different method or cost parameters."""
+        if not stored_hash or "$" not in stored_hash:
+            return True
+        return stored_hash.split("$", 1)[0] != self.method
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_hasher: PasswordHasher | None = None
+
+
+def configure(config=None) -> PasswordHasher:
+    """(Re)build the process-wide hasher from app.config / environment."""
+    global _hasher
+    workers = int(setting(config, "PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+    concurrency = setting(config, "PASSWORD_HASH_CONCURRENCY", None)
+    if _hasher is not None:
+        _hasher.shutdown()
+    _hasher = PasswordHasher(
+        method=setting(config, "PASSWORD_HASH_METHOD", DEFAULT_METHOD),
+        workers=workers,
+        concurrency=int(concurrency) if concurrency else None,
+        wait_seconds=float(setting(config, "PASSWORD_HASH_WAIT_SECONDS", 5)),
+    )
+    return _hasher
+
+
+def get_hasher() -> PasswordHasher:
+    return _hasher or configure()
+
+
+def hash_password(password: str) -> str:
+    """Hash an (already peppered) password with the current policy."""
+    return get_hasher().hash(password)
+
+
+def verify_password(stored_hash: str, password: str) -> bool:
+    """Check an (already peppered) password against a stored hash."""
+    return get_hasher().verify(stored_hash, password)
+
+
+def needs_rehash(stored_hash: str) -> bool:
+    """True if a stored hash predates the current hashing policy."""
+    return get_hasher().needs_rehash(stored_hash)
+
+
+def init_app(app) -> None:
+    """Configure the hasher; its pool starts with the first hash."""
+    configure(app.config)
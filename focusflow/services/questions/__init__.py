@@ -2,14 +2,44 @@
 Questions service module.
 Handles text extraction, question generation, and formatting.
 """
-from .extraction import extract_text_from_image, extract_text_from_pdf, extract_text_from_file
-from .generation import generate_questions_from_text_lmstudio
+from .extraction import (
+    extract_text_from_image,
+    extract_text_from_pdf,
+    extract_text_from_file,
+    extract_text_budgeted,
+    iter_text_from_file,
+    file_digest,
+    EXTRACTOR_VERSION,
+    IncompleteExtractionError,
+)
+from .cache import extract_text_cached, extraction_cache_stats
+from .extractors import extractor_stats, extractors_for, register_extractor, registered_extractors
+from .generation import generate_questions_from_text_lmstudio, prepare_excerpt, MAX_INPUT_CHARS, PROMPT_VERSION
+from .generation_cache import generation_cache_stats
 from .formatting import _to_app_format
+from .ocr import ocr_pdf, init_app
 
 __all__ = [
     'extract_text_from_image',
     'extract_text_from_pdf', 
     'extract_text_from_file',
+    'extract_text_budgeted',
+    'iter_text_from_file',
+    'extract_text_cached',
+    'extraction_cache_stats',
+    'register_extractor',
+    'registered_extractors',
+    'extractors_for',
+    'extractor_stats',
+    'file_digest',
+    'EXTRACTOR_VERSION',
+    'IncompleteExtractionError',
     'generate_questions_from_text_lmstudio',
-    '_to_app_format'
+    'prepare_excerpt',
+    'MAX_INPUT_CHARS',
+    'PROMPT_VERSION',
+    'generation_cache_stats',
+    '_to_app_format',
+    'ocr_pdf',
+    'init_app',
 ]
@@ -0,0 +1,96 @@
+"""
+Content-addressed cache of extracted document text.
+
+Students upload the same lecture notes again and again, and extracting a
+scanned PDF (300 dpi rendering plus OCR) can take minutes. Results are
+stored compressed in the ``extraction_cache`` collection under the SHA-256
+of the file's bytes, its type and ``EXTRACTOR_VERSION``, shared by every
+user and worker, so a repeat upload costs one hash and one lookup.
+
+The cache is capped by compressed size; ``content_cache`` handles expiry
+and least-recently-used eviction.
+
+Configuration (environment or app.config):
+    EXTRACTION_CACHE_ENABLED  set to false to always extract (default true)
+    EXTRACTION_CACHE_MAX_MB   compressed size limit of the cache (default 256)
+"""
+import logging
+import zlib
+from typing import Optional
+
+from ...runtime import app_setting
+from .content_cache import ContentCache
+from .extraction import (
+    EXTRACTOR_VERSION,
+    IncompleteExtractionError,
+    extract_text_budgeted,
+    extract_text_from_file,
+    file_digest,
+)
+
+logger = logging.getLogger(__name__)
+
+# Entries must fit in a document with room to spare
+MAX_ENTRY_BYTES = 8 * 1024 * 1024
+
+_cache = ContentCache(
+    "extraction_cache", "EXTRACTION_CACHE_ENABLED",
+    lambda: {"max_bytes": int(float(app_setting("EXTRACTION_CACHE_MAX_MB", 256)) * 1024 * 1024)},
+)
+
+
+def cache_key(digest: str, file_type: str, max_chars: Optional[int] = None) -> str:
+    key = f"{digest}:{file_type}:{EXTRACTOR_VERSION}"
+    return f"{key}:{max_chars}" if max_chars else key
+
+
+def extraction_cache_stats() -> dict:
+    """This process's hit/miss counts since it started."""
+    return _cache.stats()
+
+
+def _extract(file_path: str, file_type: str, max_chars: Optional[int], digest: Optional[str] = None,
+             strict: bool = False) -> Optional[str]:
+    if max_chars:
+        return extract_text_budgeted(file_path, file_type, max_chars=max_chars, digest=digest, strict=strict)
+    return extract_text_from_file(file_path, file_type, digest=digest, strict=strict)
+
+
+def extract_text_cached(file_path: str, file_type: str, max_chars: Optional[int] = None) -> Optional[str]:
+    """
+    ``extract_text_from_file`` (or, with ``max_chars``, ``extract_text_budgeted``),
+    answered from the cache when the same bytes were extracted before.
+    """
+    if not _cache.enabled():
+        return _extract(file_path, file_type, max_chars)
+
+    try:
+        digest = file_digest(file_path)
+        key = cache_key(digest, file_type, max_chars)
+        entry = _cache.get(key)
+    except Exception as e:
+        logger.warning(f"Extraction cache unavailable, extracting {file_path}: {e}")
+        return _extract(file_path, file_type, max_chars)
+
+    if entry is not None:
+        try:
+            text = zlib.decompress(entry["text"]).decode("utf-8")
+        except (zlib.error, UnicodeDecodeError, KeyError) as e:
+            _cache.drop(key, e)
+        else:
+            _cache.hit(key, entry)
+            return text
+
+    _cache.miss()
+    try:
+        text = _extract(file_path, file_type, max_chars, digest, strict=True)
+    except IncompleteExtractionError as e:
+        # Pages that couldn't be OCR'd make the text partial; serve it, don't keep it
+        logger.warning(f"Not caching incomplete extraction of {file_path}: {e}")
+        return e.text
+    if text and text.strip():
+        # Failures are not cached: they may come from a missing OCR tool, not the file
+        compressed = zlib.compress(text.encode("utf-8"), 6)
+        if len(compressed) <= MAX_ENTRY_BYTES:
+            _cache.store(key, text=compressed, size=len(compressed))
+    return text
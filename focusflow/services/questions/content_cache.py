@@ -0,0 +1,114 @@
+"""
+Result caches shared by every user and worker, keyed by content digest.
+
+A ``ContentCache`` wraps one ``ContentCacheRepository`` collection: the
+extracted text of uploads (``cache``) and the questions the LLM generated
+for an excerpt (``generation_cache``). Entries expire 30 days after their
+last use; a hit refreshes ``last_used_at`` at most once per TOUCH_INTERVAL,
+so hot entries don't cost a write per request. Measuring the cache reads
+every entry, so each process checks its limit at most once per
+EVICTION_INTERVAL rather than on every store.
+"""
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from ...indexes import declare_index
+from ...repositories import get_repositories
+from ...runtime import app_setting
+
+logger = logging.getLogger(__name__)
+
+ENTRY_TTL_SECONDS = 30 * 24 * 3600
+
+TOUCH_INTERVAL = timedelta(hours=1)
+
+EVICTION_INTERVAL = timedelta(minutes=5)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class ContentCache:
+    """
+    One cache collection. ``enabled_setting`` turns it off; ``limits``
+    returns the ``evict_to`` arguments (``max_entries`` / ``max_bytes``).
+    """
+
+    def __init__(self, name: str, enabled_setting: str, limits: Callable[[], dict]):
+        self.name = name
+        self.enabled_setting = enabled_setting
+        self.limits = limits
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "errors": 0}
+        self._next_eviction: Optional[datetime] = None
+        # Unused entries expire; eviction scans entries by last use
+        declare_index(name, "last_used_at", expireAfterSeconds=ENTRY_TTL_SECONDS)
+
+    @property
+    def repository(self):
+        return getattr(get_repositories(), self.name)
+
+    def enabled(self) -> bool:
+        return str(app_setting(self.enabled_setting, "true")).lower() in ("1", "true", "yes")
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def get(self, key: str) -> Optional[dict]:
+        """The entry under ``key`` or None; raises if the cache can't be read."""
+        try:
+            return self.repository.get(key)
+        except Exception:
+            self._count("errors")
+            raise
+
+    def hit(self, key: str, entry: dict) -> None:
+        """Count a usable entry, refreshing its last use if that is due."""
+        self._count("hits")
+        now = _utcnow()
+        last_used = entry.get("last_used_at")
+        if last_used is None or now - _as_utc(last_used) > TOUCH_INTERVAL:
+            self.repository.touch(key, now)
+
+    def miss(self) -> None:
+        self._count("misses")
+
+    def drop(self, key: str, reason) -> None:
+        logger.warning(f"Dropping unreadable {self.name} entry {key}: {reason}")
+        self.repository.delete(key)
+
+    def store(self, key: str, **fields) -> None:
+        """Store an entry (kept as is if another worker stored it first); never raises."""
+        now = _utcnow()
+        try:
+            self.repository.put(key, now, **fields)
+            self._count("stores")
+            self._evict_if_due(now)
+        except Exception as e:
+            logger.warning(f"Could not store {self.name} entry {key}: {e}")
+            self._count("errors")
+
+    def _evict_if_due(self, now: datetime) -> None:
+        with self._lock:
+            if self._next_eviction is not None and now < self._next_eviction:
+                return
+            self._next_eviction = now + EVICTION_INTERVAL
+        evicted = self.repository.evict_to(**self.limits())
+        if evicted:
+            logger.info(f"Evicted {evicted} {self.name} entries")
+
+    def stats(self) -> dict:
+        """This process's hit/miss counts since it started."""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else None
+        return stats
@@ -1,11 +1,36 @@
 """
 Text extraction functions for various file formats.
+
+The backends are registered in the extractor registry (see ``extractors``),
+which picks the best installed one for each file.
 """
+import hashlib
 import logging
-from typing import Optional
+from collections import deque
+from typing import Iterator, Optional
+
+from .extractors import IncompleteExtractionError, iter_text, register_extractor
 
 logger = logging.getLogger(__name__)
 
+# Part of the extraction cache key: bump whenever a change here alters the
+# text extracted from the same file, so cached results are not reused
+EXTRACTOR_VERSION = 4
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+# Rough size of a model token, for budgets given in tokens
+CHARS_PER_TOKEN = 4
+
+
+def file_digest(file_path: str) -> str:
+    """SHA-256 of a file's bytes, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 
 def extract_text_from_image(file_path: str) -> Optional[str]:
     """
@@ -32,85 +57,165 @@ def extract_text_from_image(file_path: str) -> Optional[str]:
         return None
 
 
-def extract_text_from_pdf(path: str, *, ocr_fallback: bool = True, min_chars: int = 300) -> Optional[str]:
+def extract_text_from_pdf(path: str, *, ocr_fallback: bool = True, digest: Optional[str] = None) -> Optional[str]:
     """
-    Extract text from a PDF file.
+    Extract text from a PDF file, page by page.
     
     Strategy:
-    1. First try to extract embedded text (fast, works for digital PDFs)
-    2. If not enough text found and ocr_fallback=True, use OCR (slower, for scanned PDFs)
+    1. Read each page's embedded text (fast, works for digital pages)
+    2. If ocr_fallback=True, OCR only the image pages with little or no embedded text
+       (in the OCR process pool, see ``ocr``); the classification is cached per ``digest``
     
     Args:
         path: Path to the PDF file
-        ocr_fallback: Whether to try OCR if text extraction yields little content
-        min_chars: Minimum characters needed before considering OCR fallback
+        ocr_fallback: Whether to OCR pages without enough embedded text
+        digest: SHA-256 of the file, if the caller already has it
         
     Returns:
         Extracted text or None if extraction fails
     """
-    text = ""
-    
-    # --- Method 1: Text-layer extraction via PyMuPDF ---
-    try:
-        import pymupdf as fitz
-        
-        doc = fitz.open(path)
-        parts = []
-        for page in doc:
-            page_text = page.get_text("text") or ""
-            parts.append(page_text)
-        doc.close()
-        text = "\n".join(parts).strip()
-        
-    except ImportError:
-        logger.warning("PyMuPDF not installed - trying alternative PDF extraction")
-        # Fallback to PyPDF2 if pymupdf not available
-        try:
-            import PyPDF2
-            with open(path, "rb") as f:
-                reader = PyPDF2.PdfReader(f)
-                parts = []
-                for page in reader.pages:
-                    page_text = page.extract_text() or ""
-                    parts.append(page_text)
-                text = "\n".join(parts).strip()
-        except Exception as e:
-            logger.error(f"PyPDF2 extraction failed: {e}")
-            text = ""
-    except Exception as e:
-        logger.error(f"PDF text extraction failed: {e}")
-        text = ""
+    text = "\n".join(iter_pdf_text(path, ocr_fallback=ocr_fallback, digest=digest)).strip()
+    return text if text else None
 
-    # If we got enough text, return it
-    if text and len(text) >= min_chars:
-        return text
 
-    # --- Method 2: OCR fallback for scanned PDFs ---
-    if not ocr_fallback:
-        return text if text else None
+def iter_pdf_text(path: str, *, ocr_fallback: bool = True, digest: Optional[str] = None,
+                  reader: Optional[str] = None, strict: bool = False) -> Iterator[str]:
+    """
+    Yield a PDF's text one page at a time (see ``extract_text_from_pdf``).
+    Pages are read and classified as they are reached, at most
+    ``OCR_MAX_PAGES_IN_FLIGHT`` pages ahead so the OCR pool stays busy;
+    closing the generator stops reading and cancels the pending OCR.
+    ``reader`` picks the text-layer library ("pymupdf" or "pypdf2"; default: the first installed).
+    A page whose OCR fails keeps its text-layer text, or with ``strict`` raises
+    ``IncompleteExtractionError``.
+    """
+    from .ocr import get_ocr_engine, page_count
+    from .pages import iter_pdf_pages
+
+    engine = get_ocr_engine() if ocr_fallback else None
+    lookahead = engine.max_in_flight if engine is not None else 1
+    # Cached classifications skip reading OCR pages' text, so only use them when OCRing
+    pages = iter_pdf_pages(path, (digest or file_digest(path)) if ocr_fallback else None, reader)
+    window: deque = deque()  # (index, text layer, needs OCR, OCR future or None), in page order
+    started = done = yielded = False
+    ocr_ok = None  # unknown until the first page that needs OCR
+
+    def ocr_usable() -> bool:
+        nonlocal ocr_ok
+        if ocr_ok is None:
+            try:
+                import pytesseract  # noqa: F401  (fail fast when OCR is unavailable)
+                ocr_ok = True
+            except ImportError:
+                logger.warning("pytesseract not installed - OCR fallback unavailable")
+                ocr_ok = False
+        return ocr_ok
+
+    def read_ahead() -> None:
+        nonlocal pages, started, done
+        while len(window) < lookahead and not done:
+            try:
+                index, text, needs_ocr = next(pages)
+            except StopIteration:
+                done = True
+                return
+            except Exception as e:
+                if started or not ocr_fallback:
+                    raise
+                # --- Unreadable text layer: OCR every page ---
+                logger.error(f"PDF text extraction failed, OCRing every page: {e}")
+                try:
+                    count = page_count(path)
+                except Exception:
+                    raise e from None
+                pages = ((i, "", True) for i in range(count))
+                started = True
+                continue
+            started = True
+            future = None
+            if needs_ocr and ocr_fallback and ocr_usable():
+                future = engine.submit(path, index)
+            window.append((index, text, needs_ocr, future))
 
     try:
-        from pdf2image import convert_from_path
-        import pytesseract
-        
-        logger.info("Attempting OCR fallback for PDF...")
-        images = convert_from_path(path, dpi=300)
-        ocr_parts = []
-        for img in images:
-            ocr_parts.append(pytesseract.image_to_string(img))
-        ocr_text = "\n".join(ocr_parts).strip()
-        
-        return ocr_text if ocr_text else (text if text else None)
-        
-    except ImportError:
-        logger.warning("pdf2image or pytesseract not installed - OCR fallback unavailable")
-        return text if text else None
+        while True:
+            read_ahead()
+            if not window:
+                return
+            index, text, needs_ocr, future = window.popleft()
+            if needs_ocr and ocr_fallback:
+                ocr_text = None
+                if future is not None and ocr_ok:
+                    try:
+                        ocr_text = future.result()
+                    except Exception as e:
+                        logger.error(f"PDF OCR failed on page {index + 1}, skipping OCR for the rest: {e}")
+                        ocr_ok = False
+                        for *_, pending in window:
+                            if pending is not None:
+                                pending.cancel()
+                if ocr_text is None and strict:
+                    raise IncompleteExtractionError(f"OCR failed for page {index + 1}")
+                text = (ocr_text or "").strip() or text
+            if text:
+                yielded = True
+                yield text
+    except IncompleteExtractionError:
+        raise
     except Exception as e:
-        logger.error(f"PDF OCR fallback failed: {e}")
-        return text if text else None
+        if not yielded:
+            raise  # nothing produced: let the registry try the next backend
+        if strict:
+            raise IncompleteExtractionError(f"PDF extraction failed part way: {e}") from e
+        logger.error(f"PDF text extraction failed part way: {e}")
+    finally:
+        for *_, future in window:
+            if future is not None:
+                future.cancel()
+        pages.close()
+
 
+@register_extractor("pymupdf", formats=("pdf",), rank=10, requires=("pymupdf",))
+def _pymupdf_text(file_path: str, digest: Optional[str] = None, strict: bool = False) -> Iterator[str]:
+    return iter_pdf_text(file_path, digest=digest, reader="pymupdf", strict=strict)
 
-def extract_text_from_file(file_path: str, file_type: str) -> Optional[str]:
+
+@register_extractor("pypdf2", formats=("pdf",), rank=20, requires=("PyPDF2",))
+def _pypdf2_text(file_path: str, digest: Optional[str] = None, strict: bool = False) -> Iterator[str]:
+    return iter_pdf_text(file_path, digest=digest, reader="pypdf2", strict=strict)
+
+
+@register_extractor("python-docx", formats=("docx",), rank=10, requires=("docx",))
+def _docx_text(file_path: str, digest: Optional[str] = None, strict: bool = False) -> Iterator[str]:
+    from docx import Document
+    for paragraph in Document(file_path).paragraphs:
+        if paragraph.text.strip():
+            yield paragraph.text
+
+
+@register_extractor("text", formats=("txt",), rank=10)
+def _plain_text(file_path: str, digest: Optional[str] = None, strict: bool = False) -> Iterator[str]:
+    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+        lines = []
+        for line in f:
+            if line.strip():
+                lines.append(line)
+            elif lines:
+                yield "".join(lines).strip()
+                lines = []
+        if lines:
+            yield "".join(lines).strip()
+
+
+@register_extractor("tesseract", formats=("png", "jpg"), rank=10, requires=("PIL", "pytesseract"))
+def _image_text(file_path: str, digest: Optional[str] = None, strict: bool = False) -> Iterator[str]:
+    text = extract_text_from_image(file_path)
+    if text:
+        yield text
+
+
+def extract_text_from_file(file_path: str, file_type: str, digest: Optional[str] = None,
+                           strict: bool = False) -> Optional[str]:
     """
     Extract text from a file based on its type.
     
@@ -122,33 +227,70 @@ def extract_text_from_file(file_path: str, file_type: str) -> Optional[str]:
     
     Args:
         file_path: Path to the file
-        file_type: File extension (without the dot)
+        file_type: File extension (without the dot) or MIME type
+        digest: SHA-256 of the file, if the caller already has it
+        strict: Raise ``IncompleteExtractionError`` (with the text read so far)
+            if pages that need OCR can't be OCR'd, instead of skipping them
         
     Returns:
         Extracted text or None if extraction fails
     """
+    parts = []
     try:
-        if file_type == "pdf":
-            return extract_text_from_pdf(file_path, ocr_fallback=True)
-
-        elif file_type == "docx":
-            from docx import Document
-            doc = Document(file_path)
-            text = "\n".join(p.text for p in doc.paragraphs)
-            return text.strip() if text.strip() else None
-
-        elif file_type == "txt":
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                text = f.read()
-            return text.strip() if text.strip() else None
-            
-        elif file_type in ("png", "jpg", "jpeg"):
-            return extract_text_from_image(file_path)
-
-        else:
-            logger.warning(f"Unsupported file type: {file_type}")
-            return None
-            
+        for chunk in iter_text_from_file(file_path, file_type, digest=digest, strict=strict):
+            parts.append(chunk)
+        text = "\n".join(parts).strip()
+        return text if text else None
+    except IncompleteExtractionError as e:
+        raise IncompleteExtractionError(str(e), "\n".join(parts).strip() or None) from e
     except Exception as e:
         logger.error(f"Text extraction failed for {file_type}: {e}")
         return None
+
+
+def iter_text_from_file(file_path: str, file_type: str, digest: Optional[str] = None,
+                        strict: bool = False) -> Iterator[str]:
+    """
+    Yield a file's text in document order: a page at a time for PDFs, a
+    paragraph at a time for docx and txt files. Stop iterating (or close the
+    generator) once there is enough; later pages are then never extracted.
+    """
+    return iter_text(file_path, file_type, digest=digest, strict=strict)
+
+
+def extract_text_budgeted(file_path: str, file_type: str, max_chars: Optional[int] = None,
+                          max_tokens: Optional[int] = None, digest: Optional[str] = None,
+                          strict: bool = False) -> Optional[str]:
+    """
+    The first ``max_chars`` (or about ``max_tokens``) characters of a file's
+    whitespace-normalized text, extracting only as many pages or paragraphs
+    as that takes. ``strict`` is as for ``extract_text_from_file``.
+
+    Returns:
+        Extracted text or None if extraction fails
+    """
+    budgets = [b for b in (max_chars, max_tokens * CHARS_PER_TOKEN if max_tokens else None) if b]
+    budget = min(budgets) if budgets else None
+    parts, used = [], 0
+    chunks = iter_text_from_file(file_path, file_type, digest=digest, strict=strict)
+    try:
+        for chunk in chunks:
+            chunk = " ".join(chunk.split())
+            if not chunk:
+                continue
+            if budget is not None:
+                chunk = chunk[:max(budget - used, 0)]
+            parts.append(chunk)
+            used += len(chunk) + 1  # joined with a space
+            if budget is not None and used >= budget:
+                break
+    except IncompleteExtractionError as e:
+        raise IncompleteExtractionError(str(e), " ".join(parts) or None) from e
+    except Exception as e:
+        logger.error(f"Text extraction failed for {file_type}: {e}")
+        if not parts:
+            return None
+    finally:
+        chunks.close()
+    text = " ".join(parts)
+    return text if text else None
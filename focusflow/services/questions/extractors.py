@@ -0,0 +1,200 @@
+"""
+Extractor registry.
+
+Each text-extraction backend is declared with ``register_extractor`` next to
+its code, with the formats it reads, the modules it needs and a rank.
+For a file, the available backends are tried best rank first; a backend
+that raises before producing any text hands over to the next (one that
+runs and finds no text does not: a blank scan would only be OCR'd again).
+Upload latency then depends on the best engine installed, whichever module
+the caller imported.
+
+Ranks can be overridden per format, e.g. with the preference printed by
+``benchmarks/bench_extract.py``; every backend call is timed and the
+per-backend totals are served at ``/api/metrics/extractors``.
+
+Configuration (environment or app.config):
+    EXTRACTOR_PREFERENCE  backends to try first, per format: "pdf=pypdf2,pymupdf;docx=python-docx"
+"""
+import importlib.util
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, List, Optional
+
+from flask import current_app, has_app_context
+
+logger = logging.getLogger(__name__)
+
+# Formats by MIME type, for callers that have a content type instead of an extension
+MIME_TYPES = {
+    "application/pdf": "pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
+    "text/plain": "txt",
+    "image/png": "png",
+    "image/jpeg": "jpg",
+}
+
+
+@dataclass(frozen=True)
+class ExtractorSpec:
+    """A registered extraction backend."""
+    name: str
+    formats: tuple
+    rank: int
+    requires: tuple
+    iter_text: Callable = field(compare=False, hash=False)
+
+    def available(self) -> bool:
+        return all(importlib.util.find_spec(module) is not None for module in self.requires)
+
+
+class IncompleteExtractionError(RuntimeError):
+    """
+    Raised in strict mode when part of a document couldn't be read (e.g. its
+    scanned pages, with OCR unavailable); ``text`` holds what was extracted.
+    """
+
+    def __init__(self, message: str, text: Optional[str] = None):
+        super().__init__(message)
+        self.text = text
+
+
+_REGISTRY: dict[str, ExtractorSpec] = {}
+
+_stats_lock = threading.Lock()
+_stats: dict = {}
+
+
+def register_extractor(name: str, formats, rank: int = 100, requires=()):
+    """
+    Decorator declaring ``fn(file_path, digest=None, strict=False) -> Iterator[str]``
+    as the backend ``name`` for ``formats`` (extensions). Lower ranks are tried
+    first. With ``strict``, a backend raises ``IncompleteExtractionError``
+    instead of skipping what it can't read.
+    """
+    def decorator(fn):
+        _REGISTRY[name] = ExtractorSpec(name, tuple(formats), rank, tuple(requires), fn)
+        return fn
+    return decorator
+
+
+def normalize_format(file_type: str) -> str:
+    """An extension (with or without the dot, any case) or MIME type as a registry format."""
+    file_type = (file_type or "").strip().lower()
+    if "/" in file_type:
+        return MIME_TYPES.get(file_type.split(";")[0].strip(), "")
+    file_type = file_type.lstrip(".")
+    return "jpg" if file_type == "jpeg" else file_type
+
+
+def _preference(file_format: str) -> List[str]:
+    value = current_app.config.get("EXTRACTOR_PREFERENCE") if has_app_context() else None
+    value = value or os.getenv("EXTRACTOR_PREFERENCE", "")
+    for entry in value.split(";"):
+        fmt, _, names = entry.partition("=")
+        if normalize_format(fmt) == file_format:
+            return [n.strip() for n in names.split(",") if n.strip()]
+    return []
+
+
+def registered_extractors(file_type: Optional[str] = None) -> List[ExtractorSpec]:
+    """All backends (for a format), preferred first, then by rank."""
+    file_format = normalize_format(file_type) if file_type else None
+    specs = [s for s in _REGISTRY.values() if file_format is None or file_format in s.formats]
+    preferred = _preference(file_format) if file_format else []
+    order = {name: i for i, name in enumerate(preferred)}
+    return sorted(specs, key=lambda s: (order.get(s.name, len(order)), s.rank, s.name))
+
+
+def extractors_for(file_type: str) -> List[ExtractorSpec]:
+    """The installed backends for a format, in the order they are tried."""
+    return [s for s in registered_extractors(file_type) if s.available()]
+
+
+def supported_formats() -> set:
+    return {fmt for spec in _REGISTRY.values() for fmt in spec.formats}
+
+
+def _record(name: str, seconds: float, chars: int, failed: bool) -> None:
+    with _stats_lock:
+        stats = _stats.setdefault(name, {"calls": 0, "failures": 0, "total_ms": 0.0, "max_ms": 0.0, "chars": 0})
+        ms = seconds * 1000
+        stats["calls"] += 1
+        stats["failures"] += int(failed)
+        stats["total_ms"] += ms
+        stats["max_ms"] = max(stats["max_ms"], ms)
+        stats["chars"] += chars
+
+
+def extractor_stats() -> dict:
+    """Per-backend call counts and time spent extracting, in this process."""
+    with _stats_lock:
+        snapshot = {name: dict(stats) for name, stats in _stats.items()}
+    for stats in snapshot.values():
+        stats["avg_ms"] = round(stats["total_ms"] / stats["calls"], 1) if stats["calls"] else 0.0
+        stats["total_ms"] = round(stats["total_ms"], 1)
+        stats["max_ms"] = round(stats["max_ms"], 1)
+    return snapshot
+
+
+def _timed(spec: ExtractorSpec, chunks: Iterator[str]) -> Iterator[str]:
+    """Pass chunks through, timing only the backend's own work (not the consumer's)."""
+    chunks = iter(chunks)
+    elapsed, chars, failed = 0.0, 0, False
+    try:
+        while True:
+            t0 = time.perf_counter()
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                break
+            except Exception:
+                failed = True
+                raise
+            finally:
+                elapsed += time.perf_counter() - t0
+            chars += len(chunk)
+            yield chunk
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+        _record(spec.name, elapsed, chars, failed)
+
+
+def iter_text(file_path: str, file_type: str, digest: Optional[str] = None,
+              backend: Optional[str] = None, strict: bool = False) -> Iterator[str]:
+    """
+    Yield a file's text with the best installed backend for its format (or
+    the named ``backend``), falling back to the next one if a backend raises
+    (e.g. on a file its library can't parse) before producing any text.
+    """
+    if normalize_format(file_type) not in supported_formats():
+        logger.warning(f"Unsupported file type: {file_type}")
+        return
+    specs = extractors_for(file_type)
+    if backend is not None:
+        specs = [s for s in specs if s.name == backend]
+    if not specs:
+        logger.warning(f"No extractor installed for file type: {file_type}")
+        return
+
+    for spec in specs:
+        produced, chunks = False, None
+        try:
+            chunks = _timed(spec, spec.iter_text(file_path, digest=digest, strict=strict))
+            for chunk in chunks:
+                produced = True
+                yield chunk
+            return
+        except IncompleteExtractionError:
+            raise  # the next backend would be missing the same tool
+        except Exception as e:
+            if produced:
+                raise
+            logger.warning(f"Extractor {spec.name} failed on {file_type}, trying the next one: {e}")
+        finally:
+            if chunks is not None:
+                chunks.close()
@@ -7,9 +7,18 @@ import re
 import logging
 from typing import Dict, List, Optional
 from .formatting import _to_app_format
+from .generation_cache import generation_key, memoized_generation
 
 logger = logging.getLogger(__name__)
 
+# Truncate text to avoid token limits (most models have 4K-8K context)
+# 12000 chars ≈ 3000 tokens, leaving room for prompt and response
+MAX_INPUT_CHARS = 12000
+
+# Part of the generation cache key: bump when the prompt or the sampling
+# parameters change, so cached questions from the old prompt aren't served
+PROMPT_VERSION = 1
+
 
 def _normalize_ws(s: str) -> str:
     """
@@ -19,6 +28,11 @@ def _normalize_ws(s: str) -> str:
     return re.sub(r"\s+", " ", s).strip()
 
 
+def prepare_excerpt(text: str) -> str:
+    """The part of a document's text that is sent to the model."""
+    return _normalize_ws(text)[:MAX_INPUT_CHARS]
+
+
 def _extract_json_object(text: str) -> dict:
     """
     Extract a JSON object from LLM response text.
@@ -53,10 +67,10 @@ def generate_questions_from_text_lmstudio(text: str, num_questions: int = 5) ->
     Generate multiple-choice questions from text using LM Studio's API.
     
     This function:
-    1. Connects to your local LM Studio server
-    2. Sends the document text with a prompt
-    3. Parses the JSON response containing questions
-    4. Converts to the app's expected format
+    1. Looks the excerpt up in the generation cache
+    2. Otherwise sends the document text with a prompt to your local LM Studio server
+       and parses the JSON response containing questions
+    3. Converts to the app's expected format (answers shuffled on every call)
     
     Environment Variables:
     - LMSTUDIO_BASE_URL: Base URL for LM Studio API (default: http://127.0.0.1:1234/v1)
@@ -74,6 +88,28 @@ def generate_questions_from_text_lmstudio(text: str, num_questions: int = 5) ->
         logger.warning("Empty text provided for question generation")
         return None
 
+    excerpt = prepare_excerpt(text)
+    # Empty string = use currently loaded model (cached under "default": set
+    # LMSTUDIO_MODEL_ID when switching models so their quizzes are kept apart)
+    model_id = os.getenv("LMSTUDIO_MODEL_ID", "")
+    model = model_id or "default"
+    key = generation_key(excerpt, model, PROMPT_VERSION, num_questions)
+
+    raw_questions = memoized_generation(key, model, lambda: _request_questions(excerpt, num_questions, model_id))
+    if not raw_questions:
+        return None
+
+    # Convert to app format and return
+    return _to_app_format(raw_questions)
+
+
+def _request_questions(excerpt: str, num_questions: int, model_id: str) -> Optional[List[Dict]]:
+    """
+    Ask LM Studio for questions about an excerpt.
+
+    Returns the validated raw questions (``question_text``, 4 ``choices``,
+    ``correct_index``), or None if the call or the response is unusable.
+    """
     # Import OpenAI client (used for LM Studio's OpenAI-compatible API)
     try:
         from openai import OpenAI
@@ -84,7 +120,6 @@ def generate_questions_from_text_lmstudio(text: str, num_questions: int = 5) ->
     # Get LM Studio configuration from environment
     # Default port 1234 is LM Studio's default
     base_url = os.getenv("LMSTUDIO_BASE_URL", "http://127.0.0.1:1234/v1")
-    model_id = os.getenv("LMSTUDIO_MODEL_ID", "")  # Empty string = use currently loaded model
     
     logger.info(f"Connecting to LM Studio at {base_url}")
     
@@ -95,10 +130,6 @@ def generate_questions_from_text_lmstudio(text: str, num_questions: int = 5) ->
         api_key="lm-studio"  # LM Studio ignores this but OpenAI client requires it
     )
 
-    # Truncate text to avoid token limits (most models have 4K-8K context)
-    # 12000 chars ≈ 3000 tokens, leaving room for prompt and response
-    excerpt = _normalize_ws(text)[:12000]
-
     # Build the prompt for question generation
     prompt = f"""Create {num_questions} multiple-choice questions based on the following text.
 
@@ -178,9 +209,12 @@ TEXT TO CREATE QUESTIONS FROM:
                 logger.error(f"Question {idx+1} has invalid correct_index")
                 return None
 
-        # Convert to app format and return
         logger.info(f"Successfully generated {len(raw_questions)} questions")
-        return _to_app_format(raw_questions)
+        # Keep only the fields the app uses (this is what gets cached)
+        return [
+            {"question_text": q["question_text"], "choices": q["choices"], "correct_index": q["correct_index"]}
+            for q in raw_questions
+        ]
         
     except ConnectionError as e:
         logger.error(f"Cannot connect to LM Studio at {base_url}. Is it running?")
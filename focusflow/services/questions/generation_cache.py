@@ -0,0 +1,75 @@
+"""
+Memoized question generation.
+
+A chat completion takes tens of seconds, and the same excerpt is often sent
+again: a re-uploaded document, or notes shared by a class. Validated raw
+questions are stored in the ``generation_cache`` collection under the
+SHA-256 of the excerpt, the model, ``PROMPT_VERSION`` and the question
+count. Only the raw questions are cached; answers are shuffled again each
+time they are served.
+
+The cache is capped by entry count, since a cached quiz is a few kilobytes
+whatever the excerpt; see ``content_cache`` for expiry and eviction.
+
+Configuration (environment or app.config):
+    GENERATION_CACHE_ENABLED      set to false to always call the model (default true)
+    GENERATION_CACHE_MAX_ENTRIES  cached quizzes kept (default 5000)
+"""
+import hashlib
+import logging
+import unicodedata
+from typing import Callable, List, Optional
+
+from ...runtime import app_setting
+from .content_cache import ContentCache
+
+logger = logging.getLogger(__name__)
+
+_cache = ContentCache(
+    "generation_cache", "GENERATION_CACHE_ENABLED",
+    lambda: {"max_entries": int(app_setting("GENERATION_CACHE_MAX_ENTRIES", 5000))},
+)
+
+
+def text_fingerprint(excerpt: str) -> str:
+    """SHA-256 of an excerpt, after Unicode (NFC) and whitespace normalization."""
+    normalized = " ".join(unicodedata.normalize("NFC", excerpt).split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def generation_key(excerpt: str, model: str, prompt_version: int, num_questions: int) -> str:
+    return f"{text_fingerprint(excerpt)}:{model}:{prompt_version}:{num_questions}"
+
+
+def generation_cache_stats() -> dict:
+    """This process's hit/miss counts since it started."""
+    return _cache.stats()
+
+
+def memoized_generation(key: str, model: str, generate: Callable[[], Optional[List[dict]]]) -> Optional[List[dict]]:
+    """
+    Raw questions for ``key`` from the cache, or from ``generate()`` (stored
+    if it succeeds). Failed generations are not cached.
+    """
+    if not _cache.enabled():
+        return generate()
+
+    try:
+        entry = _cache.get(key)
+    except Exception as e:
+        logger.warning(f"Generation cache unavailable, calling the model: {e}")
+        return generate()
+
+    if entry is not None:
+        questions = entry.get("questions")
+        if isinstance(questions, list) and questions:
+            _cache.hit(key, entry)
+            logger.info(f"Serving {len(questions)} cached questions ({key[:12]}...)")
+            return questions
+        _cache.drop(key, "no questions")
+
+    _cache.miss()
+    questions = generate()
+    if questions:
+        _cache.store(key, questions=questions, model=model)
+    return questions
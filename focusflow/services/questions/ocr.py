@@ -0,0 +1,205 @@
+"""
+Page-at-a-time OCR of scanned PDFs in a process pool.
+
+Rendering a whole scan at 300 dpi up front holds every page bitmap in
+memory at once (about 25 MB per A4 page in RGB) and OCRs them on one core.
+Here each pool task renders a single page itself, in grayscale (PyMuPDF,
+or poppler via pdf2image), OCRs it and returns only the text. Peak memory
+is one page bitmap per worker whatever the page count, and the caller
+collects the texts in page order. At most OCR_MAX_PAGES_IN_FLIGHT pages
+per document are queued at once, so concurrent documents share the pool.
+
+The pool is started on the first scanned page, from a request or job
+thread, so its workers come from a forkserver rather than a fork of this
+multi-threaded process (a fork could copy a lock another thread held).
+Every app process has its own pool: with N app processes up to
+N x OCR_WORKERS pages are OCR'd at once, so size it as cores / N.
+
+Configuration (environment or app.config):
+    OCR_WORKERS               pool processes per app process; 0 OCRs inline (default: half the cpu count)
+    OCR_DPI                   render resolution (default 300)
+    OCR_MAX_PAGES_IN_FLIGHT   pages of one document queued or running at once (default: 2 x workers)
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterable, Iterator, List, Optional
+
+from ...runtime import setting
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DPI = 300
+
+
+def page_count(path: str) -> int:
+    """Number of pages in a PDF."""
+    try:
+        import pymupdf as fitz
+    except ImportError:
+        from pdf2image import pdfinfo_from_path
+        return int(pdfinfo_from_path(path)["Pages"])
+    with fitz.open(path) as doc:
+        return doc.page_count
+
+
+def render_page(path: str, index: int, dpi: int = DEFAULT_DPI):
+    """One page (0-based) as a grayscale PIL image."""
+    from PIL import Image
+    try:
+        import pymupdf as fitz
+    except ImportError:
+        from pdf2image import convert_from_path
+        return convert_from_path(path, dpi=dpi, first_page=index + 1, last_page=index + 1, grayscale=True)[0]
+    with fitz.open(path) as doc:
+        pixmap = doc[index].get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+        return Image.frombytes("L", (pixmap.width, pixmap.height), pixmap.samples)
+
+
+def ocr_page(path: str, index: int, dpi: int = DEFAULT_DPI) -> str:
+    """Render and OCR one page; runs in a pool worker."""
+    import pytesseract
+    image = render_page(path, index, dpi)
+    try:
+        return pytesseract.image_to_string(image)
+    finally:
+        image.close()
+
+
+def _init_worker() -> None:
+    # One tesseract thread per worker: parallelism comes from the pool
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+class OcrEngine:
+    """Runs page OCR in a process pool, a bounded window of pages at a time."""
+
+    def __init__(self, workers: int = 0, dpi: int = DEFAULT_DPI, max_in_flight: int | None = None):
+        self.workers = workers
+        self.dpi = dpi
+        self.max_in_flight = max_in_flight or max(1, workers * 2)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def _pool(self):
+        if self.workers <= 0:
+            return None
+        pid = os.getpid()
+        if self._executor is None or self._pid != pid:
+            with self._lock:
+                if self._executor is None or self._pid != pid:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("forkserver"),
+                        initializer=_init_worker,
+                    )
+                    self._pid = pid
+        return self._executor
+
+    def _discard(self, pool) -> None:
+        """Drop a broken pool (a worker died) so the next page starts a new one."""
+        with self._lock:
+            if self._executor is pool:
+                self._executor = None
+
+    def _page_done(self, pool, future: Future) -> None:
+        # Pages queued when a worker died fail with the pool; later ones get a new pool
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._discard(pool)
+
+    def submit(self, path: str, index: int) -> Future:
+        """Queue one page (0-based) for OCR; without a pool it is OCR'd before returning."""
+        pool = self._pool()
+        if pool is not None:
+            try:
+                future = pool.submit(ocr_page, path, index, self.dpi)
+            except BrokenProcessPool:
+                logger.warning("OCR pool broke (a worker died); starting a new one")
+                self._discard(pool)
+                pool = self._pool()
+                future = pool.submit(ocr_page, path, index, self.dpi)
+            future.add_done_callback(lambda f, pool=pool: self._page_done(pool, f))
+            return future
+        future = Future()
+        try:
+            future.set_result(ocr_page(path, index, self.dpi))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def iter_pages(self, path: str, pages: Optional[Iterable[int]] = None) -> Iterator[str]:
+        """
+        Yield the OCR text of the given pages (0-based; default all), in the
+        order given, while the next pages are OCR'd in the background.
+        Raises if a page fails; when that happens or the caller stops early,
+        the pages not yet started are cancelled.
+        """
+        indices = range(page_count(path)) if pages is None else pages
+        if self._pool() is None:
+            for index in indices:
+                yield ocr_page(path, index, self.dpi)
+            return
+
+        window: deque = deque()
+        try:
+            for index in indices:
+                if len(window) >= self.max_in_flight:
+                    yield window.popleft().result()
+                window.append(self.submit(path, index))
+            while window:
+                yield window.popleft().result()
+        finally:
+            for future in window:
+                future.cancel()
+
+    def ocr_pages(self, path: str, pages: Optional[Iterable[int]] = None) -> List[str]:
+        """OCR text of the given pages (0-based; default all), in the order given."""
+        return list(self.iter_pages(path, pages))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_engine: OcrEngine | None = None
+
+
+def configure(config=None) -> OcrEngine:
+    """(Re)build the process-wide OCR engine from app.config / environment."""
+    global _engine
+    workers = int(setting(config, "OCR_WORKERS", max(1, (os.cpu_count() or 1) // 2)))
+    max_in_flight = setting(config, "OCR_MAX_PAGES_IN_FLIGHT", None)
+    if _engine is not None:
+        _engine.shutdown()
+    _engine = OcrEngine(
+        workers=workers,
+        dpi=int(setting(config, "OCR_DPI", DEFAULT_DPI)),
+        max_in_flight=int(max_in_flight) if max_in_flight else None,
+    )
+    return _engine
+
+
+def get_ocr_engine() -> OcrEngine:
+    return _engine or configure()
+
+
+def ocr_pdf(path: str, pages: Optional[Iterable[int]] = None) -> List[str]:
+    """OCR text of a PDF's pages, in page order."""
+    return get_ocr_engine().ocr_pages(path, pages)
+
+
+def iter_ocr_pdf(path: str, pages: Optional[Iterable[int]] = None) -> Iterator[str]:
+    """OCR text of a PDF's pages, one page at a time (close the iterator to stop early)."""
+    return get_ocr_engine().iter_pages(path, pages)
+
+
+def init_app(app) -> None:
+    """Configure the OCR engine; its pool starts when the first scanned PDF arrives."""
+    configure(app.config)
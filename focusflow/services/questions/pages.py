@@ -0,0 +1,76 @@
+"""
+Per-page classification of PDFs: text layer or OCR.
+
+Lecture packs mix digital slides with a few scanned handouts. Deciding once
+per document either misses the scanned pages or OCRs hundreds of pages
+whose text layer is already perfect, so each page is classified on its
+own: a page with at least PAGE_MIN_CHARS of text-layer text keeps it, an
+image page with less is OCR'd, and an empty page without images is skipped.
+
+Pages are read, classified and handed on one at a time, so a caller that
+stops at its budget never opens the rest of the document. Once a document
+has been walked to the end its classification is cached per digest (per
+process), so a re-extraction reads the text layer of text pages only.
+"""
+import importlib.util
+from typing import Iterator, Optional, Tuple
+
+from ...cache import TTLCache
+
+# Text-layer characters above which a page is taken as digital
+PAGE_MIN_CHARS = 50
+
+# Part of the classification cache key: bump when the rules above change
+CLASSIFIER_VERSION = 1
+
+_layouts = TTLCache(maxsize=512, ttl=24 * 3600)
+
+
+def _walk_pymupdf(path: str, known_ocr: Optional[frozenset]) -> Iterator[Tuple[int, str, bool]]:
+    import pymupdf as fitz
+
+    with fitz.open(path) as doc:
+        for index, page in enumerate(doc):
+            if known_ocr is not None and index in known_ocr:
+                yield index, "", True
+                continue
+            text = (page.get_text("text") or "").strip()
+            needs_ocr = known_ocr is None and len(text) < PAGE_MIN_CHARS and bool(page.get_images(full=False))
+            yield index, text, needs_ocr
+
+
+def _walk_pypdf2(path: str) -> Iterator[Tuple[int, str, bool]]:
+    import PyPDF2
+
+    with open(path, "rb") as f:
+        for index, page in enumerate(PyPDF2.PdfReader(f).pages):
+            text = (page.extract_text() or "").strip()
+            # No cheap image check here: any page without enough text is a candidate
+            yield index, text, len(text) < PAGE_MIN_CHARS
+
+
+def iter_pdf_pages(path: str, digest: Optional[str] = None,
+                   reader: Optional[str] = None) -> Iterator[Tuple[int, str, bool]]:
+    """
+    Yield ``(index, text_layer, needs_ocr)`` for each page (0-based), as
+    each page is read; the text layer is "" for pages known to need OCR.
+    ``reader`` is "pymupdf" or "pypdf2" (default: PyMuPDF if it is
+    installed). The classification is cached only once every page has been
+    walked, so a caller that stops early leaves no partial layout behind.
+    """
+    if reader == "pypdf2" or (reader is None and importlib.util.find_spec("pymupdf") is None):
+        yield from _walk_pypdf2(path)
+        return
+    key = f"{digest}:{CLASSIFIER_VERSION}" if digest else None
+    known_ocr = _layouts.get(key) if key else None
+    ocr_pages = []
+    for index, text, needs_ocr in _walk_pymupdf(path, frozenset(known_ocr) if known_ocr is not None else None):
+        if needs_ocr:
+            ocr_pages.append(index)
+        yield index, text, needs_ocr
+    if key and known_ocr is None:
+        _layouts.set(key, tuple(ocr_pages))
+
+
+def layout_cache_stats() -> dict:
+    return _layouts.stats()
@@ -0,0 +1,14 @@
+"""
+Quiz jobs service module.
+Handles queued quiz generation (text extraction, then question generation).
+"""
+from .pipeline import (
+    enqueue_quiz_job,
+    get_job_status,
+    upload_path,
+    question_count,
+    QuizJobWorkers,
+    init_app,
+)
+
+__all__ = ['enqueue_quiz_job', 'get_job_status', 'upload_path', 'question_count', 'QuizJobWorkers', 'init_app']
@@ -0,0 +1,297 @@
+"""
+Quiz generation jobs: uploads enqueue, background workers extract and generate.
+
+An upload is saved and recorded as a job in the ``quiz_jobs`` collection,
+and the request returns at once. Each stage has its own pool of worker
+threads, sized separately because they wait on different things: text
+extraction (including OCR of scanned PDFs and images) is CPU-bound work in
+tesseract/poppler subprocesses (only as many pages as the model will see,
+and skipped when the same file was extracted before, see ``questions.cache``),
+generation waits on the LLM server. When a job finishes, the questions
+become the user's current quiz and a ``quiz_ready`` event is published.
+
+Configuration (environment or app.config):
+    QUIZ_WORKER              run the stage workers inside each app process (default true)
+    QUIZ_OCR_CONCURRENCY     jobs extracting text at once, per process (default 2)
+    QUIZ_LLM_CONCURRENCY     jobs waiting on the LLM at once, per process (default 2)
+    QUIZ_JOB_POLL_SECONDS    idle poll interval (default 2)
+    QUIZ_JOB_LEASE_SECONDS   a stage still running after this long is retried elsewhere (default 600)
+    QUIZ_JOB_MAX_ATTEMPTS    tries per stage before the job fails (default 2)
+"""
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+from bson.objectid import ObjectId
+
+from ...indexes import declare_index
+from ...repositories import get_repositories
+from ...runtime import ProcessThreads, setting
+from ..events import publish_event
+from ..questions import MAX_INPUT_CHARS, extract_text_cached, generate_questions_from_text_lmstudio, prepare_excerpt
+
+logger = logging.getLogger(__name__)
+
+# Workers claim the oldest job of a status; uploads cancel the user's unfinished
+# jobs; finished jobs are kept a day for the status endpoint
+declare_index("quiz_jobs", [("status", 1), ("created_at", 1)])
+declare_index("quiz_jobs", [("user_id", 1), ("status", 1)])
+declare_index("quiz_jobs", "finished_at", expireAfterSeconds=24 * 3600)
+
+STAGE_SETTINGS = {"extract": "QUIZ_OCR_CONCURRENCY", "generate": "QUIZ_LLM_CONCURRENCY"}
+
+# Fields the status endpoint reports
+STATUS_FIELDS = ("status", "error", "filename", "question_count", "created_at", "finished_at")
+
+# Text read from each upload: the excerpt the model sees (MAX_INPUT_CHARS), and
+# question_count reaches its maximum by 15000 characters, so the rest of a long
+# document (and its OCR) would change nothing
+EXTRACT_BUDGET_CHARS = max(MAX_INPUT_CHARS, 15000)
+
+READ_ERROR = "Could not read the file (empty/unreadable)."
+GENERATE_ERROR = "Could not generate questions. Upload a document with more content."
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _remove_file(path: str | None) -> None:
+    try:
+        if path and os.path.exists(path):
+            os.remove(path)
+    except OSError:
+        pass
+
+
+def question_count(text_length: int) -> int:
+    """
+    Number of questions for a document: 5, plus 1 for every 1000
+    characters and a bit of randomness, at most 15.
+    """
+    return min(max(5, (text_length // 1000) + random.randint(0, 2)), 15)
+
+
+def upload_path(upload_folder: str, job_id, filename: str) -> str:
+    """Where an upload is saved (prefixed with its job id so uploads never collide)."""
+    return os.path.join(upload_folder, f"{job_id}_{filename}")
+
+
+def enqueue_quiz_job(job_id, user_id, file_path: str, filename: str, file_type: str, task_id=None) -> str:
+    """
+    Record a saved upload as a job and wake the local extraction workers.
+    The user's unfinished jobs are cancelled: only the latest upload becomes the quiz.
+    """
+    jobs = get_repositories().quiz_jobs
+    now = _utcnow()
+    for old in jobs.cancel_unfinished(user_id, now):
+        _remove_file(old.get("file_path"))
+    jobs.create({
+        "_id": ObjectId(job_id),
+        "user_id": ObjectId(user_id),
+        "status": "queued",
+        "attempts": 0,
+        "filename": filename,
+        "file_path": file_path,
+        "file_type": file_type,
+        "task_id": ObjectId(task_id) if task_id else None,
+        "created_at": now,
+        "updated_at": now,
+    })
+    if _workers is not None:
+        _workers.ensure_running()
+        _workers.wake("extract")
+    return str(job_id)
+
+
+def get_job_status(job_id, user_id) -> dict | None:
+    """A user's job as reported by the status endpoint, or None if there is no such job."""
+    return get_repositories().quiz_jobs.get(job_id, user_id=user_id, fields=STATUS_FIELDS)
+
+
+def run_extract(job: dict) -> bool:
+    """Extract the start of the document's text; returns whether the job moved on to generation."""
+    jobs = get_repositories().quiz_jobs
+    started = time.perf_counter()
+    text = extract_text_cached(job["file_path"], job["file_type"], max_chars=EXTRACT_BUDGET_CHARS)
+    if not text or not text.strip():
+        if jobs.fail(job, READ_ERROR, _utcnow()):
+            _remove_file(job["file_path"])
+        return False
+    return jobs.advance(job, "extract", _utcnow(), set_fields={
+        "excerpt": prepare_excerpt(text),
+        "text_length": len(text),
+        "target_count": question_count(len(text)),
+        "extract_ms": round((time.perf_counter() - started) * 1000),
+    })
+
+
+def run_generate(job: dict) -> bool:
+    """Generate the questions and make them the user's current quiz; returns whether it did."""
+    repos = get_repositories()
+    started = time.perf_counter()
+    questions = generate_questions_from_text_lmstudio(job["excerpt"], num_questions=job["target_count"])
+    if not questions:
+        if repos.quiz_jobs.fail(job, GENERATE_ERROR, _utcnow()):
+            _remove_file(job["file_path"])
+        return False
+
+    finished = repos.quiz_jobs.advance(
+        job, "generate", _utcnow(),
+        set_fields={"question_count": len(questions), "generate_ms": round((time.perf_counter() - started) * 1000)},
+        unset=("excerpt",),
+    )
+    if not finished:
+        # A newer upload cancelled this job (and removed its file), or our
+        # lease ran out and another worker now owns it
+        return False
+
+    repos.users.update(job["user_id"], {"$set": {
+        "current_file": {
+            "filename": job["filename"],
+            "file_path": job["file_path"],
+            "file_type": job["file_type"],
+            "uploaded_at": job["created_at"],
+            "task_id": job.get("task_id"),
+            "job_id": job["_id"],
+        },
+        "current_questions": questions,
+    }})
+    publish_event(job["user_id"], "quiz_ready", {
+        "job_id": job["_id"], "filename": job["filename"], "questions": len(questions),
+    })
+    return True
+
+
+STAGE_HANDLERS = {"extract": run_extract, "generate": run_generate}
+
+
+class StageWorker:
+    """A pool of threads in the current process that runs one stage of queued jobs."""
+
+    def __init__(self, app, stage: str, concurrency: int, poll_seconds: float = 2,
+                 lease_seconds: float = 600, max_attempts: int = 2, on_advance=None):
+        self.app = app
+        self.stage = stage
+        self.concurrency = concurrency
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.on_advance = on_advance
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = ProcessThreads(self.run, f"quiz-{stage}", count=concurrency, stop=self._stop)
+
+    def ensure_running(self) -> None:
+        """Start the stage's threads in this process."""
+        self._threads.ensure_running()
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def run(self) -> None:
+        with self.app.app_context():
+            while not self._stop.is_set():
+                try:
+                    busy = self.process_one()
+                except Exception:
+                    logger.exception(f"Quiz {self.stage} pass failed")
+                    busy = False
+                if not busy:
+                    self._wake.wait(self.poll_seconds)
+                    self._wake.clear()
+
+    def process_one(self) -> bool:
+        """Claim and run one job; returns False when none was waiting."""
+        jobs = get_repositories().quiz_jobs
+        job = jobs.claim(self.stage, _utcnow(), self.lease_seconds)
+        if job is None:
+            return False
+        if job.get("attempts", 0) > self.max_attempts:
+            logger.error(f"Giving up on quiz job {job['_id']} after {job['attempts'] - 1} {self.stage} attempts")
+            if jobs.fail(job, "Quiz generation took too long. Please try again.", _utcnow()):
+                _remove_file(job.get("file_path"))
+            return True
+        try:
+            advanced = STAGE_HANDLERS[self.stage](job)
+        except Exception:
+            logger.exception(f"Quiz job {job['_id']} failed in {self.stage}")
+            if jobs.fail(job, "Quiz generation failed. Please try again.", _utcnow()):
+                _remove_file(job.get("file_path"))
+            return True
+        if advanced and self.on_advance is not None:
+            self.on_advance()
+        return True
+
+
+class QuizJobWorkers:
+    """The extraction and generation workers of one process."""
+
+    def __init__(self, app, ocr_concurrency: int = 2, llm_concurrency: int = 2, **options):
+        self.stages = {
+            "generate": StageWorker(app, "generate", llm_concurrency, **options),
+        }
+        self.stages["extract"] = StageWorker(
+            app, "extract", ocr_concurrency, on_advance=self.stages["generate"].wake, **options
+        )
+
+    def ensure_running(self) -> None:
+        for worker in self.stages.values():
+            worker.ensure_running()
+
+    def wake(self, stage: str) -> None:
+        self.stages[stage].wake()
+
+    def stop(self) -> None:
+        for worker in self.stages.values():
+            worker.stop()
+
+
+_workers: QuizJobWorkers | None = None
+
+
+def build_workers(app) -> QuizJobWorkers:
+    config = app.config
+    return QuizJobWorkers(
+        app,
+        ocr_concurrency=int(setting(config, "QUIZ_OCR_CONCURRENCY", 2)),
+        llm_concurrency=int(setting(config, "QUIZ_LLM_CONCURRENCY", 2)),
+        poll_seconds=float(setting(config, "QUIZ_JOB_POLL_SECONDS", 2)),
+        lease_seconds=float(setting(config, "QUIZ_JOB_LEASE_SECONDS", 600)),
+        max_attempts=int(setting(config, "QUIZ_JOB_MAX_ATTEMPTS", 2)),
+    )
+
+
+def init_app(app) -> None:
+    """Register `flask quiz-worker` and, unless disabled, in-process stage workers."""
+    global _workers
+    import click
+
+    @app.cli.command("quiz-worker")
+    def quiz_worker_command():
+        """Run quiz generation jobs in the foreground."""
+        workers = build_workers(app)
+        ocr, llm = workers.stages["extract"].concurrency, workers.stages["generate"].concurrency
+        click.echo(f"Running quiz jobs with {ocr} extraction and {llm} generation threads (Ctrl+C to stop)")
+        workers.ensure_running()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            workers.stop()
+
+    if str(setting(app.config, "QUIZ_WORKER", "true")).lower() in ("1", "true", "yes"):
+        _workers = build_workers(app)
+        workers = _workers
+
+        @app.before_request
+        def start_quiz_workers():
+            # Started from the first request so each forked server process gets its own threads
+            workers.ensure_running()
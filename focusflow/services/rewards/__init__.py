@@ -4,6 +4,7 @@ Handles reward definitions, checking, and awarding.
 """
 from .definitions import REWARD_DEFINITIONS
 from .handlers import (
+    describe_rewards,
     get_user_rewards,
     get_total_points,
     check_and_award_rewards,
@@ -13,6 +14,7 @@ from .handlers import (
 
 __all__ = [
     'REWARD_DEFINITIONS',
+    'describe_rewards',
     'get_user_rewards',
     'get_total_points',
     'check_and_award_rewards',
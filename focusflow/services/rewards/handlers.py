@@ -3,28 +3,31 @@ Reward checking and awarding functions.
 """
 from datetime import datetime, timezone
 from bson.objectid import ObjectId
-from db import get_db
+from ...conditional import bump_version
+from ...indexes import declare_index
+from ...repositories import get_repositories
+from ...repositories.unit_of_work import get_user_doc
+from ..events import publish_event
+from ..summary import update_summary
 from .definitions import REWARD_DEFINITIONS
 
+# Each reward is earned at most once per user
+declare_index("rewards", [("user_id", 1), ("reward_id", 1)], unique=True)
 
-def get_user_rewards(user_id: str) -> list:
+
+_DEFINITIONS_BY_ID = {rd["id"]: rd for rd in REWARD_DEFINITIONS}
+
+# User counters that reward conditions are checked against
+STAT_FIELDS = ("tasks_done", "streak", "quizzes_taken")
+
+
+def describe_rewards(rewards: list) -> list:
     """
-    Get all rewards earned by a user.
+    Enrich earned reward documents with their definitions.
     """
-    db = get_db()
-    rewards_collection = db["rewards"]
-    
-    try:
-        user_oid = ObjectId(user_id)
-    except Exception:
-        return []
-    
-    rewards = list(rewards_collection.find({"user_id": user_oid}))
-    
-    # Enrich with reward details
     result = []
     for r in rewards:
-        reward_def = next((rd for rd in REWARD_DEFINITIONS if rd["id"] == r.get("reward_id")), None)
+        reward_def = _DEFINITIONS_BY_ID.get(r.get("reward_id"))
         if reward_def:
             result.append({
                 "_id": str(r["_id"]),
@@ -36,15 +39,28 @@ def get_user_rewards(user_id: str) -> list:
                 "tier": reward_def["tier"],
                 "earned_at": r.get("earned_at")
             })
-    
     return result
 
 
-def get_total_points(user_id: str) -> int:
+def get_user_rewards(user_id: str) -> list:
+    """
+    Get all rewards earned by a user.
+    """
+    try:
+        user_oid = ObjectId(user_id)
+    except Exception:
+        return []
+    
+    return describe_rewards(get_repositories().rewards.list_for_user(user_oid, fields=("reward_id", "earned_at")))
+
+
+def get_total_points(user_id: str, rewards: list | None = None) -> int:
     """
     Calculate total points earned by a user.
+    Pass the user's already-fetched rewards to avoid reading them again.
     """
-    rewards = get_user_rewards(user_id)
+    if rewards is None:
+        rewards = get_user_rewards(user_id)
     return sum(r.get("points", 0) for r in rewards)
 
 
@@ -53,9 +69,7 @@ def check_and_award_rewards(user_id: str) -> list:
     Check if user qualifies for any new rewards and award them.
     Returns list of newly awarded rewards.
     """
-    db = get_db()
-    users_collection = db["users"]
-    rewards_collection = db["rewards"]
+    repos = get_repositories()
     
     try:
         user_oid = ObjectId(user_id)
@@ -63,7 +77,7 @@ def check_and_award_rewards(user_id: str) -> list:
         return []
     
     # Get user stats
-    user = users_collection.find_one({"_id": user_oid})
+    user = get_user_doc(user_oid, fields=STAT_FIELDS)
     if not user:
         return []
     
@@ -72,12 +86,7 @@ def check_and_award_rewards(user_id: str) -> list:
     quizzes_taken = user.get("quizzes_taken", 0)
     
     # Get already earned reward IDs
-    earned_rewards = set(
-        r["reward_id"] for r in rewards_collection.find(
-            {"user_id": user_oid},
-            {"reward_id": 1}
-        )
-    )
+    earned_rewards = repos.rewards.earned_ids(user_oid)
     
     new_rewards = []
     
@@ -103,12 +112,8 @@ def check_and_award_rewards(user_id: str) -> list:
         
         if qualified:
             # Award the reward
-            reward_doc = {
-                "user_id": user_oid,
-                "reward_id": reward_id,
-                "earned_at": datetime.now(timezone.utc)
-            }
-            rewards_collection.insert_one(reward_doc)
+            if not repos.rewards.award(user_oid, reward_id, datetime.now(timezone.utc)):
+                continue  # Awarded by a concurrent request
             
             new_rewards.append({
                 "reward_id": reward_id,
@@ -119,6 +124,12 @@ def check_and_award_rewards(user_id: str) -> list:
                 "tier": reward_def["tier"]
             })
     
+    if new_rewards:
+        points = sum(r["points"] for r in new_rewards)
+        bump_version(user_oid, "rewards")
+        update_summary(user_oid, inc={"total_points": points})
+        publish_event(user_oid, "reward", {"rewards": new_rewards, "points": points})
+
     return new_rewards
 
 
@@ -133,16 +144,14 @@ def get_user_progress(user_id: str) -> dict:
     """
     Get user's progress towards all rewards.
     """
-    db = get_db()
-    users_collection = db["users"]
-    rewards_collection = db["rewards"]
+    repos = get_repositories()
     
     try:
         user_oid = ObjectId(user_id)
     except Exception:
         return {}
     
-    user = users_collection.find_one({"_id": user_oid})
+    user = get_user_doc(user_oid, fields=STAT_FIELDS)
     if not user:
         return {}
     
@@ -150,12 +159,7 @@ def get_user_progress(user_id: str) -> dict:
     streak = user.get("streak", 0)
     quizzes_taken = user.get("quizzes_taken", 0)
     
-    earned_rewards = set(
-        r["reward_id"] for r in rewards_collection.find(
-            {"user_id": user_oid},
-            {"reward_id": 1}
-        )
-    )
+    earned_rewards = repos.rewards.earned_ids(user_oid)
     
     progress = []
     for reward_def in REWARD_DEFINITIONS:
@@ -187,7 +191,7 @@ def get_user_progress(user_id: str) -> dict:
     
     return {
         "rewards": progress,
-        "total_points": get_total_points(user_id),
+        "total_points": sum(rd["points"] for rd in REWARD_DEFINITIONS if rd["id"] in earned_rewards),
         "stats": {
             "tasks_done": tasks_done,
             "streak": streak,
@@ -4,7 +4,11 @@ Streak recording and calculation functions.
 from datetime import datetime, timedelta
 from bson.objectid import ObjectId
 from flask_login import current_user
-from db import get_db
+from ...indexes import declare_index
+from ...repositories import get_repositories
+
+# One event per user/day/source; the prefix also serves distinct("date") per user
+declare_index("streakEvents", [("userId", 1), ("date", 1), ("source", 1)], unique=True)
 
 
 def record_streak_event(source: str, meta: dict | None = None):
@@ -13,9 +17,6 @@ def record_streak_event(source: str, meta: dict | None = None):
     Events are deduplicated by user+date+source so multiple completions 
     on the same day only count as one streak contribution.
     """
-    db = get_db()
-    streak_events = db["streakEvents"]
-
     # Use YYYY-MM-DD string as the primary key for daily grouping
     today = datetime.now().strftime("%Y-%m-%d")
 
@@ -24,26 +25,8 @@ def record_streak_event(source: str, meta: dict | None = None):
     except Exception:
         return
 
-    # Check if this specific source already contributed to the streak today
-    existing = streak_events.find_one({
-        "userId": user_oid,
-        "date": today,
-        "source": source,
-    })
-
-    if existing:
-        return # Already recorded for today
-
-    doc = {
-        "userId": user_oid,
-        "date": today,
-        "source": source,
-    }
-    if meta:
-        doc["meta"] = meta
-
-    # Insert the event into MongoDB
-    streak_events.insert_one(doc)
+    # Skipped if this specific source already contributed to the streak today
+    get_repositories().streak_events.record(user_oid, today, source, meta)
 
 
 def calculate_current_streak(user_id: str) -> int:
@@ -52,16 +35,13 @@ def calculate_current_streak(user_id: str) -> int:
     The streak continues as long as there is at least one event per day.
     A streak is broken if a day (yesterday or older) is skipped.
     """
-    db = get_db()
-    streak_events = db["streakEvents"]
-
     try:
         user_oid = ObjectId(user_id)
     except Exception:
         return 0
 
     # Retrieve all unique dates the user was active
-    date_strings = streak_events.distinct("date", {"userId": user_oid})
+    date_strings = get_repositories().streak_events.active_dates(user_oid)
     if not date_strings:
         return 0
 
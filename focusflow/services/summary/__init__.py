@@ -0,0 +1,23 @@
+"""
+User summary service module.
+Maintains the per-user dashboard counters (read model).
+"""
+from .handlers import (
+    SUMMARY_FIELDS,
+    update_summary,
+    compute_summary,
+    rebuild_summary,
+    rebuild_all_summaries,
+    get_summary,
+    init_app
+)
+
+__all__ = [
+    'SUMMARY_FIELDS',
+    'update_summary',
+    'compute_summary',
+    'rebuild_summary',
+    'rebuild_all_summaries',
+    'get_summary',
+    'init_app'
+]
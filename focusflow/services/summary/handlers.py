@@ -0,0 +1,138 @@
+"""
+User summary read model.
+
+One ``user_summaries`` document per user (keyed by the user's _id) holds
+every counter the dashboard shows. The code paths that change those
+counters update it next to their own writes, so reading the counters is a
+single _id lookup instead of a sum over rewards and counts over tasks and
+notifications. A counter goes out the way its source write does: those
+over tasks, rewards and notifications (written at once) are applied at
+once, those mirroring user document fields (staged in the request's unit
+of work) are staged with them, so a failed request drops both.
+
+A missing summary is built from the source collections on first read.
+``flask rebuild-summaries`` recomputes them all (or one user's) to repair
+drift, e.g. after a manual data fix.
+"""
+import logging
+from datetime import datetime, timezone
+
+import click
+from bson.objectid import ObjectId
+
+from ...repositories import get_repositories
+from ...repositories.summaries import SUMMARY_FIELDS
+from ...repositories.unit_of_work import stage_summary_update
+
+logger = logging.getLogger(__name__)
+
+# Counters over collections whose writes are not deferred to the end of the request
+IMMEDIATE_FIELDS = ("open_tasks", "unread_notifications", "total_points")
+
+# Rebuilds that lose the race with a concurrent change are recomputed this many times
+REBUILD_ATTEMPTS = 3
+
+
+def _summary_update(now, inc: dict, set_fields: dict) -> dict:
+    update = {"$set": {"updated_at": now, **set_fields}}
+    if inc:
+        update["$inc"] = inc
+    return update
+
+
+def update_summary(user_id, inc: dict | None = None, set_fields: dict | None = None) -> None:
+    """
+    Change a user's summary, e.g.
+    ``update_summary(uid, inc={"open_tasks": 1}, set_fields={"streak": 3})``.
+    IMMEDIATE_FIELDS are written now; the others are staged with the
+    request's user document update.
+    """
+    now = datetime.now(timezone.utc)
+    inc, set_fields = inc or {}, set_fields or {}
+    now_inc = {f: v for f, v in inc.items() if f in IMMEDIATE_FIELDS}
+    now_set = {f: v for f, v in set_fields.items() if f in IMMEDIATE_FIELDS}
+    staged_inc = {f: v for f, v in inc.items() if f not in IMMEDIATE_FIELDS}
+    staged_set = {f: v for f, v in set_fields.items() if f not in IMMEDIATE_FIELDS}
+    if now_inc or now_set:
+        get_repositories().user_summaries.apply(user_id, _summary_update(now, now_inc, now_set))
+    if staged_inc or staged_set:
+        stage_summary_update(user_id, _summary_update(now, staged_inc, staged_set))
+
+
+def compute_summary(user_id) -> dict | None:
+    """Recompute a user's summary from the source collections (None if no such user)."""
+    from ..rewards.definitions import REWARD_DEFINITIONS
+
+    repos = get_repositories()
+    user_oid = ObjectId(user_id)
+    user = repos.users.get(user_oid, fields=("streak", "quizzes_taken", "tasks_done", "focus_points"))
+    if not user:
+        return None
+
+    earned = repos.rewards.earned_ids(user_oid)
+    return {
+        "streak": user.get("streak", 0),
+        "quizzes_taken": user.get("quizzes_taken", 0),
+        "tasks_done": user.get("tasks_done", 0),
+        "focus_points": user.get("focus_points", 0),
+        "total_points": sum(rd["points"] for rd in REWARD_DEFINITIONS if rd["id"] in earned),
+        "open_tasks": repos.tasks.count_open(user_oid),
+        "unread_notifications": repos.notifications.count_active(user_oid),
+    }
+
+
+def rebuild_summary(user_id) -> dict | None:
+    """
+    Recompute and store a user's summary; returns it, or None if the user is
+    gone. The result is only stored if the summary did not change while it
+    was computed (else a concurrent increment would be lost or counted twice).
+    """
+    summaries = get_repositories().user_summaries
+    for _ in range(REBUILD_ATTEMPTS):
+        current = summaries.get(user_id, fields=("rev",))
+        summary = compute_summary(user_id)
+        if summary is None:
+            summaries.delete(user_id)
+            return None
+        now = datetime.now(timezone.utc)
+        fields = {**summary, "rebuilt_at": now, "updated_at": now}
+        if current is None:
+            stored = summaries.create(user_id, fields)
+        else:
+            stored = summaries.replace_if_unchanged(user_id, fields, current.get("rev"))
+        if stored:
+            return summary
+    logger.warning(f"Summary of user {user_id} kept changing during rebuild; not stored")
+    return summary
+
+
+def rebuild_all_summaries() -> int:
+    """Rebuild every user's summary; returns how many were written."""
+    count = 0
+    for user_id in get_repositories().users.iter_ids():
+        if rebuild_summary(user_id) is not None:
+            count += 1
+    return count
+
+
+def get_summary(user_id) -> dict | None:
+    """The user's dashboard counters (one indexed read), building them if missing."""
+    summary = get_repositories().user_summaries.get(user_id, fields=SUMMARY_FIELDS)
+    if summary is None:
+        return rebuild_summary(user_id)
+    summary.pop("_id", None)
+    return summary
+
+
+def init_app(app) -> None:
+    """Register the rebuild-summaries CLI command."""
+
+    @app.cli.command("rebuild-summaries")
+    @click.option("--user", "user_id", default=None, help="Rebuild a single user's summary")
+    def rebuild_summaries_command(user_id):
+        """Recompute user dashboard summaries from the source collections."""
+        if user_id:
+            summary = rebuild_summary(user_id)
+            click.echo(summary if summary is not None else f"No user {user_id}")
+        else:
+            click.echo(f"Rebuilt {rebuild_all_summaries()} summaries")
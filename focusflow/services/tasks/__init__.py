@@ -0,0 +1,7 @@
+"""
+Tasks service module.
+Handles batched task operations.
+"""
+from .batch import apply_task_batch, BATCH_OPERATIONS, MAX_BATCH_OPERATIONS
+
+__all__ = ['apply_task_batch', 'BATCH_OPERATIONS', 'MAX_BATCH_OPERATIONS']
@@ -0,0 +1,141 @@
+"""
+Batched task operations.
+
+A batch of create/toggle/rename/delete operations is checked in order
+against one read of the tasks it names, then written as a single bulk
+write. The per-task side effects of the single-task endpoints (task
+notifications, streak recalculation, summary counters, reward checks)
+run once for the whole batch.
+"""
+from bson.errors import InvalidId
+from bson.objectid import ObjectId
+
+from ...conditional import bump_version
+from ...repositories import get_repositories
+from ...repositories.unit_of_work import stage_user_update
+from ..events import publish_event
+from ..notifications import create_notifications
+from ..rewards import check_and_award_rewards
+from ..streaks import calculate_current_streak
+from ..summary import update_summary
+
+BATCH_OPERATIONS = ("create", "toggle", "rename", "delete")
+MAX_BATCH_OPERATIONS = 100
+
+
+def _task_oid(value) -> ObjectId | None:
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        return None
+
+
+def _failure(op, error: str) -> dict:
+    return {"op": op, "success": False, "error": error}
+
+
+def apply_task_batch(user_id, operations) -> dict:
+    """
+    Apply ``operations`` (dicts with "op" and "task_id"/"title"/"done") for a
+    user. Returns {"results": one result per operation, "streak", "new_rewards"}.
+    Raises ValueError if ``operations`` is not a list of 1..MAX_BATCH_OPERATIONS.
+    """
+    if not isinstance(operations, list) or not operations:
+        raise ValueError("operations must be a non-empty list")
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise ValueError(f"At most {MAX_BATCH_OPERATIONS} operations per batch")
+
+    tasks = get_repositories().tasks
+    named = {_task_oid(op.get("task_id")) for op in operations if isinstance(op, dict)}
+    named.discard(None)
+    before = tasks.get_many(named, user_id, fields=("title", "done")) if named else {}
+    current = {task_id: dict(doc) for task_id, doc in before.items()}
+
+    results, touched = [], {}   # touched: task _id -> indexes of the results it affects
+    inserts = []
+    for op in operations:
+        kind = op.get("op") if isinstance(op, dict) else None
+        if kind not in BATCH_OPERATIONS:
+            results.append(_failure(kind, "Unknown operation"))
+            continue
+
+        title = None
+        if kind in ("create", "rename"):
+            title = op.get("title")
+            title = title.strip() if isinstance(title, str) else ""
+            if not title:
+                results.append(_failure(kind, "Task title is required"))
+                continue
+
+        if kind == "create":
+            doc = tasks.new(user_id, title)
+            inserts.append(doc)
+            touched.setdefault(doc["_id"], []).append(len(results))
+            results.append({"op": kind, "success": True, "task_id": str(doc["_id"]), "title": title, "done": False})
+            continue
+
+        task_id = _task_oid(op.get("task_id"))
+        task = current.get(task_id)
+        if task is None:
+            results.append(_failure(kind, "Task not found"))
+            continue
+
+        result = {"op": kind, "success": True, "task_id": str(task_id)}
+        if kind == "toggle":
+            done = op.get("done")
+            task["done"] = done if isinstance(done, bool) else not task.get("done", False)
+            result["done"] = task["done"]
+        elif kind == "rename":
+            task["title"] = result["title"] = title
+        else:
+            del current[task_id]
+        touched.setdefault(task_id, []).append(len(results))
+        results.append(result)
+
+    # Net change per existing task
+    updates, deletes = {}, []
+    for task_id, old in before.items():
+        new = current.get(task_id)
+        if new is None:
+            deletes.append(task_id)
+            continue
+        changed = {f: new[f] for f in ("title", "done") if new.get(f) != old.get(f)}
+        if changed:
+            updates[task_id] = changed
+
+    failed = tasks.apply_batch(user_id, inserts, updates, deletes)
+    for task_id in failed:
+        for index in touched.get(task_id, ()):
+            results[index] = _failure(results[index]["op"], "Write failed")
+
+    open_delta = sum(1 for doc in inserts if doc["_id"] not in failed)
+    toggled = []
+    for task_id, old in before.items():
+        if task_id in failed:
+            continue
+        new = current.get(task_id)
+        was_open = not old.get("done", False)
+        if new is None:
+            open_delta -= 1 if was_open else 0
+        elif new.get("done", False) == was_open:
+            open_delta += 1 if not new["done"] else -1
+            toggled.append({"taskId": str(task_id), "title": new.get("title", ""), "done": new["done"]})
+
+    if inserts or updates or deletes:
+        bump_version(user_id, "tasks")
+
+    streak, new_rewards = None, []
+    summary_set = {}
+    if toggled:
+        create_notifications(user_id, "task_due", toggled)
+        streak = calculate_current_streak(user_id)
+        stage_user_update(user_id, {"$set": {"streak": streak}})
+        summary_set["streak"] = streak
+        publish_event(user_id, "streak", {"streak": streak})
+    if open_delta or summary_set:
+        update_summary(user_id, inc={"open_tasks": open_delta} if open_delta else None, set_fields=summary_set)
+    if toggled:
+        # Also pushed as a "reward" event to the user's open dashboards
+        new_rewards = check_and_award_rewards(user_id)
+
+    return {"results": results, "streak": streak, "new_rewards": new_rewards}